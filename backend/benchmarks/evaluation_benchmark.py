@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+"""
+Benchmark the evaluation pipeline offline with the fake LLM backend
+
+Usage:
+    python benchmarks/evaluation_benchmark.py [--resumes N] [--single N]
+                                              [--concurrency N] [--seed N]
+                                              [--distribution NAME]
+                                              [--latency-mean S] [--latency-stddev S]
+                                              [--error-rate P] [--database NAME]
+                                              [--keep] [--json PATH]
+
+Runs the real EvaluationService (MongoDB reads and bulk writes, prompt-side
+caching, JSON validation, concurrency limits) against
+services/fake_llm_backend.py, so no Gemini API key or network is needed. A
+reproducible set of synthetic resumes is stored under one JD in a scratch
+database (MongoDB from MONGODB_URL). The script then measures two things:
+- an evaluate-all-for-JD run over every resume
+- --single concurrent single evaluations with at most --concurrency in flight
+
+For each, it reports throughput and p50/p99 latency. It also reports the
+pipeline overhead: measured latency minus the latency the fake backend slept
+for. The scratch database is dropped afterwards unless --keep is given.
+"""
+
+import sys
+import os
+import argparse
+import asyncio
+import json
+import random
+import time
+
+# Add the backend directory to Python path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+SKILL_POOL = [
+    "Python", "FastAPI", "MongoDB", "Docker", "Kubernetes", "React", "TypeScript", "AWS",
+    "PostgreSQL", "Redis", "Go", "Java", "Machine Learning", "Terraform", "Git"
+]
+JD_TEXT = (
+    "Senior Backend Engineer. We are looking for an engineer with 5+ years of experience "
+    "building APIs in Python with FastAPI, MongoDB and Redis, deployed with Docker and "
+    "Kubernetes on AWS. Experience with Terraform and CI/CD is a plus."
+)
+
+def percentile(values: list, pct: float) -> float:
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+def build_resumes(count: int, seed: int, jd_id) -> list:
+    """Synthetic resume documents associated with jd_id"""
+    rng = random.Random(seed)
+    resumes = []
+    for index in range(count):
+        skills = rng.sample(SKILL_POOL, rng.randint(3, 8))
+        years = rng.randint(1, 12)
+        experience = "\n".join(
+            f"- Built and operated services with {', '.join(rng.sample(skills, min(3, len(skills))))}"
+            for _ in range(rng.randint(4, 12))
+        )
+        raw_text = (
+            f"Candidate {index}\ncandidate{index}@example.com\n\n"
+            f"Summary\nBackend developer with {years} years of experience.\n\n"
+            f"Experience\nSoftware Engineer, Example Corp (2015 - Present)\n{experience}\n\n"
+            f"Skills\n{', '.join(skills)}\n\n"
+            f"Education\nBachelor of Science in Computer Science, State University, 2014\n"
+        )
+        resumes.append({
+            "candidate_name": f"Candidate {index}",
+            "email": f"candidate{index}@example.com",
+            "raw_text": raw_text,
+            "skills": skills,
+            "education": [],
+            "experience": [],
+            "jd_ids": [jd_id],
+            "content_sha256": f"benchmark-{seed}-{index}",
+        })
+    return resumes
+
+async def run_batch(service, jd_id: str) -> dict:
+    """One evaluate-all-for-JD run; latency is the time until each result event"""
+    start = time.perf_counter()
+    timings = []
+    counts = {}
+    async for event in service.evaluate_all_for_jd(jd_id, force_refresh=True):
+        if event["event"] == "done":
+            counts = event["data"]
+        else:
+            timings.append(time.perf_counter() - start)
+    elapsed = time.perf_counter() - start
+    return {
+        "elapsed_s": elapsed,
+        "evaluations_per_s": counts.get("evaluated", 0) / elapsed,
+        "p50_ms": percentile(timings, 50) * 1000,
+        "p99_ms": percentile(timings, 99) * 1000,
+        "counts": counts,
+    }
+
+async def run_single(service_factory, resume_ids: list, jd_id: str, concurrency: int) -> dict:
+    """Concurrent single evaluations, each through a new service like an API request"""
+    semaphore = asyncio.Semaphore(concurrency)
+    timings = []
+    failed = 0
+
+    async def evaluate(resume_id: str):
+        nonlocal failed
+        async with semaphore:
+            started = time.perf_counter()
+            try:
+                await service_factory().evaluate_resume_with_ai(resume_id, jd_id, force_refresh=True)
+                timings.append(time.perf_counter() - started)
+            except Exception:
+                failed += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*[evaluate(resume_id) for resume_id in resume_ids])
+    elapsed = time.perf_counter() - start
+    return {
+        "elapsed_s": elapsed,
+        "evaluations_per_s": len(timings) / elapsed,
+        "p50_ms": percentile(timings, 50) * 1000,
+        "p99_ms": percentile(timings, 99) * 1000,
+        "mean_ms": sum(timings) / len(timings) * 1000 if timings else 0.0,
+        "counts": {"evaluated": len(timings), "failed": failed},
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the evaluation pipeline with the fake LLM backend")
+    parser.add_argument("--resumes", type=int, default=200, help="Resumes stored for the JD")
+    parser.add_argument("--single", type=int, default=100, help="Single evaluations to run (0 to skip)")
+    parser.add_argument("--concurrency", type=int, default=50, help="Single evaluations in flight at once")
+    parser.add_argument("--seed", type=int, default=42, help="Seed for the resumes and the fake backend")
+    parser.add_argument("--distribution", default="lognormal", help="Fake latency distribution")
+    parser.add_argument("--latency-mean", type=float, default=0.5, help="Fake mean latency in seconds")
+    parser.add_argument("--latency-stddev", type=float, default=0.25, help="Fake latency deviation in seconds")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of fake requests that fail")
+    parser.add_argument("--database", default="resume_evaluator_benchmark", help="Scratch database name")
+    parser.add_argument("--keep", action="store_true", help="Keep the scratch database")
+    parser.add_argument("--json", metavar="PATH", help="Write the report as JSON")
+    args = parser.parse_args()
+
+    # Configure the backend and database before the services read their settings
+    os.environ.update({
+        "LLM_BACKEND": "fake",
+        "FAKE_LLM_SEED": str(args.seed),
+        "FAKE_LLM_LATENCY_DISTRIBUTION": args.distribution,
+        "FAKE_LLM_LATENCY_MEAN": str(args.latency_mean),
+        "FAKE_LLM_LATENCY_STDDEV": str(args.latency_stddev),
+        "FAKE_LLM_ERROR_RATE": str(args.error_rate),
+        "DATABASE_NAME": args.database,
+    })
+    from bson import ObjectId
+    from utils.db import get_database
+    from models.resume import ResumeModel
+    from schemas.job_description import JobDescriptionCreate
+    from services.evaluation_service import EvaluationService
+    from services.job_description_service import JobDescriptionService
+
+    database = get_database()
+    try:
+        jd = JobDescriptionService().create_job_description(JobDescriptionCreate(title="Benchmark JD", jd_text=JD_TEXT))
+        resumes = ResumeModel().create_many(build_resumes(args.resumes, args.seed, ObjectId(jd.id)))
+        resume_ids = [str(resume["_id"]) for resume in resumes]
+
+        print("Evaluation pipeline benchmark (fake LLM backend)")
+        print("=" * 40)
+        print(f"{args.resumes} resumes; fake latency {args.distribution} mean {args.latency_mean}s "
+              f"sd {args.latency_stddev}s; error rate {args.error_rate:.0%}")
+
+        results = {"batch": asyncio.run(run_batch(EvaluationService(), jd.id))}
+        if args.single:
+            results["single"] = asyncio.run(
+                run_single(EvaluationService, resume_ids[:args.single], jd.id, args.concurrency)
+            )
+
+        print(f"\n{'run':<8}{'elapsed s':>11}{'evals/s':>10}{'p50 ms':>10}{'p99 ms':>10}  counts")
+        for name, figures in results.items():
+            print(f"{name:<8}{figures['elapsed_s']:>11.2f}{figures['evaluations_per_s']:>10.1f}"
+                  f"{figures['p50_ms']:>10.1f}{figures['p99_ms']:>10.1f}  {figures['counts']}")
+        if "single" in results:
+            overhead = results["single"]["mean_ms"] - args.latency_mean * 1000
+            print(f"\nSingle evaluation overhead over the fake latency: {overhead:.1f} ms")
+
+        if args.json:
+            with open(args.json, 'w') as file:
+                json.dump({"args": vars(args), "results": results}, file, indent=2)
+    finally:
+        if not args.keep:
+            database.client.drop_database(args.database)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Benchmark the native PyMuPDF markdown renderer against MarkItDown
+
+Usage:
+    python benchmarks/markdown_benchmark.py [resume.pdf ...] [--runs N]
+
+Without PDF arguments a sample resume is generated. For each file the script
+reports the median conversion time of both engines, the speedup, how similar
+the produced text is, and how many headings/bullets the native engine found.
+"""
+
+import sys
+import os
+import argparse
+import difflib
+import re
+import statistics
+import time
+from io import BytesIO
+
+# Add the backend directory to Python path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import fitz  # PyMuPDF
+from markitdown import StreamInfo
+from utils.pdf_parser import PDFTextExtractor, get_markdown_converter
+
+def build_sample_resume() -> bytes:
+    """Generate a two-page resume with headings, bold titles and bullets"""
+    doc = fitz.open()
+    for page_number in range(2):
+        page = doc.new_page()
+        y = 60
+        lines = [("Jane Doe", 22, "hebo"), ("jane.doe@example.com | github.com/janedoe", 10, "helv")]
+        for section in ("Experience", "Projects", "Education"):
+            lines.append((section, 14, "hebo"))
+            for item in range(3):
+                lines.append((f"Role {page_number}-{item}, Example Corp", 10, "hebo"))
+                lines.append((f"• Delivered feature {item} using Python, FastAPI and MongoDB.", 10, "helv"))
+                lines.append((f"• Improved throughput of service {item} by 30%.", 10, "helv"))
+        for text, size, font in lines:
+            if y > 780:
+                break
+            page.insert_text((72, y), text, fontsize=size, fontname=font)
+            y += size + 8
+    data = doc.tobytes()
+    doc.close()
+    return data
+
+def time_engine(convert, runs: int) -> tuple:
+    """Return (median_seconds, output) over several runs"""
+    timings = []
+    output = ''
+    for _ in range(runs):
+        start = time.perf_counter()
+        output = convert()
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings), output
+
+def words(text: str) -> list:
+    return re.findall(r'\w+', text.lower())
+
+def benchmark(name: str, data: bytes, runs: int):
+    converter = get_markdown_converter()
+    stream_info = StreamInfo(mimetype='application/pdf', extension='.pdf')
+    markitdown_time, markitdown_md = time_engine(
+        lambda: converter.convert_stream(BytesIO(data), stream_info=stream_info).text_content, runs
+    )
+    native_time, native_md = time_engine(lambda: PDFTextExtractor.render_markdown(data), runs)
+    
+    similarity = difflib.SequenceMatcher(None, words(markitdown_md), words(native_md), autojunk=False).ratio()
+    headings = sum(1 for line in native_md.splitlines() if line.startswith('#'))
+    bullets = sum(1 for line in native_md.splitlines() if line.startswith('- '))
+    
+    print(f"\n{name}")
+    print(f"  MarkItDown: {markitdown_time * 1000:8.2f} ms  ({len(markitdown_md)} chars)")
+    print(f"  Native:     {native_time * 1000:8.2f} ms  ({len(native_md)} chars)")
+    print(f"  Speedup:    {markitdown_time / native_time:8.2f}x")
+    print(f"  Word-sequence similarity: {similarity:.1%}")
+    print(f"  Native structure: {headings} headings, {bullets} bullets")
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare native markdown rendering with MarkItDown")
+    parser.add_argument("pdfs", nargs="*", help="PDF files to convert (default: generated sample resume)")
+    parser.add_argument("--runs", type=int, default=5, help="Runs per engine and file (median is reported)")
+    args = parser.parse_args()
+    
+    # Pay model loading and first-call costs before timing anything
+    PDFTextExtractor.render_markdown(build_sample_resume())
+    get_markdown_converter()
+    
+    print("Markdown engine benchmark")
+    print("=" * 40)
+    if args.pdfs:
+        for path in args.pdfs:
+            with open(path, 'rb') as file:
+                benchmark(path, file.read(), args.runs)
+    else:
+        benchmark("generated sample resume", build_sample_resume(), args.runs)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,294 @@
+#!/usr/bin/env python3
+"""
+Benchmark every stage of the PDF parsing pipeline on a synthetic resume corpus
+
+Usage:
+    python benchmarks/parse_benchmark.py [--docs N] [--runs N] [--seed N]
+                                         [--save-corpus DIR] [--json PATH]
+                                         [--baseline PATH] [--threshold PCT]
+
+A reproducible corpus of resume PDFs is generated with PyMuPDF (mixed page
+counts, single and two-column layouts, embedded links and image-heavy pages).
+Each stage of utils/pdf_parser.py is then timed in isolation over the whole
+corpus, and the script reports per-stage p50/p99 latency, throughput and the
+peak RSS of the process after the stage, plus how accurately name, email and
+skills were recovered. With --baseline the p50 of each stage is compared with
+a previous --json report and the script exits non-zero on a regression.
+"""
+
+import sys
+import os
+import argparse
+import json
+import platform
+import random
+import resource
+import time
+from io import BytesIO
+
+# Add the backend directory to Python path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import fitz  # PyMuPDF
+from markitdown import StreamInfo
+from utils.pdf_parser import PDFTextExtractor, get_markdown_converter, warm_up_pdf_parser
+from utils.resume_sections import segment_sections
+from utils.skill_extractor import extract_skills
+
+FIRST_NAMES = ["Jane", "John", "Priya", "Wei", "Carlos", "Amara", "Lukas", "Sofia", "Kenji", "Fatima"]
+LAST_NAMES = ["Doe", "Smith", "Sharma", "Chen", "Garcia", "Okafor", "Muller", "Rossi", "Tanaka", "Haddad"]
+COMPANIES = ["Example Corp", "Acme Labs", "Globex", "Initech", "Umbrella Systems", "Stark Industries"]
+TITLES = ["Software Engineer", "Backend Developer", "Data Scientist", "DevOps Engineer", "Frontend Engineer"]
+DEGREES = ["Bachelor of Science in Computer Science", "Master of Science in Data Science", "B.Tech in Information Technology"]
+UNIVERSITIES = ["State University", "Institute of Technology", "City College"]
+# (canonical name, spelling used in the document)
+SKILL_POOL = [
+    ("Python", "Python"), ("FastAPI", "FastAPI"), ("MongoDB", "MongoDB"), ("Docker", "Docker"),
+    ("Kubernetes", "Kubernetes"), ("React", "React.js"), ("TypeScript", "TypeScript"), ("AWS", "AWS"),
+    ("PostgreSQL", "Postgres"), ("Redis", "Redis"), ("Go", "Golang"), ("Java", "Java"),
+    ("Machine Learning", "machine learning"), ("Terraform", "Terraform"), ("CI/CD", "CI/CD"), ("Git", "Git")
+]
+
+# Stages of utils/pdf_parser.py, each run on its own over the whole corpus
+STAGES = [
+    "validate", "pymupdf_text", "pdfminer_text", "markitdown", "native_markdown",
+    "links", "sections", "education", "experience", "skills", "parse_resume"
+]
+
+PAGE_WIDTH, PAGE_HEIGHT = 595, 842
+
+def _noise_image(rng: random.Random, size: int) -> fitz.Pixmap:
+    """Random RGB image; noise does not compress, so it weighs like a photo"""
+    return fitz.Pixmap(fitz.csRGB, size, size, rng.randbytes(size * size * 3), 0)
+
+def build_resume(rng: random.Random, pages: int, columns: int, with_links: bool, with_images: bool) -> tuple:
+    """
+    Generate one synthetic resume PDF.
+
+    Returns:
+        (pdf bytes, ground truth dict with name, email and skills)
+    """
+    name = f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}"
+    email = f"{name.lower().replace(' ', '.')}@example.com"
+    skills = rng.sample(SKILL_POOL, 6)
+
+    blocks = [
+        ("Experience", [
+            line
+            for index in range(3 * pages)
+            for line in (
+                f"{rng.choice(TITLES)} at {rng.choice(COMPANIES)}, Jan {2010 + index % 12} - Dec {2011 + index % 12}",
+                f"- Built services with {skills[index % 6][1]} serving {rng.randint(2, 90)}k requests per day.",
+                f"- Cut infrastructure cost by {rng.randint(5, 40)}% and mentored {rng.randint(1, 6)} engineers.",
+            )
+        ]),
+        ("Education", [f"{rng.choice(DEGREES)}, {rng.choice(UNIVERSITIES)} {rng.randint(2005, 2020)}"]),
+        ("Skills", [", ".join(spelling for _, spelling in skills)]),
+    ]
+    body = "\n".join(f"{heading}\n" + "\n".join(lines) for heading, lines in blocks)
+
+    doc = fitz.open()
+    page = doc.new_page(width=PAGE_WIDTH, height=PAGE_HEIGHT)
+    page.insert_text((50, 60), name, fontsize=20, fontname="hebo")
+    page.insert_text((50, 80), f"{email} | linkedin.com/in/{name.lower().replace(' ', '')}", fontsize=9)
+    if with_links:
+        page.insert_link({"kind": fitz.LINK_URI, "from": fitz.Rect(50, 70, 200, 82), "uri": f"mailto:{email}"})
+        page.insert_link({"kind": fitz.LINK_URI, "from": fitz.Rect(200, 70, 350, 82),
+                          "uri": f"https://www.linkedin.com/in/{name.lower().replace(' ', '')}"})
+        page.insert_link({"kind": fitz.LINK_URI, "from": fitz.Rect(350, 70, 450, 82),
+                          "uri": f"https://github.com/{name.split()[0].lower()}"})
+
+    # Flow the body through the columns of every page
+    lines = body.split("\n")
+    per_page = -(-len(lines) // pages)
+    for page_number in range(pages):
+        if page_number:
+            page = doc.new_page(width=PAGE_WIDTH, height=PAGE_HEIGHT)
+        chunk = lines[page_number * per_page:(page_number + 1) * per_page]
+        top = 100 if page_number == 0 else 50
+        bottom = PAGE_HEIGHT - (220 if with_images else 50)
+        column_width = (PAGE_WIDTH - 100) / columns
+        per_column = -(-len(chunk) // columns)
+        for column in range(columns):
+            rect = fitz.Rect(50 + column * column_width, top, 50 + (column + 1) * column_width - 10, bottom)
+            page.insert_textbox(rect, "\n".join(chunk[column * per_column:(column + 1) * per_column]), fontsize=9)
+        if with_images:
+            for slot in range(3):
+                x = 50 + slot * 170
+                page.insert_image(fitz.Rect(x, PAGE_HEIGHT - 200, x + 150, PAGE_HEIGHT - 50), pixmap=_noise_image(rng, 160))
+
+    data = doc.tobytes(garbage=3, deflate=True)
+    doc.close()
+    return data, {"name": name, "email": email, "skills": sorted(canonical for canonical, _ in skills)}
+
+def build_corpus(count: int, seed: int) -> list:
+    """
+    Generate a reproducible corpus cycling through page counts, layouts,
+    links and image-heavy pages.
+
+    Returns:
+        List of dicts: {name, data, pages, truth}
+    """
+    rng = random.Random(seed)
+    corpus = []
+    for index in range(count):
+        pages = (1, 2, 3, 5, 10)[index % 5]
+        columns = 2 if index % 2 else 1
+        with_links = index % 3 != 2
+        with_images = index % 4 == 3
+        data, truth = build_resume(rng, pages, columns, with_links, with_images)
+        label = f"resume_{index:03d}_{pages}p_{columns}col{'_links' if with_links else ''}{'_images' if with_images else ''}"
+        corpus.append({"name": label, "data": data, "pages": pages, "truth": truth})
+    return corpus
+
+def _stage_functions() -> dict:
+    """Map each stage to a function of (pdf bytes, extracted text) -> result"""
+    converter = get_markdown_converter()
+    stream_info = StreamInfo(mimetype='application/pdf', extension='.pdf')
+    return {
+        "validate": lambda data, text: PDFTextExtractor.validate_pdf_file(data),
+        "pymupdf_text": lambda data, text: PDFTextExtractor.extract_text_with_pymupdf(data),
+        "pdfminer_text": lambda data, text: PDFTextExtractor.extract_text_with_pdfminer(data),
+        "markitdown": lambda data, text: converter.convert_stream(BytesIO(data), stream_info=stream_info).text_content,
+        "native_markdown": lambda data, text: PDFTextExtractor.render_markdown(data),
+        "links": lambda data, text: PDFTextExtractor.extract_links(data),
+        "sections": lambda data, text: segment_sections(text),
+        "education": lambda data, text: PDFTextExtractor.extract_education(text),
+        "experience": lambda data, text: PDFTextExtractor.extract_experience(text),
+        "skills": lambda data, text: extract_skills(text),
+        "parse_resume": lambda data, text: PDFTextExtractor.parse_resume(data),
+    }
+
+def percentile(values: list, pct: float) -> float:
+    """Nearest-rank percentile"""
+    ordered = sorted(values)
+    rank = max(int(round(pct / 100 * len(ordered) + 0.5)) - 1, 0)
+    return ordered[min(rank, len(ordered) - 1)]
+
+def peak_rss_mb() -> float:
+    """Peak resident set size of this process so far"""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in kilobytes on Linux and in bytes on macOS
+    return peak / (1024 * 1024) if platform.system() == "Darwin" else peak / 1024
+
+def run_benchmark(corpus: list, runs: int, stages: list) -> dict:
+    """Time each stage over the corpus and collect latency, throughput and memory figures"""
+    functions = _stage_functions()
+    texts = [PDFTextExtractor.extract_text_with_pymupdf(doc["data"]) or "" for doc in corpus]
+    total_pages = sum(doc["pages"] for doc in corpus) * runs
+
+    results = {}
+    for stage in stages:
+        function = functions[stage]
+        timings = []
+        stage_start = time.perf_counter()
+        for _ in range(runs):
+            for doc, text in zip(corpus, texts):
+                start = time.perf_counter()
+                function(doc["data"], text)
+                timings.append(time.perf_counter() - start)
+        elapsed = time.perf_counter() - stage_start
+        results[stage] = {
+            "p50_ms": percentile(timings, 50) * 1000,
+            "p99_ms": percentile(timings, 99) * 1000,
+            "mean_ms": sum(timings) / len(timings) * 1000,
+            "docs_per_s": len(timings) / elapsed,
+            "pages_per_s": total_pages / elapsed,
+            "peak_rss_mb": peak_rss_mb(),
+        }
+    return results
+
+def measure_accuracy(corpus: list) -> dict:
+    """Compare parse_resume output with the generated ground truth"""
+    names = emails = 0
+    skills_found = skills_expected = 0
+    for doc in corpus:
+        parsed = PDFTextExtractor.parse_resume(doc["data"])
+        truth = doc["truth"]
+        names += parsed["candidate_name"] == truth["name"]
+        emails += (parsed["email"] or parsed["email_from_link"]) == truth["email"]
+        skills_found += len(set(parsed["skills"]) & set(truth["skills"]))
+        skills_expected += len(truth["skills"])
+    return {
+        "name_accuracy": names / len(corpus),
+        "email_accuracy": emails / len(corpus),
+        "skill_recall": skills_found / skills_expected,
+    }
+
+def print_report(results: dict, accuracy: dict, corpus: list, runs: int):
+    total_bytes = sum(len(doc["data"]) for doc in corpus)
+    print(f"Corpus: {len(corpus)} PDFs, {sum(doc['pages'] for doc in corpus)} pages, "
+          f"{total_bytes / 1024:.0f} KB; {runs} run(s) per stage")
+    print(f"\n{'stage':<16}{'p50 ms':>10}{'p99 ms':>10}{'mean ms':>10}{'docs/s':>10}{'pages/s':>10}{'peak RSS MB':>13}")
+    for stage, figures in results.items():
+        print(f"{stage:<16}{figures['p50_ms']:>10.2f}{figures['p99_ms']:>10.2f}{figures['mean_ms']:>10.2f}"
+              f"{figures['docs_per_s']:>10.1f}{figures['pages_per_s']:>10.1f}{figures['peak_rss_mb']:>13.1f}")
+    print(f"\nName accuracy:  {accuracy['name_accuracy']:.1%}")
+    print(f"Email accuracy: {accuracy['email_accuracy']:.1%}")
+    print(f"Skill recall:   {accuracy['skill_recall']:.1%}")
+
+def compare_with_baseline(results: dict, accuracy: dict, baseline: dict, threshold: float) -> list:
+    """Return a description of every stage slower, or metric less accurate, than the baseline"""
+    regressions = []
+    for stage, figures in results.items():
+        previous = baseline.get("stages", {}).get(stage)
+        if previous and figures["p50_ms"] > previous["p50_ms"] * (1 + threshold / 100):
+            regressions.append(f"{stage}: p50 {previous['p50_ms']:.2f} ms -> {figures['p50_ms']:.2f} ms")
+    for metric, value in accuracy.items():
+        previous = baseline.get("accuracy", {}).get(metric)
+        if previous is not None and value < previous:
+            regressions.append(f"{metric}: {previous:.1%} -> {value:.1%}")
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the PDF parsing pipeline on a synthetic corpus")
+    parser.add_argument("--docs", type=int, default=20, help="Number of PDFs to generate")
+    parser.add_argument("--runs", type=int, default=3, help="Passes over the corpus per stage")
+    parser.add_argument("--seed", type=int, default=42, help="Seed for corpus generation")
+    parser.add_argument("--stages", default=",".join(STAGES), help="Comma-separated stages to run")
+    parser.add_argument("--save-corpus", metavar="DIR", help="Also write the generated PDFs to DIR")
+    parser.add_argument("--json", metavar="PATH", help="Write the report as JSON (usable as a baseline)")
+    parser.add_argument("--baseline", metavar="PATH", help="JSON report to compare against")
+    parser.add_argument("--threshold", type=float, default=20.0, help="Allowed p50 slowdown vs baseline, in percent")
+    args = parser.parse_args()
+
+    stages = [stage.strip() for stage in args.stages.split(",") if stage.strip()]
+    unknown = [stage for stage in stages if stage not in STAGES]
+    if unknown:
+        parser.error(f"Unknown stages: {', '.join(unknown)} (choose from {', '.join(STAGES)})")
+
+    corpus = build_corpus(args.docs, args.seed)
+    if args.save_corpus:
+        os.makedirs(args.save_corpus, exist_ok=True)
+        for doc in corpus:
+            with open(os.path.join(args.save_corpus, f"{doc['name']}.pdf"), 'wb') as file:
+                file.write(doc["data"])
+
+    # Pay model loading and first-call costs before timing anything
+    warm_up_pdf_parser()
+
+    print("PDF parsing benchmark")
+    print("=" * 40)
+    results = run_benchmark(corpus, args.runs, stages)
+    accuracy = measure_accuracy(corpus)
+    print_report(results, accuracy, corpus, args.runs)
+
+    if args.json:
+        with open(args.json, 'w') as file:
+            json.dump({
+                "docs": args.docs, "runs": args.runs, "seed": args.seed,
+                "stages": results, "accuracy": accuracy
+            }, file, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as file:
+            regressions = compare_with_baseline(results, accuracy, json.load(file), args.threshold)
+        if regressions:
+            print("\nRegressions against baseline:")
+            for regression in regressions:
+                print(f"  {regression}")
+            sys.exit(1)
+        print("\nNo regressions against baseline")
+
+if __name__ == "__main__":
+    main()
@@ -1,10 +1,14 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from contextlib import asynccontextmanager
 import os
 from dotenv import load_dotenv
 
 # Import routes
 from routes import job_descriptions, resumes, evaluations
+from utils.db import close_database_connection
+from utils.pdf_pool import start_pdf_pool, shutdown_pdf_pool
+from services.ingestion_worker import start_ingestion_worker, stop_ingestion_worker
 
 # Load environment variables
 # Try to load from parent directory first (for Docker), then current directory
@@ -15,13 +19,24 @@ load_dotenv(".env")  # Fallback to current directory
 ENVIRONMENT = os.getenv("ENVIRONMENT", "development").lower()
 DEBUG = os.getenv("DEBUG", "True").lower() == "true"
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Start shared resources before serving and release them on shutdown"""
+    await start_pdf_pool()
+    start_ingestion_worker()
+    yield
+    await stop_ingestion_worker()
+    shutdown_pdf_pool()
+    await close_database_connection()
+
 app = FastAPI(
     title="Resume Evaluator API",
     description="A comprehensive API for resume evaluation and job description management",
     version="1.0.0",
     docs_url="/docs",
     redoc_url="/redoc",
-    debug=DEBUG
+    debug=DEBUG,
+    lifespan=lifespan
 )
 
 # Configure CORS for frontend integration
@@ -1,7 +1,7 @@
 from datetime import datetime
 from typing import List, Optional
 from bson import ObjectId
-from pymongo import ASCENDING, DESCENDING
+from pymongo import ASCENDING, DESCENDING, ReturnDocument, UpdateOne
 from utils.db import get_database
 
 class EvaluationModel:
@@ -31,6 +31,38 @@ class EvaluationModel:
         result = self.collection.insert_one(evaluation_data)
         return self.get_by_id(result.inserted_id)
     
+    def upsert_by_jd_and_resume(self, evaluation_data: dict) -> dict:
+        """
+        Store the evaluation of a (jd_id, resume_id) pair, replacing the
+        previous one instead of failing on the unique index
+        """
+        now = datetime.utcnow()
+        evaluation_data = dict(evaluation_data)
+        evaluation_data["evaluated_at"] = now
+        evaluation_data["updated_at"] = now
+        return self.collection.find_one_and_update(
+            {"jd_id": evaluation_data["jd_id"], "resume_id": evaluation_data["resume_id"]},
+            {"$set": evaluation_data, "$setOnInsert": {"created_at": now}},
+            upsert=True,
+            return_document=ReturnDocument.AFTER
+        )
+    
+    def upsert_many_by_jd_and_resume(self, evaluations_data: List[dict]) -> int:
+        """Store several evaluations with a single bulk_write of upserts"""
+        if not evaluations_data:
+            return 0
+        now = datetime.utcnow()
+        operations = [
+            UpdateOne(
+                {"jd_id": evaluation_data["jd_id"], "resume_id": evaluation_data["resume_id"]},
+                {"$set": {**evaluation_data, "evaluated_at": now, "updated_at": now}, "$setOnInsert": {"created_at": now}},
+                upsert=True
+            )
+            for evaluation_data in evaluations_data
+        ]
+        result = self.collection.bulk_write(operations, ordered=False)
+        return result.upserted_count + result.modified_count
+    
     def get_by_id(self, evaluation_id: ObjectId) -> Optional[dict]:
         """Get evaluation by ID"""
         return self.collection.find_one({"_id": evaluation_id})
@@ -0,0 +1,48 @@
+from datetime import datetime, timedelta
+from pymongo import ASCENDING
+from pymongo.errors import DuplicateKeyError
+from utils.db import get_database
+
+class EvaluationLeaseModel:
+    """
+    Short-lived leases on (jd_id, resume_id) pairs, so only one API process at
+    a time calls Gemini for the same evaluation. A lease expires on its own if
+    the process holding it dies.
+    """
+
+    def __init__(self):
+        self.db = get_database()
+        self.collection = self.db.evaluation_leases
+
+        # Create indexes
+        self._create_indexes()
+
+    def _create_indexes(self):
+        """Create database indexes for better performance"""
+        # MongoDB removes expired leases in the background; acquire() does not rely on it
+        self.collection.create_index([("expires_at", ASCENDING)], expireAfterSeconds=0)
+
+    def _lease_id(self, jd_id: str, resume_id: str) -> str:
+        return f"{jd_id}:{resume_id}"
+
+    def acquire(self, jd_id: str, resume_id: str, owner: str, lease_seconds: float) -> bool:
+        """
+        Take the lease on a pair unless another owner holds an unexpired one.
+        The lease document is upserted with its pair as _id, so two processes
+        racing for a free lease cannot both get it.
+        """
+        now = datetime.utcnow()
+        try:
+            self.collection.update_one(
+                {"_id": self._lease_id(jd_id, resume_id), "$or": [{"expires_at": {"$lt": now}}, {"owner": owner}]},
+                {"$set": {"owner": owner, "expires_at": now + timedelta(seconds=lease_seconds), "acquired_at": now}},
+                upsert=True
+            )
+            return True
+        except DuplicateKeyError:
+            return False
+
+    def release(self, jd_id: str, resume_id: str, owner: str) -> bool:
+        """Release a lease if it is still held by owner"""
+        result = self.collection.delete_one({"_id": self._lease_id(jd_id, resume_id), "owner": owner})
+        return result.deleted_count > 0
@@ -0,0 +1,135 @@
+from datetime import datetime, timedelta
+from typing import Optional
+from bson import ObjectId
+from pymongo import ASCENDING, ReturnDocument
+from utils.db import get_database
+
+class IngestionJobModel:
+    def __init__(self):
+        self.db = get_database()
+        self.collection = self.db.ingestion_jobs
+
+        # Create indexes
+        self._create_indexes()
+
+    def _create_indexes(self):
+        """Create database indexes for better performance"""
+        # Claiming scans queued jobs and expired leases in submission order
+        self.collection.create_index([("status", ASCENDING), ("created_at", ASCENDING)])
+        self.collection.create_index([("status", ASCENDING), ("lease_expires_at", ASCENDING)])
+
+    def create(self, job_data: dict) -> dict:
+        """Create a new queued ingestion job (kind "ingest" unless given)"""
+        now = datetime.utcnow()
+        job_data.setdefault("kind", "ingest")
+        job_data.update({
+            "status": "queued",
+            "stage": "queued",
+            "stage_times": {"queued": now},
+            "attempts": 0,
+            "resume_id": None,
+            "error": None,
+            "lease_expires_at": None,
+            "created_at": now,
+            "updated_at": now
+        })
+        result = self.collection.insert_one(job_data)
+        return self.get_by_id(result.inserted_id)
+
+    def get_by_id(self, job_id: ObjectId) -> Optional[dict]:
+        """Get ingestion job by ID"""
+        return self.collection.find_one({"_id": job_id})
+
+    def find_active(self, kind: str) -> Optional[dict]:
+        """Get the oldest queued or running job of a kind"""
+        return self.collection.find_one(
+            {"kind": kind, "status": {"$in": ["queued", "running"]}},
+            sort=[("created_at", ASCENDING)]
+        )
+
+    def claim_next(self, lease_seconds: float, max_attempts: int) -> Optional[dict]:
+        """
+        Atomically claim the oldest runnable job: a queued job, or a running job
+        whose lease expired because the process working on it died.
+        The claimed job is marked running with a fresh lease.
+        """
+        now = datetime.utcnow()
+        return self.collection.find_one_and_update(
+            {
+                "$or": [
+                    {"status": "queued"},
+                    {"status": "running", "lease_expires_at": {"$lt": now}}
+                ],
+                "attempts": {"$lt": max_attempts}
+            },
+            {
+                "$set": {
+                    "status": "running",
+                    "lease_expires_at": now + timedelta(seconds=lease_seconds),
+                    "updated_at": now
+                },
+                "$inc": {"attempts": 1}
+            },
+            sort=[("created_at", ASCENDING)],
+            return_document=ReturnDocument.AFTER
+        )
+
+    def set_stage(self, job_id: ObjectId, stage: str, lease_seconds: float) -> bool:
+        """Record that a running job entered a new stage and renew its lease"""
+        now = datetime.utcnow()
+        result = self.collection.update_one(
+            {"_id": job_id, "status": "running"},
+            {"$set": {
+                "stage": stage,
+                f"stage_times.{stage}": now,
+                "lease_expires_at": now + timedelta(seconds=lease_seconds),
+                "updated_at": now
+            }}
+        )
+        return result.modified_count > 0
+
+    def record_progress(self, job_id: ObjectId, progress: dict, lease_seconds: float) -> bool:
+        """Save the progress fields of a running job and renew its lease"""
+        now = datetime.utcnow()
+        result = self.collection.update_one(
+            {"_id": job_id, "status": "running"},
+            {"$set": {
+                **progress,
+                "lease_expires_at": now + timedelta(seconds=lease_seconds),
+                "updated_at": now
+            }}
+        )
+        return result.modified_count > 0
+
+    def finish(self, job_id: ObjectId, status: str, resume_id: Optional[ObjectId] = None, error: Optional[str] = None) -> bool:
+        """Mark a job completed or failed"""
+        now = datetime.utcnow()
+        result = self.collection.update_one(
+            {"_id": job_id},
+            {"$set": {
+                "status": status,
+                "stage": "done",
+                "stage_times.done": now,
+                "resume_id": resume_id,
+                "error": error,
+                "lease_expires_at": None,
+                "updated_at": now
+            }}
+        )
+        return result.modified_count > 0
+
+    def fail_exhausted(self, max_attempts: int) -> int:
+        """Fail jobs whose lease expired after their last allowed attempt"""
+        now = datetime.utcnow()
+        result = self.collection.update_many(
+            {"status": "running", "lease_expires_at": {"$lt": now}, "attempts": {"$gte": max_attempts}},
+            {"$set": {
+                "status": "failed",
+                "stage": "done",
+                "stage_times.done": now,
+                "error": "Job was interrupted too many times",
+                "lease_expires_at": None,
+                "updated_at": now
+            }}
+        )
+        return result.modified_count
@@ -1,7 +1,7 @@
 from datetime import datetime
 from typing import List, Optional
 from bson import ObjectId
-from pymongo import ASCENDING, DESCENDING
+from pymongo import ASCENDING, DESCENDING, UpdateOne
 from utils.db import get_database
 
 class ResumeModel:
@@ -19,6 +19,12 @@ class ResumeModel:
         self.collection.create_index([("skills", ASCENDING)])
         self.collection.create_index([("created_at", DESCENDING)])
         self.collection.create_index([("jd_ids", ASCENDING)])
+        # Identical PDF uploads share one resume document
+        self.collection.create_index(
+            [("content_sha256", ASCENDING)],
+            unique=True,
+            partialFilterExpression={"content_sha256": {"$type": "string"}}
+        )
     
     def create(self, resume_data: dict) -> dict:
         """Create a new resume"""
@@ -28,6 +34,18 @@ class ResumeModel:
         result = self.collection.insert_one(resume_data)
         return self.get_by_id(result.inserted_id)
     
+    def create_many(self, resumes_data: List[dict]) -> List[dict]:
+        """Create several resumes with a single insert_many round-trip"""
+        if not resumes_data:
+            return []
+        now = datetime.utcnow()
+        for resume_data in resumes_data:
+            resume_data["created_at"] = now
+            resume_data["updated_at"] = now
+        # insert_many sets "_id" on each document in place
+        self.collection.insert_many(resumes_data, ordered=False)
+        return resumes_data
+    
     def get_by_id(self, resume_id: ObjectId) -> Optional[dict]:
         """Get resume by ID"""
         return self.collection.find_one({"_id": resume_id})
@@ -64,6 +82,55 @@ class ResumeModel:
         """Search resume by email"""
         return self.collection.find_one({"email": email})
     
+    def get_by_content_hash(self, content_sha256: str) -> Optional[dict]:
+        """Get resume by the SHA-256 hash of its PDF"""
+        return self.collection.find_one({"content_sha256": content_sha256})
+    
+    def get_by_content_hashes(self, content_hashes: List[str]) -> List[dict]:
+        """Get all resumes whose PDF hash is in the given list"""
+        return list(self.collection.find({"content_sha256": {"$in": content_hashes}}))
+    
+    def get_outdated(self, parser_version: str, after_id: Optional[ObjectId] = None, limit: int = 100) -> List[dict]:
+        """
+        Get resumes extracted from a stored PDF by an older parser version (or
+        none recorded), in _id order, starting after after_id (keyset pagination).
+        Resumes written by a newer parser, e.g. during a rolling deploy, are left alone.
+        """
+        # Versions are integer strings, which do not compare numerically in MongoDB,
+        # so the older ones are listed explicitly
+        older_versions = [str(version) for version in range(int(parser_version))]
+        query = {
+            "content_sha256": {"$type": "string"},
+            "$or": [
+                {"parser_version": None},
+                {"parser_version": {"$in": older_versions}}
+            ]
+        }
+        if after_id is not None:
+            query["_id"] = {"$gt": after_id}
+        cursor = self.collection.find(query, {"content_sha256": 1}).sort("_id", ASCENDING).limit(limit)
+        return list(cursor)
+    
+    def update_many_by_id(self, updates: List[tuple]) -> int:
+        """
+        Apply several $set updates with a single bulk_write round-trip.
+        
+        Args:
+            updates: List of (resume_id, update_data) tuples
+            
+        Returns:
+            Number of modified resumes
+        """
+        if not updates:
+            return 0
+        now = datetime.utcnow()
+        operations = [
+            UpdateOne({"_id": resume_id}, {"$set": {**update_data, "updated_at": now}})
+            for resume_id, update_data in updates
+        ]
+        result = self.collection.bulk_write(operations, ordered=False)
+        return result.modified_count
+    
     def search_by_skills(self, skills: List[str], skip: int = 0, limit: int = 100) -> List[dict]:
         """Search resumes by skills"""
         cursor = self.collection.find(
@@ -86,6 +153,14 @@ class ResumeModel:
         )
         return result.modified_count > 0
     
+    def add_jd_association_many(self, resume_ids: List[ObjectId], jd_id: ObjectId) -> int:
+        """Add a job description association to several resumes"""
+        result = self.collection.update_many(
+            {"_id": {"$in": resume_ids}},
+            {"$addToSet": {"jd_ids": jd_id}}
+        )
+        return result.modified_count
+    
     def remove_jd_association(self, resume_id: ObjectId, jd_id: ObjectId) -> bool:
         """Remove a job description association from a resume"""
         result = self.collection.update_one(
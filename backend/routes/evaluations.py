@@ -1,7 +1,13 @@
 from fastapi import APIRouter, HTTPException, Query, Depends
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import StreamingResponse
 from typing import List, Optional, Dict, Any
+import json
 from pydantic import BaseModel
+from bson import ObjectId
 from services.evaluation_service import EvaluationService
+from services.gemini_client import get_parse_stats
+from services.llm_backend import LLMUnavailableError
 from schemas.evaluation import EvaluationCreate, EvaluationUpdate, EvaluationResponse
 
 router = APIRouter(prefix="/api/evaluations", tags=["Evaluations"])
@@ -9,10 +15,22 @@ router = APIRouter(prefix="/api/evaluations", tags=["Evaluations"])
 class EvaluateResumeRequest(BaseModel):
     resume_id: str
     jd_id: str
+    force_refresh: bool = False
 
 def get_evaluation_service():
     return EvaluationService()
 
+def _format_sse(event: dict) -> str:
+    """Format an {"event", "data"} dict as a Server-Sent Event"""
+    return f"event: {event['event']}\ndata: {json.dumps(jsonable_encoder(event['data']))}\n\n"
+
+def _sse_response(events) -> StreamingResponse:
+    return StreamingResponse(
+        events,
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
 @router.post("/evaluate", response_model=EvaluationResponse)
 async def evaluate_resume_with_ai(
     request: EvaluateResumeRequest,
@@ -24,15 +42,103 @@ async def evaluate_resume_with_ai(
     This endpoint:
     1. Fetches the resume and job description from the database
     2. Uses Google Gemini AI to evaluate the resume against the JD
-    3. Stores the evaluation results in the database
+    3. Stores the evaluation results in the database, replacing any previous one
     4. Returns the evaluation with detailed breakdown
+    
+    If the resume, JD text, prompt and model are unchanged since the last
+    evaluation (within EVALUATION_CACHE_TTL), the stored result is returned
+    without calling Gemini; set force_refresh to re-evaluate anyway.
+    
+    Rate limit and server errors from Gemini are retried with backoff; if they
+    persist, 503 is returned with a Retry-After header when Gemini gave one.
     """
     try:
-        result = service.evaluate_resume_with_ai(request.resume_id, request.jd_id)
+        result = await service.evaluate_resume_with_ai(request.resume_id, request.jd_id, request.force_refresh)
         return result
+    except LLMUnavailableError as e:
+        headers = {"Retry-After": str(int(e.retry_after) + 1)} if e.retry_after is not None else None
+        raise HTTPException(status_code=503, detail=str(e), headers=headers)
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
+@router.post("/evaluate/stream")
+async def stream_resume_evaluation(
+    request: EvaluateResumeRequest,
+    service: EvaluationService = Depends(get_evaluation_service)
+):
+    """
+    Evaluate a resume against a job description like /evaluate, streaming
+    progress as Server-Sent Events while Gemini generates its answer:
+    - `score`: score, verdict and category_breakdown
+    - `skills`: matched_skills and missing_skills
+    - `pros_cons`: pros and cons
+    - `evaluation`: the stored evaluation (same body as /evaluate), last
+    - `error`: the evaluation failed (with detail, and retry_after when
+      Gemini is rate limited); nothing is stored
+    
+    A stored evaluation that is still fresh (or one in progress for the same
+    pair) is sent as the evaluation event alone.
+    """
+    if not ObjectId.is_valid(request.resume_id) or not ObjectId.is_valid(request.jd_id):
+        raise HTTPException(status_code=400, detail="Invalid resume or job description ID")
+    if not service.resume_model.get_by_id(ObjectId(request.resume_id)):
+        raise HTTPException(status_code=404, detail="Resume not found")
+    if not service.jd_service.get_job_description(request.jd_id):
+        raise HTTPException(status_code=404, detail="Job description not found")
+    
+    async def stream_events():
+        try:
+            async for event in service.stream_evaluation(request.resume_id, request.jd_id, request.force_refresh):
+                yield _format_sse(event)
+        except LLMUnavailableError as e:
+            yield _format_sse({"event": "error", "data": {"detail": str(e), "retry_after": e.retry_after}})
+        except Exception as e:
+            yield _format_sse({"event": "error", "data": {"detail": str(e)}})
+    
+    return _sse_response(stream_events())
+
+@router.post("/evaluate/jd/{jd_id}")
+async def evaluate_all_for_jd(
+    jd_id: str,
+    force_refresh: bool = Query(False, description="Re-evaluate resumes that already have a fresh evaluation"),
+    cascade: bool = Query(False, description="Pre-screen resumes locally and send only the most relevant to the AI model"),
+    cascade_percentile: Optional[float] = Query(None, ge=0, le=100, description="Relevance percentile a resume needs to reach the AI model in cascade mode"),
+    service: EvaluationService = Depends(get_evaluation_service)
+):
+    """
+    Evaluate every resume associated with a job description in one request
+    
+    Resumes without a fresh evaluation are evaluated in parallel (bounded by
+    EVALUATION_BATCH_CONCURRENCY) and results are streamed as Server-Sent Events
+    as each one completes:
+    - `evaluation`: a new evaluation (with candidate_name)
+    - `cached`: the stored evaluation is still fresh and was reused
+    - `provisional`: cascade mode only; the resume ranked below the relevance
+      percentile and got a stored provisional score instead of an AI evaluation
+    - `stale`: cascade mode only; the resume ranked below the percentile but
+      has an outdated AI evaluation, which is kept instead of a provisional score
+    - `error`: the resume could not be evaluated or saved (with resume_id)
+    - `done`: summary with total, evaluated, cached, stale, provisional and failed counts
+    
+    If the run itself fails, it ends with an `error` event without resume_id
+    (with retry_after when Gemini is rate limited) instead of `done`.
+    """
+    if not ObjectId.is_valid(jd_id):
+        raise HTTPException(status_code=400, detail="Invalid job description ID")
+    if not service.jd_service.get_job_description(jd_id):
+        raise HTTPException(status_code=404, detail="Job description not found")
+    
+    async def stream_events():
+        try:
+            async for event in service.evaluate_all_for_jd(jd_id, force_refresh, cascade, cascade_percentile):
+                yield _format_sse(event)
+        except LLMUnavailableError as e:
+            yield _format_sse({"event": "error", "data": {"detail": str(e), "retry_after": e.retry_after}})
+        except Exception as e:
+            yield _format_sse({"event": "error", "data": {"detail": f"Failed to evaluate resumes: {str(e)}"}})
+    
+    return _sse_response(stream_events())
+
 @router.get("/test-gemini")
 async def test_gemini_connection(
     service: EvaluationService = Depends(get_evaluation_service)
@@ -167,6 +273,15 @@ async def get_evaluation_count(
     count = service.get_evaluation_count()
     return {"count": count}
 
+@router.get("/stats/parse")
+async def get_parse_stats_endpoint():
+    """
+    Get how Gemini evaluation responses parsed since this process started:
+    parsed (valid as returned), repaired (valid after fixing truncated JSON
+    or deriving an invalid verdict from the score) and failed counts, with the failure rate
+    """
+    return get_parse_stats()
+
 @router.get("/stats/count-by-jd/{jd_id}")
 async def get_evaluation_count_by_jd(
     jd_id: str,
@@ -1,31 +1,142 @@
 from fastapi import APIRouter, HTTPException, Query, Depends, UploadFile, File, Form
+from fastapi.responses import StreamingResponse
 from typing import List, Optional
 import os
+import json
+import asyncio
 import tempfile
-import shutil
+import zipfile
+import hashlib
 from bson import ObjectId
 from services.resume_service import ResumeService
+from services.ingestion_service import IngestionService
+from services.ingestion_worker import notify_ingestion_worker
 from schemas.resume import ResumeCreate, ResumeUpdate, ResumeResponse, ResumeUploadRequest
-from utils.pdf_parser import PDFTextExtractor
-import markitdown
-from markitdown import MarkItDown
-import time
-import re
+from schemas.ingestion_job import IngestionJobResponse
+from utils.pdf_parser import PDFSource, PARSER_VERSION
+from utils.pdf_pool import run_pdf_job, PDF_PARSE_WORKERS
+from utils.pdf_store import store_pdf
+from utils.parse_cache import parse_resume_cached
 
 router = APIRouter(prefix="/api/resumes", tags=["Resumes"])
 
+# Maximum number of PDFs accepted by one bulk upload (ZIP entries included)
+BULK_UPLOAD_MAX_FILES = int(os.getenv("BULK_UPLOAD_MAX_FILES", "500"))
+# Largest PDF accepted from inside a ZIP archive, in bytes (uncompressed)
+PDF_MAX_BYTES = int(os.getenv("MAX_FILE_SIZE", str(10 * 1024 * 1024)))
+# Total uncompressed bytes read from the ZIP archives of one bulk upload
+BULK_UPLOAD_MAX_ZIP_BYTES = int(os.getenv("BULK_UPLOAD_MAX_ZIP_BYTES", str(512 * 1024 * 1024)))
+# Uploads up to this size are parsed straight from memory; larger ones go to a temp file
+PDF_SPOOL_MAX_BYTES = int(os.getenv("PDF_SPOOL_MAX_BYTES", str(20 * 1024 * 1024)))
+# Number of parsed resumes written per insert_many call
+BULK_INSERT_BATCH_SIZE = int(os.getenv("BULK_INSERT_BATCH_SIZE", "25"))
+
 def get_resume_service():
     return ResumeService()
 
-def sanitize_filename(filename: str, fallback: str) -> str:
-    # Remove path separators and non-printable characters
-    filename = os.path.basename(filename)
-    filename = re.sub(r'[^\w\-. ]', '', filename)
-    # Limit length
-    max_length = 100
-    if len(filename) > max_length or not filename:
-        filename = fallback
-    return filename
+def get_ingestion_service():
+    return IngestionService()
+
+class _UploadTooLarge(Exception):
+    """More bytes were read from an upload than allowed"""
+
+def _read_upload(source, max_bytes: Optional[int] = None) -> tuple:
+    """
+    Read a file-like object into memory, hashing the bytes as they are read.
+    Uploads larger than PDF_SPOOL_MAX_BYTES are spilled to a temporary .pdf file.
+    
+    Args:
+        source: File-like object
+        max_bytes: Stop with _UploadTooLarge after reading more than this many bytes
+    
+    Returns:
+        (payload, sha256_hexdigest) where payload is the PDF bytes or a temp file path
+    """
+    digest = hashlib.sha256()
+    buffer = bytearray()
+    temp_file = None
+    size = 0
+    try:
+        for chunk in iter(lambda: source.read(1024 * 1024), b''):
+            size += len(chunk)
+            if max_bytes is not None and size > max_bytes:
+                raise _UploadTooLarge()
+            digest.update(chunk)
+            if temp_file is None and len(buffer) + len(chunk) > PDF_SPOOL_MAX_BYTES:
+                temp_file = tempfile.NamedTemporaryFile(delete=False, suffix='.pdf')
+                temp_file.write(buffer)
+                buffer = None
+            if temp_file is not None:
+                temp_file.write(chunk)
+            else:
+                buffer.extend(chunk)
+    except Exception:
+        if temp_file is not None:
+            temp_file.close()
+            os.unlink(temp_file.name)
+        raise
+    if temp_file is not None:
+        temp_file.close()
+        return temp_file.name, digest.hexdigest()
+    return bytes(buffer), digest.hexdigest()
+
+def _spool_bulk_uploads(files: List[UploadFile]) -> List[tuple]:
+    """
+    Read every uploaded PDF, and every PDF inside uploaded ZIP archives (see
+    _read_upload). Returns a list of (filename, payload, sha256) tuples.
+    
+    ZIP entries are limited to PDF_MAX_BYTES each and BULK_UPLOAD_MAX_ZIP_BYTES
+    in total. Sizes are checked against the archive's headers up front and
+    against the bytes actually decompressed while reading, so a zip bomb is
+    rejected without filling memory or disk. Blocking; run it in a thread.
+    """
+    spooled = []
+    zip_bytes_left = BULK_UPLOAD_MAX_ZIP_BYTES
+    try:
+        for file in files:
+            name = file.filename or ''
+            if name.lower().endswith('.pdf'):
+                spooled.append((name, *_read_upload(file.file)))
+            elif name.lower().endswith('.zip'):
+                try:
+                    with zipfile.ZipFile(file.file) as archive:
+                        for info in archive.infolist():
+                            entry_name = os.path.basename(info.filename)
+                            if info.is_dir() or info.filename.startswith('__MACOSX/') or not entry_name.lower().endswith('.pdf'):
+                                continue
+                            if len(spooled) > BULK_UPLOAD_MAX_FILES:
+                                break
+                            if info.file_size > PDF_MAX_BYTES:
+                                raise _UploadTooLarge()
+                            if info.file_size > zip_bytes_left:
+                                raise HTTPException(status_code=413, detail=f"ZIP archives may hold at most {BULK_UPLOAD_MAX_ZIP_BYTES} bytes of PDFs in total")
+                            try:
+                                with archive.open(info) as entry:
+                                    payload, sha = _read_upload(entry, min(PDF_MAX_BYTES, zip_bytes_left))
+                            except _UploadTooLarge:
+                                if zip_bytes_left < PDF_MAX_BYTES:
+                                    raise HTTPException(status_code=413, detail=f"ZIP archives may hold at most {BULK_UPLOAD_MAX_ZIP_BYTES} bytes of PDFs in total")
+                                raise
+                            spooled.append((entry_name, payload, sha))
+                            zip_bytes_left -= len(payload) if isinstance(payload, bytes) else os.path.getsize(payload)
+                except zipfile.BadZipFile:
+                    raise HTTPException(status_code=400, detail=f"Invalid ZIP archive: {name}")
+                except _UploadTooLarge:
+                    raise HTTPException(status_code=413, detail=f"PDFs in ZIP archives may be at most {PDF_MAX_BYTES} bytes: {name}")
+            else:
+                raise HTTPException(status_code=400, detail=f"Only PDF or ZIP files are allowed: {name}")
+            if len(spooled) > BULK_UPLOAD_MAX_FILES:
+                raise HTTPException(status_code=400, detail=f"At most {BULK_UPLOAD_MAX_FILES} PDFs can be uploaded at once")
+    except Exception:
+        _remove_temp_files([payload for _, payload, _ in spooled])
+        raise
+    return spooled
+
+def _remove_temp_files(payloads: list):
+    """Delete the temporary files among upload payloads (in-memory payloads are skipped)"""
+    for payload in payloads:
+        if isinstance(payload, str) and os.path.exists(payload):
+            os.unlink(payload)
 
 @router.post("/upload", response_model=ResumeResponse)
 async def upload_resume(
@@ -41,71 +152,28 @@ async def upload_resume(
         if not file.filename.lower().endswith('.pdf'):
             raise HTTPException(status_code=400, detail="Only PDF files are allowed")
         
-        # Create temporary file
-        with tempfile.NamedTemporaryFile(delete=False, suffix='.pdf') as temp_file:
-            shutil.copyfileobj(file.file, temp_file)
-            temp_file_path = temp_file.name
+        # Keep the PDF in memory (spilled to a temporary file only if very large)
+        payload, content_sha256 = await asyncio.to_thread(_read_upload, file.file)
         
         try:
-            # Validate PDF file
-            if not PDFTextExtractor.validate_pdf_file(temp_file_path):
+            # Identical bytes were uploaded before: reuse that resume without parsing
+            existing = service.reuse_existing_upload(content_sha256, jd_id)
+            if existing:
+                return existing
+            
+            # Parse the PDF in the worker pool so the event loop stays free
+            try:
+                parsed = await run_pdf_job(parse_resume_cached, payload, content_sha256)
+            except asyncio.TimeoutError:
+                raise HTTPException(status_code=422, detail="Timed out while parsing PDF")
+            if not parsed['valid']:
                 raise HTTPException(status_code=400, detail="Invalid PDF file")
             
-            # Extract text from PDF
-            raw_text = PDFTextExtractor.extract_text(temp_file_path)
-            if not raw_text:
+            if not parsed['text']:
                 raise HTTPException(status_code=400, detail="Could not extract text from PDF")
             
-            # Convert PDF to markdown using markitdown (pass file path, not raw text)
-            md = MarkItDown()
-            result = md.convert(temp_file_path)
-            markdown_text = result.text_content
-            
-            # Extract basic info if not provided
-            extracted_name, extracted_email = PDFTextExtractor.extract_basic_info(raw_text)
-            
-            # Extract hyperlinks from PDF
-            links = PDFTextExtractor.extract_links(temp_file_path)
-            # Post-process links: strip 'mailto:' and set email if not present
-            processed_links = []
-            email_from_link = None
-            if links:
-                for link in links:
-                    if link['type'] == 'email' and link['url'].startswith('mailto:'):
-                        email_addr = link['url'][7:]
-                        processed_links.append({'type': 'email', 'url': email_addr})
-                        if email_from_link is None:
-                            email_from_link = email_addr
-                    else:
-                        processed_links.append(link)
-            else:
-                processed_links = []
-                email_from_link = None
-            
-            # Use provided values or extracted values
-            final_name = candidate_name or extracted_name or "Unknown Candidate"
-            final_email = email or extracted_email or email_from_link or "unknown@example.com"
-            
-            # Determine filename
-            fallback_name = f"{final_name.replace(' ', '_')}_{int(time.time())}.pdf"
-            safe_filename = sanitize_filename(file.filename, fallback_name) if file.filename else fallback_name
-            
-            # Extract education entries from raw_text
-            education = PDFTextExtractor.extract_education(raw_text)
-            
             # Create resume data
-            resume_data = ResumeCreate(
-                candidate_name=final_name,
-                email=final_email,
-                skills=[],  # Empty for now as requested
-                education=education,
-                experience=[],
-                raw_text=raw_text,
-                markdown_text=markdown_text,
-                jd_ids=[ObjectId(jd_id)],
-                filename=safe_filename,
-                links=processed_links
-            )
+            resume_data = service.build_resume_from_pdf(parsed, jd_id, file.filename, candidate_name, email, content_sha256)
             
             # Save resume
             result = service.create_resume(resume_data)
@@ -113,15 +181,204 @@ async def upload_resume(
             return result
             
         finally:
-            # Clean up temporary file
-            if os.path.exists(temp_file_path):
-                os.unlink(temp_file_path)
+            # Clean up temporary file, if the upload was spilled to disk
+            _remove_temp_files([payload])
                 
     except HTTPException:
         raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to process resume: {str(e)}")
 
+@router.post("/upload/async", response_model=IngestionJobResponse, status_code=202)
+async def upload_resume_async(
+    file: UploadFile = File(..., description="PDF resume file"),
+    jd_id: str = Form(..., description="Selected job description ID"),
+    candidate_name: Optional[str] = Form(None, description="Candidate's full name (optional)"),
+    email: Optional[str] = Form(None, description="Candidate's email address (optional)"),
+    service: IngestionService = Depends(get_ingestion_service)
+):
+    """
+    Upload a PDF resume for background processing.
+    
+    The PDF is stored and an ingestion job is queued; the response returns
+    immediately with the job, whose progress is available at
+    GET /api/resumes/jobs/{job_id}.
+    """
+    try:
+        # Validate file type
+        if not file.filename.lower().endswith('.pdf'):
+            raise HTTPException(status_code=400, detail="Only PDF files are allowed")
+        if not ObjectId.is_valid(jd_id):
+            raise HTTPException(status_code=400, detail="Invalid job description ID")
+        
+        payload, content_sha256 = await asyncio.to_thread(_read_upload, file.file)
+        try:
+            await asyncio.to_thread(store_pdf, content_sha256, payload)
+        finally:
+            _remove_temp_files([payload])
+        
+        job = service.create_job(content_sha256, jd_id, file.filename, candidate_name, email)
+        notify_ingestion_worker()
+        return job
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to queue resume: {str(e)}")
+
+@router.get("/jobs/{job_id}", response_model=IngestionJobResponse)
+async def get_ingestion_job(
+    job_id: str,
+    service: IngestionService = Depends(get_ingestion_service)
+):
+    """Get the status and stage-level progress of an async upload"""
+    job = service.get_job(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Ingestion job not found")
+    return job
+
+@router.post("/upload/bulk")
+async def upload_resumes_bulk(
+    files: List[UploadFile] = File(..., description="PDF resume files and/or ZIP archives of PDFs"),
+    jd_id: str = Form(..., description="Selected job description ID"),
+    service: ResumeService = Depends(get_resume_service)
+):
+    """
+    Upload many PDF resumes (or ZIP archives of PDFs) for one job description.
+    
+    Files are parsed in parallel and the response streams one NDJSON line per
+    file as soon as its result is known, followed by a final summary line.
+    Parsed resumes are written in batches with insert_many; PDFs that were
+    uploaded before are reported as duplicates and only associated with the JD.
+    """
+    if not ObjectId.is_valid(jd_id):
+        raise HTTPException(status_code=400, detail="Invalid job description ID")
+    
+    # Uploads are closed once this handler returns, so spool them before streaming
+    spooled = await asyncio.to_thread(_spool_bulk_uploads, files)
+    if not spooled:
+        raise HTTPException(status_code=400, detail="No PDF files found in upload")
+    
+    # PDFs uploaded before are only associated with the JD; within this request
+    # each distinct PDF is parsed once and its copies share the resulting resume
+    try:
+        reused = service.reuse_existing_uploads(list({sha for _, _, sha in spooled}), jd_id)
+    except Exception:
+        _remove_temp_files([payload for _, payload, _ in spooled])
+        raise
+    to_parse = {}
+    copies = {}
+    for filename, payload, sha in spooled:
+        if sha in reused:
+            continue
+        if sha in to_parse:
+            copies.setdefault(sha, []).append(filename)
+        else:
+            to_parse[sha] = (filename, payload)
+    
+    def result_line(filename: str, status: str, resume: Optional[ResumeResponse] = None, detail: Optional[str] = None) -> dict:
+        if resume is not None:
+            return {"filename": filename, "status": status, "resume_id": resume.id, "candidate_name": resume.candidate_name}
+        return {"filename": filename, "status": status, "detail": detail}
+    
+    async def parse_one(semaphore: asyncio.Semaphore, sha: str, filename: str, payload: PDFSource) -> tuple:
+        async with semaphore:
+            try:
+                parsed = await run_pdf_job(parse_resume_cached, payload, sha)
+            except asyncio.TimeoutError:
+                return sha, filename, None, "Timed out while parsing PDF"
+            except Exception as e:
+                return sha, filename, None, f"Failed to process resume: {str(e)}"
+        if not parsed['valid']:
+            return sha, filename, None, "Invalid PDF file"
+        if not parsed['text']:
+            return sha, filename, None, "Could not extract text from PDF"
+        return sha, filename, parsed, None
+    
+    def flush(batch: List[tuple]) -> List[dict]:
+        if not batch:
+            return []
+        try:
+            created = service.create_resumes([resume for _, _, resume in batch])
+        except Exception as e:
+            lines = []
+            for sha, filename, _ in batch:
+                for name in [filename] + copies.get(sha, []):
+                    lines.append(result_line(name, "error", detail=f"Failed to save resume: {str(e)}"))
+            return lines
+        lines = []
+        for (sha, filename, _), resume in zip(batch, created):
+            lines.append(result_line(filename, "created", resume))
+            lines.extend(result_line(name, "duplicate", resume) for name in copies.get(sha, []))
+        return lines
+    
+    async def stream_results():
+        # Keep only as many jobs in flight as there are workers, so queued
+        # files do not burn through their parse timeout while waiting
+        semaphore = asyncio.Semaphore(max(PDF_PARSE_WORKERS, 1))
+        tasks = [
+            asyncio.create_task(parse_one(semaphore, sha, filename, payload))
+            for sha, (filename, payload) in to_parse.items()
+        ]
+        counts = {"created": 0, "duplicate": 0, "error": 0}
+        batch = []
+        try:
+            lines = [result_line(filename, "duplicate", reused[sha]) for filename, _, sha in spooled if sha in reused]
+            for next_done in asyncio.as_completed(tasks):
+                sha, filename, parsed, error = await next_done
+                if error is None:
+                    try:
+                        batch.append((sha, filename, service.build_resume_from_pdf(parsed, jd_id, filename, content_sha256=sha)))
+                    except Exception as e:
+                        error = f"Failed to process resume: {str(e)}"
+                if error is not None:
+                    lines.extend(result_line(name, "error", detail=error) for name in [filename] + copies.get(sha, []))
+                if len(batch) >= BULK_INSERT_BATCH_SIZE:
+                    lines.extend(flush(batch))
+                    batch = []
+                for line in lines:
+                    counts[line["status"]] += 1
+                    yield json.dumps(line) + "\n"
+                lines = []
+            lines.extend(flush(batch))
+            for line in lines:
+                counts[line["status"]] += 1
+                yield json.dumps(line) + "\n"
+            yield json.dumps({
+                "status": "done",
+                "total": len(spooled),
+                "created": counts["created"],
+                "duplicate": counts["duplicate"],
+                "failed": counts["error"]
+            }) + "\n"
+        finally:
+            for task in tasks:
+                task.cancel()
+            _remove_temp_files([payload for _, payload, _ in spooled])
+    
+    return StreamingResponse(stream_results(), media_type="application/x-ndjson")
+
+@router.post("/reprocess", response_model=IngestionJobResponse, status_code=202)
+async def reprocess_resumes(
+    limit: int = Query(0, ge=0, description="Maximum number of resumes to check (0 = all outdated resumes)"),
+    service: IngestionService = Depends(get_ingestion_service)
+):
+    """
+    Queue re-extraction of resumes whose parser_version is older than the
+    current parser, from their stored PDFs, so parser upgrades need no
+    re-upload.
+    
+    The work is done by the ingestion worker; the response returns the job,
+    whose counts are updated after every page at GET /api/resumes/jobs/{job_id}.
+    While a reprocess job is queued or running, that job is returned instead.
+    """
+    try:
+        job = service.create_reprocess_job(PARSER_VERSION, limit)
+        notify_ingestion_worker()
+        return job
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to queue reprocessing: {str(e)}")
+
 @router.post("/", response_model=ResumeResponse)
 async def create_resume(
     resume: ResumeCreate,
@@ -1,5 +1,5 @@
-from pydantic import BaseModel, Field
-from typing import Optional, List, Dict, Any
+from pydantic import BaseModel, Field, field_validator, ValidationInfo
+from typing import Optional, List, Dict, Any, Literal
 from datetime import datetime
 from .base import PyObjectId, BaseSchema, TimestampSchema
 
@@ -20,6 +20,57 @@ class EvaluationBase(BaseModel):
     pros: List[str] = Field(default=[], description="Positive aspects of the candidate")
     cons: List[str] = Field(default=[], description="Areas for improvement")
     feedback: str = Field(..., description="Detailed feedback and recommendations")
+    cache_key: Optional[str] = Field(None, description="Hash of the evaluation inputs (resume, JD text, prompt version, model)")
+    provisional: bool = Field(False, description="Score estimated by lexical pre-screening instead of the AI model")
+
+class EvaluationResult(BaseModel):
+    """
+    The part of EvaluationBase produced by the model. Used as the Gemini
+    response schema and to validate its output in one pass; slightly
+    out-of-range values are clamped and an unknown verdict is derived from
+    the score bands rather than discarding the response. When validated with
+    a context holding a "repairs" list, the names of derived fields are
+    appended to it.
+    """
+    score: float = Field(..., ge=0, le=100, description="Overall evaluation score (0-100)")
+    verdict: Literal['Shortlist', 'Needs Review', 'Reject'] = Field(..., description="Shortlist (80-100), Needs Review (50-79) or Reject (0-49)")
+    category_breakdown: CategoryBreakdown = Field(..., description="Breakdown of scores by category")
+    matched_skills: List[str] = Field(default=[], description="Skills that match the job description")
+    missing_skills: List[str] = Field(default=[], description="Skills missing from the resume")
+    pros: List[str] = Field(default=[], description="Positive aspects of the candidate")
+    cons: List[str] = Field(default=[], description="Areas for improvement")
+    feedback: str = Field(..., description="Detailed feedback and recommendations")
+
+    @field_validator('score', mode='before')
+    @classmethod
+    def clamp_score(cls, value):
+        if isinstance(value, (int, float)):
+            return max(0, min(100, value))
+        return value
+
+    @field_validator('verdict', mode='before')
+    @classmethod
+    def default_verdict(cls, value, info: ValidationInfo):
+        if value in ('Shortlist', 'Needs Review', 'Reject'):
+            return value
+        score = info.data.get('score')
+        if score is None:
+            # The score is invalid too, so the result fails validation anyway
+            return value
+        if isinstance(info.context, dict) and isinstance(info.context.get('repairs'), list):
+            info.context['repairs'].append('verdict')
+        return verdict_for_score(score)
+
+def verdict_for_score(score: float) -> str:
+    """Verdict of a score band: Shortlist (80-100), Needs Review (50-79) or Reject (0-49)"""
+    if score >= 80:
+        return 'Shortlist'
+    if score >= 50:
+        return 'Needs Review'
+    return 'Reject'
+
+class PackedEvaluationResult(EvaluationResult):
+    candidate_id: int = Field(..., description="Number of the candidate in the packed prompt")
 
 class EvaluationCreate(EvaluationBase):
     pass
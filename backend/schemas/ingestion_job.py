@@ -0,0 +1,26 @@
+from pydantic import BaseModel, Field
+from typing import Optional, Dict
+from datetime import datetime
+
+class IngestionJobResponse(BaseModel):
+    id: str = Field(alias="_id")
+    kind: str = Field("ingest", description="ingest (one uploaded PDF) or reprocess (re-extract outdated resumes)")
+    status: str = Field(..., description="queued, running, completed or failed")
+    stage: str = Field(..., description="Current stage: queued, parsing, saving, reprocessing or done")
+    stage_times: Dict[str, datetime] = Field(default={}, description="When each stage was entered")
+    filename: Optional[str] = Field(None, description="Uploaded file name")
+    jd_id: Optional[str] = Field(None, description="Job description ID the resume is uploaded for")
+    content_sha256: Optional[str] = Field(None, description="SHA-256 hash of the uploaded PDF bytes")
+    parser_version: Optional[str] = Field(None, description="Parser version resumes are brought up to (reprocess jobs)")
+    limit: Optional[int] = Field(None, description="Maximum number of resumes to check, 0 = all (reprocess jobs)")
+    counts: Optional[Dict[str, int]] = Field(None, description="Resumes checked, reprocessed, missing_pdf and failed so far (reprocess jobs)")
+    attempts: int = Field(0, description="Number of times a worker picked up the job")
+    resume_id: Optional[str] = Field(None, description="ID of the created (or reused) resume")
+    error: Optional[str] = Field(None, description="Failure reason")
+    created_at: datetime
+    updated_at: datetime
+
+    model_config = {
+        "populate_by_name": True,
+        "arbitrary_types_allowed": True
+    }
@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field
-from typing import Optional
+from typing import List, Optional
 from datetime import datetime
 from .base import PyObjectId, BaseSchema, TimestampSchema
 
@@ -16,9 +16,11 @@ class JobDescriptionUpdate(BaseModel):
 
 class JobDescriptionInDB(JobDescriptionBase, TimestampSchema):
     id: PyObjectId = Field(default_factory=PyObjectId, alias="_id")
+    skills: List[str] = Field(default=[], description="Skills extracted from jd_text")
 
 class JobDescriptionResponse(JobDescriptionBase):
     id: str = Field(alias="_id")
+    skills: List[str] = Field(default=[], description="Skills extracted from jd_text")
     created_at: datetime
     updated_at: datetime
     
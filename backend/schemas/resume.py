@@ -27,6 +27,9 @@ class ResumeBase(BaseModel):
     markdown_text: Optional[str] = None
     filename: Optional[str] = None
     links: Optional[List[Dict[str, str]]] = Field(default=None, description="List of extracted links (type, url)")
+    content_sha256: Optional[str] = Field(None, description="SHA-256 hash of the uploaded PDF bytes")
+    text_truncated: bool = Field(False, description="Whether text extraction stopped early at the page, size or time budget")
+    parser_version: Optional[str] = Field(None, description="Version of the PDF parser that extracted this resume")
 
 class ResumeCreate(ResumeBase):
     jd_ids: List[PyObjectId] = Field(default=[], description="List of job description IDs")
@@ -1,20 +1,76 @@
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, AsyncIterator, Tuple
 from bson import ObjectId
 from models.evaluation import EvaluationModel
+from models.evaluation_lease import EvaluationLeaseModel
 from schemas.evaluation import EvaluationCreate, EvaluationUpdate, EvaluationResponse
+import os
+import asyncio
 import logging
+from datetime import datetime, timedelta
+from cachetools import TTLCache
 from models.resume import ResumeModel
 from services.job_description_service import JobDescriptionService
-from services.gemini_client import GeminiClient
+from services.llm_backend import LLM_BACKEND, get_llm_backend
+from utils.relevance import bm25_scores
+import numpy as np
 
 logger = logging.getLogger(__name__)
 
+# Seconds an evaluation is reused for unchanged inputs before Gemini is asked again
+EVALUATION_CACHE_TTL = int(os.getenv("EVALUATION_CACHE_TTL", str(7 * 24 * 3600)))
+# Maximum number of Gemini results kept in memory (least recently used are evicted)
+EVALUATION_CACHE_SIZE = int(os.getenv("EVALUATION_CACHE_SIZE", "1024"))
+
+# Gemini requests (packs of up to GEMINI_PACK_SIZE resumes) run concurrently by one
+# evaluate-all-for-JD run
+EVALUATION_BATCH_CONCURRENCY = int(os.getenv("EVALUATION_BATCH_CONCURRENCY", "8"))
+# Evaluations written per bulk upsert during an evaluate-all-for-JD run
+EVALUATION_BATCH_WRITE_SIZE = int(os.getenv("EVALUATION_BATCH_WRITE_SIZE", "20"))
+
+# Cascade runs send only resumes at or above this percentile of lexical relevance
+# to the JD to Gemini; the rest get a provisional score
+EVALUATION_CASCADE_PERCENTILE = float(os.getenv("EVALUATION_CASCADE_PERCENTILE", "80"))
+# Cascade runs evaluate every resume with Gemini when the JD has fewer resumes than this
+EVALUATION_CASCADE_MIN_RESUMES = int(os.getenv("EVALUATION_CASCADE_MIN_RESUMES", "20"))
+
+# Seconds one process may hold the lease on a (JD, resume) pair while evaluating it;
+# other processes wait for its result, or take over once the lease expires
+EVALUATION_LEASE_SECONDS = float(os.getenv("EVALUATION_LEASE_SECONDS", "180"))
+# Seconds between checks for the result while another process holds the lease
+EVALUATION_LEASE_POLL_INTERVAL = float(os.getenv("EVALUATION_LEASE_POLL_INTERVAL", "0.5"))
+
+# Provisional scores stay in the Reject band (below 50)
+_PROVISIONAL_MAX_SCORE = 49
+
+# Progress events of a streamed evaluation and the result fields each carries
+_STREAM_PROGRESS = (
+    ("score", ("score", "verdict", "category_breakdown")),
+    ("skills", ("matched_skills", "missing_skills")),
+    ("pros_cons", ("pros", "cons")),
+)
+
+# Gemini results by evaluation cache key, shared by all requests in this process
+_evaluation_cache: TTLCache = TTLCache(maxsize=EVALUATION_CACHE_SIZE, ttl=EVALUATION_CACHE_TTL)
+# Evaluations in progress in this process by (jd_id, resume_id): tasks of single
+# evaluations and futures of pairs being evaluated by evaluate_all_for_jd runs
+_inflight_evaluations: Dict[Tuple[str, str], asyncio.Future] = {}
+
+def _forget_inflight(key: Tuple[str, str], task: asyncio.Future):
+    """Done callback removing a finished evaluation from _inflight_evaluations"""
+    if _inflight_evaluations.get(key) is task:
+        del _inflight_evaluations[key]
+    # Mark the exception retrieved in case every caller went away before it finished
+    if not task.cancelled():
+        task.exception()
+
 class EvaluationService:
     def __init__(self):
         self.model = EvaluationModel()
+        self.lease_model = EvaluationLeaseModel()
         self.resume_model = ResumeModel()
         self.jd_service = JobDescriptionService()
-        self.gemini_client = GeminiClient()
+        # Gemini, or the local fake when LLM_BACKEND=fake
+        self.llm_backend = get_llm_backend()
     
     def _convert_objectids_to_strings(self, data: dict) -> dict:
         """Convert ObjectIds to strings in the data dictionary"""
@@ -157,29 +213,39 @@ class EvaluationService:
         except Exception:
             return 0 
 
-    def evaluate_resume_with_ai(self, resume_id: str, jd_id: str) -> EvaluationResponse:
-        """
-        Evaluate a resume against a job description using Gemini AI.
-        Uses markdown_text if available, otherwise falls back to raw_text.
-        """
-        # Fetch resume and job description
-        resume = self.resume_model.get_by_id(ObjectId(resume_id))
-        if not resume:
-            raise Exception("Resume not found")
-        jd = self.jd_service.get_job_description(jd_id)
-        if not jd:
-            raise Exception("Job description not found")
+    def test_gemini_connection(self) -> dict:
+        """Test the connection to the configured LLM backend"""
+        connected = self.llm_backend.test_connection()
+        return {
+            "backend": LLM_BACKEND,
+            "status": "connected" if connected else "failed"
+        }
 
-        # Use markdown_text if available, else raw_text
+    def _prepare_resume_for_ai(self, resume: dict) -> dict:
+        """Use markdown_text if available, else raw_text, as the resume text sent to Gemini"""
         resume_for_ai = dict(resume)
         resume_for_ai['raw_text'] = resume.get('markdown_text') or resume.get('raw_text') or ''
-        jd_text = getattr(jd, 'jd_text', None) or jd.jd_text if hasattr(jd, 'jd_text') else jd.get('jd_text', '')
-
-        # Call Gemini
-        evaluation_result = self.gemini_client.evaluate_resume_with_jd(resume_for_ai, jd_text)
-
-        # Prepare evaluation data for storage
-        evaluation_data = EvaluationCreate(
+        return resume_for_ai
+    
+    def _is_fresh(self, evaluation: Optional[dict], cache_key: str) -> bool:
+        """Whether a stored evaluation was made from the same inputs within EVALUATION_CACHE_TTL"""
+        return bool(
+            evaluation and evaluation.get('cache_key') == cache_key
+            and evaluation['evaluated_at'] > datetime.utcnow() - timedelta(seconds=EVALUATION_CACHE_TTL)
+        )
+    
+    async def _get_evaluation_result(self, resume_for_ai: dict, jd_id: str, jd_text: str, cache_key: str, force_refresh: bool) -> dict:
+        """Get the Gemini result for the given inputs, from the in-memory cache when possible"""
+        evaluation_result = None if force_refresh else _evaluation_cache.get(cache_key)
+        if evaluation_result is None:
+            # Call Gemini
+            evaluation_result = await self.llm_backend.aevaluate_resume_with_jd(resume_for_ai, jd_text, str(jd_id))
+            _evaluation_cache[cache_key] = evaluation_result
+        return evaluation_result
+    
+    def _build_evaluation(self, resume_id: str, jd_id: str, evaluation_result: dict, cache_key: str) -> EvaluationCreate:
+        """Prepare evaluation data for storage"""
+        return EvaluationCreate(
             resume_id=str(resume_id),
             jd_id=str(jd_id),
             score=evaluation_result.get('score', 0),
@@ -190,5 +256,513 @@ class EvaluationService:
             pros=evaluation_result.get('pros', []),
             cons=evaluation_result.get('cons', []),
             feedback=evaluation_result.get('feedback', ''),
+            cache_key=cache_key,
         )
-        return self.create_evaluation(evaluation_data) 
\ No newline at end of file
+    
+    async def evaluate_resume_with_ai(self, resume_id: str, jd_id: str, force_refresh: bool = False) -> EvaluationResponse:
+        """
+        Evaluate a resume against a job description using Gemini AI.
+        Uses markdown_text if available, otherwise falls back to raw_text.
+        The Gemini call is awaited, so the event loop keeps serving other requests.
+        
+        Evaluations are cached by a hash of the resume, jd_text, prompt version
+        and model: while that hash is unchanged and younger than
+        EVALUATION_CACHE_TTL, the stored (or in-memory) result is returned
+        without calling Gemini. force_refresh always calls Gemini.
+        
+        Concurrent calls for the same pair are coalesced: within this process
+        they all await one evaluation (a force_refresh call joining one in
+        progress gets its result), and across processes a lease lets one call
+        Gemini while the others wait for its stored result.
+        """
+        key = (str(jd_id), str(resume_id))
+        task = _inflight_evaluations.get(key)
+        if task is not None:
+            return await self._join_inflight(task, resume_id, jd_id)
+        task = asyncio.ensure_future(self._evaluate_resume_with_ai(resume_id, jd_id, force_refresh))
+        _inflight_evaluations[key] = task
+        task.add_done_callback(lambda done: _forget_inflight(key, done))
+        # Shielded so a caller that disconnects does not cancel the evaluation for the others
+        return await asyncio.shield(task)
+    
+    async def _join_inflight(self, task: asyncio.Future, resume_id: str, jd_id: str) -> EvaluationResponse:
+        """
+        Await an evaluation of the pair already in progress in this process.
+        Runs of evaluate_all_for_jd store their results in bulk and resolve the
+        pair's future with None, so the stored evaluation is read back then.
+        """
+        logger.info(f"Joining in-progress evaluation of resume {resume_id} for JD {jd_id}")
+        # Shielded so a caller that disconnects does not cancel the evaluation for the others
+        evaluation = await asyncio.shield(task)
+        if evaluation is None:
+            evaluation = self.get_evaluation_by_jd_and_resume(jd_id, resume_id)
+            if evaluation is None:
+                raise Exception("Evaluation not found after it was stored")
+        return evaluation
+    
+    def _get_stored_evaluation(self, jd_id: str, resume_id: str, cache_key: str, since: Optional[datetime] = None) -> Optional[EvaluationResponse]:
+        """The stored evaluation of a pair if it is fresh for cache_key (and made after since, if given)"""
+        existing = self.model.get_by_jd_and_resume(ObjectId(jd_id), ObjectId(resume_id))
+        if self._is_fresh(existing, cache_key) and (since is None or existing['evaluated_at'] >= since):
+            return EvaluationResponse(**self._convert_objectids_to_strings(existing))
+        return None
+    
+    def _load_evaluation_inputs(self, resume_id: str, jd_id: str) -> Tuple[dict, str, str]:
+        """Fetch the resume and JD of a pair; return (resume_for_ai, jd_text, cache_key)"""
+        resume = self.resume_model.get_by_id(ObjectId(resume_id))
+        if not resume:
+            raise Exception("Resume not found")
+        jd = self.jd_service.get_job_description(jd_id)
+        if not jd:
+            raise Exception("Job description not found")
+
+        resume_for_ai = self._prepare_resume_for_ai(resume)
+        jd_text = jd.jd_text
+        cache_key = self.llm_backend.evaluation_cache_key(resume_for_ai, jd_text)
+        return resume_for_ai, jd_text, cache_key
+    
+    async def _acquire_lease(self, jd_id: str, resume_id: str, owner: str, cache_key: str, force_refresh: bool) -> Optional[EvaluationResponse]:
+        """
+        Take the lease on a pair for owner, waiting while another process holds
+        it. If that process stores the same evaluation in the meantime, its
+        result is returned and the lease is not held; otherwise None is
+        returned once the lease is held.
+        """
+        # A forced refresh only accepts results made after it was requested
+        since = datetime.utcnow() if force_refresh else None
+        waited = False
+        while not self.lease_model.acquire(jd_id, resume_id, owner, EVALUATION_LEASE_SECONDS):
+            # Another process is evaluating this pair; use its result once stored
+            waited = True
+            await asyncio.sleep(EVALUATION_LEASE_POLL_INTERVAL)
+            stored = self._get_stored_evaluation(jd_id, resume_id, cache_key, since)
+            if stored:
+                logger.info(f"Using evaluation of resume {resume_id} for JD {jd_id} made by another process")
+                return stored
+        if waited:
+            # The other process may have stored its result just before releasing the lease
+            stored = self._get_stored_evaluation(jd_id, resume_id, cache_key, since)
+            if stored:
+                self.lease_model.release(jd_id, resume_id, owner)
+                return stored
+        return None
+    
+    def _save_evaluation(self, resume_id: str, jd_id: str, evaluation_result: dict, cache_key: str) -> EvaluationResponse:
+        """Store a model result as the evaluation of its pair, replacing any previous one"""
+        evaluation_data = self._build_evaluation(resume_id, jd_id, evaluation_result, cache_key)
+        result = self.model.upsert_by_jd_and_resume(evaluation_data.dict())
+        return EvaluationResponse(**self._convert_objectids_to_strings(result))
+    
+    async def _evaluate_resume_with_ai(self, resume_id: str, jd_id: str, force_refresh: bool) -> EvaluationResponse:
+        """Evaluate one pair under its cross-process lease (see evaluate_resume_with_ai)"""
+        resume_for_ai, jd_text, cache_key = self._load_evaluation_inputs(resume_id, jd_id)
+
+        if not force_refresh:
+            # Stored evaluation of this pair made from the same inputs
+            stored = self._get_stored_evaluation(jd_id, resume_id, cache_key)
+            if stored:
+                logger.info(f"Reusing stored evaluation for resume {resume_id} and JD {jd_id}")
+                return stored
+
+        owner = str(ObjectId())
+        stored = await self._acquire_lease(jd_id, resume_id, owner, cache_key, force_refresh)
+        if stored:
+            return stored
+        try:
+            evaluation_result = await self._get_evaluation_result(resume_for_ai, jd_id, jd_text, cache_key, force_refresh)
+            return self._save_evaluation(resume_id, jd_id, evaluation_result, cache_key)
+        finally:
+            self.lease_model.release(jd_id, resume_id, owner)
+    
+    async def stream_evaluation(self, resume_id: str, jd_id: str, force_refresh: bool = False) -> AsyncIterator[dict]:
+        """
+        Evaluate a resume like evaluate_resume_with_ai, yielding progress while
+        the model generates its answer. Events, in the order the model
+        completes them (score first with the default response schema):
+        - score: score, verdict and category_breakdown
+        - skills: matched_skills and missing_skills
+        - pros_cons: pros and cons
+        - evaluation: the stored EvaluationResponse, last
+        A partial field is complete once the model has started the next one.
+        When a stored, in-memory or in-progress evaluation is reused, only the
+        evaluation event is sent. The evaluation is only stored after the
+        model's full answer has been validated.
+        """
+        task = _inflight_evaluations.get((str(jd_id), str(resume_id)))
+        if task is not None:
+            yield {"event": "evaluation", "data": await self._join_inflight(task, resume_id, jd_id)}
+            return
+
+        resume_for_ai, jd_text, cache_key = self._load_evaluation_inputs(resume_id, jd_id)
+        if not force_refresh:
+            stored = self._get_stored_evaluation(jd_id, resume_id, cache_key)
+            if stored:
+                logger.info(f"Reusing stored evaluation for resume {resume_id} and JD {jd_id}")
+                yield {"event": "evaluation", "data": stored}
+                return
+
+        owner = str(ObjectId())
+        stored = await self._acquire_lease(jd_id, resume_id, owner, cache_key, force_refresh)
+        if stored:
+            yield {"event": "evaluation", "data": stored}
+            return
+        try:
+            evaluation_result = None if force_refresh else _evaluation_cache.get(cache_key)
+            if evaluation_result is None:
+                sent = set()
+                async for output in self.llm_backend.astream_evaluate_resume_with_jd(resume_for_ai, jd_text, str(jd_id)):
+                    if "result" in output:
+                        evaluation_result = output["result"]
+                        # Sections the model finished with the last chunk
+                        for event in self._progress_events(evaluation_result, sent, final=True):
+                            yield event
+                    else:
+                        for event in self._progress_events(output["partial"], sent, final=False):
+                            yield event
+                if evaluation_result is None:
+                    raise Exception("Failed to evaluate resume: the model returned no result")
+                _evaluation_cache[cache_key] = evaluation_result
+            yield {"event": "evaluation", "data": self._save_evaluation(resume_id, jd_id, evaluation_result, cache_key)}
+        finally:
+            self.lease_model.release(jd_id, resume_id, owner)
+    
+    def _progress_events(self, output: dict, sent: set, final: bool) -> List[dict]:
+        """
+        Progress events of stream_evaluation for the field groups in
+        _STREAM_PROGRESS that are complete in output and not yet in sent (which
+        is updated). In partial output every field but the last one received
+        is complete; in the final result all fields are.
+        """
+        keys = list(output)
+        events = []
+        for event, fields in _STREAM_PROGRESS:
+            if event in sent:
+                continue
+            if all(field in output and (final or keys.index(field) < len(keys) - 1) for field in fields):
+                sent.add(event)
+                events.append({"event": event, "data": {field: output[field] for field in fields}})
+        return events
+    
+    def _triage(self, stored: Optional[dict], cache_key: str, force_refresh: bool, screened_out: bool) -> str:
+        """
+        Decide what an evaluate-all run does with one resume: "cached" (the
+        stored evaluation is fresh), "provisional" (screened out by the
+        cascade), "stale" (screened out, but an AI evaluation is stored: it is
+        kept although outdated, since a lexical estimate must not replace a
+        model's assessment) or "evaluate"
+        """
+        if not force_refresh and self._is_fresh(stored, cache_key):
+            return "cached"
+        if screened_out:
+            if stored and not stored.get('provisional'):
+                return "stale"
+            return "provisional"
+        return "evaluate"
+    
+    def _build_provisional_evaluation(
+        self,
+        resume: dict,
+        jd,
+        relevance: float,
+        cutoff: float,
+        percentile: float,
+        pool_size: int,
+        cache_key: str
+    ) -> EvaluationCreate:
+        """
+        Prepare a provisional evaluation for a resume screened out by a cascade
+        run: the score scales its BM25 relevance below the cutoff into the
+        Reject band, and skills are matched against the skills extracted from
+        the JD. The cache key is marked so the evaluation is never mistaken
+        for a fresh AI evaluation.
+        """
+        resume_skills = set(resume.get('skills') or [])
+        jd_skills = jd.skills or []
+        matched_skills = [skill for skill in jd_skills if skill in resume_skills]
+        missing_skills = [skill for skill in jd_skills if skill not in resume_skills]
+        return EvaluationCreate(
+            resume_id=str(resume['_id']),
+            jd_id=str(jd.id),
+            score=round(_PROVISIONAL_MAX_SCORE * relevance / cutoff, 1) if cutoff > 0 else 0,
+            verdict='Reject',
+            category_breakdown={
+                'technical_skills': round(100 * len(matched_skills) / len(jd_skills), 1) if jd_skills else 0,
+                'experience': 0,
+                'education': 0,
+                'communication': 0
+            },
+            matched_skills=matched_skills,
+            missing_skills=missing_skills,
+            feedback=(
+                f"Provisional score from lexical pre-screening: relevance to the job description is below "
+                f"the {percentile:g}th percentile of its {pool_size} resumes, so it was not evaluated by the "
+                f"AI model. Evaluate it individually for a full assessment."
+            ),
+            cache_key=f"prescreen:{cache_key}",
+            provisional=True,
+        )
+    
+    def _prescreen(self, resumes: List[dict], jd) -> np.ndarray:
+        """BM25 relevance of each resume's text and skills to the JD text and skills"""
+        query = f"{jd.jd_text} {' '.join(jd.skills or [])}"
+        documents = [
+            f"{resume.get('markdown_text') or resume.get('raw_text') or ''} {' '.join(resume.get('skills') or [])}"
+            for resume in resumes
+        ]
+        return bm25_scores(query, documents)
+    
+    async def evaluate_all_for_jd(
+        self,
+        jd_id: str,
+        force_refresh: bool = False,
+        cascade: bool = False,
+        cascade_percentile: Optional[float] = None
+    ) -> AsyncIterator[dict]:
+        """
+        Evaluate every resume associated with a job description that has no
+        fresh evaluation. Resumes are packed several per Gemini request (see
+        the backend's plan_packs), with EVALUATION_BATCH_CONCURRENCY packs in flight.
+        
+        In cascade mode, all resumes are first ranked by BM25 relevance to the
+        JD (milliseconds for hundreds of resumes). Only those at or above the
+        given percentile (EVALUATION_CASCADE_PERCENTILE by default) go to
+        Gemini; the others get a stored provisional score, unless they already
+        have an AI evaluation, which is kept even if outdated (see _triage). JDs with fewer than
+        EVALUATION_CASCADE_MIN_RESUMES resumes are evaluated in full.
+        
+        Pairs already being evaluated in this process (a single evaluation or
+        another run for the JD) are joined rather than evaluated again, and the
+        pairs of this run are registered so single evaluations join it. Each
+        pair's lease is taken when its pack starts; pairs leased by another
+        process are left out of the pack and awaited like a single evaluation.
+        
+        Yields one event per resume as soon as its pack completes, then a
+        final summary. Each event is a dict with "event" (evaluation, cached,
+        stale, provisional, error or done) and "data". New evaluations are written
+        with bulk upserts of EVALUATION_BATCH_WRITE_SIZE and reported once their
+        batch is written.
+        
+        Args:
+            jd_id: Job description ID
+            force_refresh: Re-evaluate resumes even if their evaluation is fresh
+            cascade: Pre-screen resumes and send only the most relevant to Gemini
+            cascade_percentile: Relevance percentile for cascade mode (0-100)
+        """
+        jd = self.jd_service.get_job_description(jd_id)
+        if not jd:
+            raise Exception("Job description not found")
+        jd_object_id = ObjectId(jd_id)
+        # limit=0 returns every matching document
+        resumes = self.resume_model.get_by_jd_id(jd_object_id, skip=0, limit=0)
+        existing = {
+            evaluation['resume_id']: evaluation
+            for evaluation in self.model.get_by_jd_id(jd_object_id, skip=0, limit=0)
+        }
+        
+        counts = {"evaluated": 0, "cached": 0, "stale": 0, "provisional": 0, "failed": 0}
+        cutoff = None
+        if cascade and len(resumes) >= EVALUATION_CASCADE_MIN_RESUMES:
+            percentile = EVALUATION_CASCADE_PERCENTILE if cascade_percentile is None else cascade_percentile
+            relevance = self._prescreen(resumes, jd)
+            cutoff = float(np.percentile(relevance, percentile))
+        
+        to_evaluate = []
+        provisional = []
+        for index, resume in enumerate(resumes):
+            resume_for_ai = self._prepare_resume_for_ai(resume)
+            cache_key = self.llm_backend.evaluation_cache_key(resume_for_ai, jd.jd_text)
+            stored = existing.get(resume['_id'])
+            action = self._triage(stored, cache_key, force_refresh, cutoff is not None and relevance[index] < cutoff)
+            if action in ("cached", "stale"):
+                counts[action] += 1
+                yield {"event": action, "data": self._convert_objectids_to_strings(stored)}
+            elif action == "provisional":
+                provisional.append((resume, self._build_provisional_evaluation(
+                    resume, jd, float(relevance[index]), cutoff, percentile, len(resumes), cache_key
+                )))
+            else:
+                to_evaluate.append((resume, resume_for_ai, cache_key))
+        
+        if provisional:
+            logger.info(f"Pre-screening JD {jd_id}: {len(to_evaluate)} resumes sent to Gemini, {len(provisional)} scored provisionally")
+            try:
+                self.model.upsert_many_by_jd_and_resume([evaluation.dict() for _, evaluation in provisional])
+                for resume, evaluation in provisional:
+                    counts["provisional"] += 1
+                    yield {"event": "provisional", "data": {
+                        **self._convert_objectids_to_strings(evaluation.dict()),
+                        "candidate_name": resume.get('candidate_name')
+                    }}
+            except Exception as e:
+                logger.error(f"Failed to save {len(provisional)} provisional evaluations for JD {jd_id}: {e}")
+                for resume, _ in provisional:
+                    counts["failed"] += 1
+                    yield {"event": "error", "data": {"resume_id": str(resume['_id']), "candidate_name": resume.get('candidate_name'), "detail": f"Failed to save provisional evaluation: {str(e)}"}}
+        
+        loop = asyncio.get_running_loop()
+        owner = str(ObjectId())
+        # Futures of the pairs this run evaluates, and the pairs it holds the lease on
+        inflight: Dict[str, asyncio.Future] = {}
+        leased = set()
+        joined = []
+        remaining = []
+        for item in to_evaluate:
+            key = (str(jd_id), str(item[0]['_id']))
+            task = _inflight_evaluations.get(key)
+            if task is not None:
+                joined.append((item[0], task))
+                continue
+            future = loop.create_future()
+            future.add_done_callback(lambda done, key=key: _forget_inflight(key, done))
+            _inflight_evaluations[key] = future
+            inflight[key[1]] = future
+            remaining.append(item)
+        to_evaluate = remaining
+        
+        def settle(resume_id: str, evaluation: Optional[EvaluationResponse] = None, error: Optional[str] = None):
+            """Resolve the future of a pair this run evaluated and release its lease"""
+            future = inflight.pop(resume_id, None)
+            if future is not None and not future.done():
+                if error is None:
+                    future.set_result(evaluation)
+                else:
+                    future.set_exception(Exception(error))
+            if resume_id in leased:
+                leased.discard(resume_id)
+                self.lease_model.release(jd_id, resume_id, owner)
+        
+        semaphore = asyncio.Semaphore(EVALUATION_BATCH_CONCURRENCY)
+        
+        async def join(resume: dict, task: asyncio.Future) -> List[tuple]:
+            """Wait for an evaluation of the pair already in progress in this process"""
+            try:
+                return [(resume, await self._join_inflight(task, str(resume['_id']), jd_id), None)]
+            except Exception as e:
+                return [(resume, None, str(e))]
+        
+        async def evaluate_pack(items: List[tuple]) -> List[tuple]:
+            """
+            Evaluate a pack of resumes with one Gemini request, reusing results
+            held in memory. Outcomes carry an EvaluationCreate still to be
+            written, or the EvaluationResponse stored by another process.
+            """
+            elsewhere = []
+            async with semaphore:
+                leased_items = []
+                for item in items:
+                    resume_id = str(item[0]['_id'])
+                    if self.lease_model.acquire(jd_id, resume_id, owner, EVALUATION_LEASE_SECONDS):
+                        leased.add(resume_id)
+                        leased_items.append(item)
+                    else:
+                        elsewhere.append(item)
+                items = leased_items
+                results: Dict[int, Any] = {}
+                pending = []
+                for index, (resume, resume_for_ai, cache_key) in enumerate(items):
+                    cached = None if force_refresh else _evaluation_cache.get(cache_key)
+                    if cached is not None:
+                        results[index] = cached
+                    else:
+                        pending.append(index)
+                if pending:
+                    evaluated = await self.llm_backend.aevaluate_resumes_with_jd(
+                        [items[index][1] for index in pending], jd.jd_text, jd_id
+                    )
+                    for index, result in zip(pending, evaluated):
+                        if not isinstance(result, Exception):
+                            _evaluation_cache[items[index][2]] = result
+                        results[index] = result
+                
+                outcomes = []
+                for index, (resume, _, cache_key) in enumerate(items):
+                    result = results[index]
+                    if isinstance(result, Exception):
+                        outcomes.append((resume, None, str(result)))
+                    else:
+                        outcomes.append((resume, self._build_evaluation(str(resume['_id']), jd_id, result, cache_key), None))
+            
+            if elsewhere:
+                # Another process is evaluating these pairs; wait for its results
+                stored = await asyncio.gather(
+                    *[self._evaluate_resume_with_ai(str(resume['_id']), jd_id, force_refresh) for resume, _, _ in elsewhere],
+                    return_exceptions=True
+                )
+                for (resume, _, _), result in zip(elsewhere, stored):
+                    if isinstance(result, Exception):
+                        outcomes.append((resume, None, str(result)))
+                    else:
+                        outcomes.append((resume, result, None))
+            return outcomes
+        
+        def flush(batch: List[Tuple[EvaluationCreate, Optional[str]]]) -> List[dict]:
+            """Write a batch of (evaluation, candidate name) pairs and count them.
+
+            Returns:
+                The "evaluation" events of the batch once written, or its error events
+                if the write failed
+            """
+            if not batch:
+                return []
+            error = None
+            try:
+                self.model.upsert_many_by_jd_and_resume([evaluation.dict() for evaluation, _ in batch])
+            except Exception as e:
+                logger.error(f"Failed to save {len(batch)} evaluations for JD {jd_id}: {e}")
+                error = f"Failed to save evaluation: {str(e)}"
+            for evaluation, _ in batch:
+                settle(str(evaluation.resume_id), error=error)
+            if error is not None:
+                counts["failed"] += len(batch)
+                return [
+                    {"event": "error", "data": {"resume_id": str(evaluation.resume_id), "candidate_name": candidate_name, "detail": error}}
+                    for evaluation, candidate_name in batch
+                ]
+            counts["evaluated"] += len(batch)
+            return [
+                {"event": "evaluation", "data": {
+                    **self._convert_objectids_to_strings(evaluation.dict()),
+                    "candidate_name": candidate_name
+                }}
+                for evaluation, candidate_name in batch
+            ]
+        
+        packs = self.llm_backend.plan_packs([resume_for_ai for _, resume_for_ai, _ in to_evaluate])
+        tasks = [asyncio.create_task(evaluate_pack([to_evaluate[index] for index in pack])) for pack in packs]
+        tasks += [asyncio.create_task(join(resume, task)) for resume, task in joined]
+        batch = []
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                for resume, evaluation, error in await next_done:
+                    if error is not None:
+                        settle(str(resume['_id']), error=error)
+                        counts["failed"] += 1
+                        yield {"event": "error", "data": {"resume_id": str(resume['_id']), "candidate_name": resume.get('candidate_name'), "detail": error}}
+                        continue
+                    if isinstance(evaluation, EvaluationResponse):
+                        # Already stored by the evaluation this run joined or waited for
+                        settle(str(resume['_id']), evaluation)
+                        counts["evaluated"] += 1
+                        yield {"event": "evaluation", "data": {
+                            **evaluation.dict(by_alias=True),
+                            "candidate_name": resume.get('candidate_name')
+                        }}
+                        continue
+                    # Reported once its batch is written, so a failed write is not also a success
+                    batch.append((evaluation, resume.get('candidate_name')))
+                    if len(batch) >= EVALUATION_BATCH_WRITE_SIZE:
+                        written, batch = batch, []
+                        for event in flush(written):
+                            yield event
+            written, batch = batch, []
+            for event in flush(written):
+                yield event
+            yield {"event": "done", "data": {"total": len(resumes), **counts}}
+        finally:
+            for task in tasks:
+                task.cancel()
+            # Keep results already paid for if the client went away mid-run
+            flush(batch)
+            # Pairs left unfinished: joiners get an error, and their leases are released
+            for resume_id in list(inflight) + list(leased):
+                settle(resume_id, error="Evaluation of all resumes for the job description was interrupted")
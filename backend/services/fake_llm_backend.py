@@ -0,0 +1,192 @@
+import os
+import json
+import math
+import time
+import random
+import asyncio
+import hashlib
+import logging
+import threading
+from typing import Dict, Any, Optional, AsyncIterator
+from schemas.evaluation import EvaluationResult, verdict_for_score
+from services.llm_backend import LLMBackend, LLMUnavailableError
+from utils.json_repair import loads_partial_object
+from utils.skill_extractor import extract_skills
+
+logger = logging.getLogger(__name__)
+
+# Response latency distribution of the fake backend: "constant", "uniform",
+# "exponential" or "lognormal", with its mean and standard deviation in seconds
+# (constant ignores the deviation and exponential uses the mean for both)
+FAKE_LLM_LATENCY_DISTRIBUTION = os.getenv("FAKE_LLM_LATENCY_DISTRIBUTION", "lognormal").lower()
+FAKE_LLM_LATENCY_MEAN = float(os.getenv("FAKE_LLM_LATENCY_MEAN", "2.0"))
+FAKE_LLM_LATENCY_STDDEV = float(os.getenv("FAKE_LLM_LATENCY_STDDEV", "1.0"))
+# Fraction of requests that fail as if the model were throttling (0 to 1)
+FAKE_LLM_ERROR_RATE = float(os.getenv("FAKE_LLM_ERROR_RATE", "0"))
+# Seed of the latency and error sequence, so load tests are reproducible
+FAKE_LLM_SEED = int(os.getenv("FAKE_LLM_SEED", "0"))
+# Score given to every resume; when unset (or not a number), the score is derived
+# from a hash of the inputs (the same resume and JD always get the same score)
+FAKE_LLM_SCORE = os.getenv("FAKE_LLM_SCORE")
+# Words of feedback per evaluation, to size responses like the real model's
+FAKE_LLM_FEEDBACK_WORDS = int(os.getenv("FAKE_LLM_FEEDBACK_WORDS", "150"))
+# Chunks a streamed response is split into; the first arrives after half the
+# sampled latency and the rest are spread over the other half
+FAKE_LLM_STREAM_CHUNKS = int(os.getenv("FAKE_LLM_STREAM_CHUNKS", "8"))
+
+_FEEDBACK_WORDS = (
+    "candidate shows relevant experience with the required stack and has delivered projects of "
+    "similar scope though some requirements of the role are not covered by the resume"
+).split()
+
+# Process-wide generator of latencies and errors, seeded with FAKE_LLM_SEED
+_rng: Optional[random.Random] = None
+_rng_lock = threading.Lock()
+
+def _parse_fixed_score(value: Optional[str]) -> Optional[float]:
+    """FAKE_LLM_SCORE as a number, or None to derive scores from the inputs"""
+    if not value or not value.strip():
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        logger.warning(f"Ignoring FAKE_LLM_SCORE '{value}', which is not a number; scores are derived from the inputs")
+        return None
+
+_fixed_score = _parse_fixed_score(FAKE_LLM_SCORE)
+
+def _sample_latency(rng: random.Random) -> float:
+    """Draw one latency in seconds from FAKE_LLM_LATENCY_DISTRIBUTION"""
+    mean = max(FAKE_LLM_LATENCY_MEAN, 0.0)
+    stddev = max(FAKE_LLM_LATENCY_STDDEV, 0.0)
+    if mean == 0 or FAKE_LLM_LATENCY_DISTRIBUTION == "constant":
+        return mean
+    if FAKE_LLM_LATENCY_DISTRIBUTION == "uniform":
+        half_width = min(stddev * math.sqrt(3), mean)
+        return rng.uniform(mean - half_width, mean + half_width)
+    if FAKE_LLM_LATENCY_DISTRIBUTION == "exponential":
+        return rng.expovariate(1 / mean)
+    if FAKE_LLM_LATENCY_DISTRIBUTION == "lognormal":
+        # Parameters of the underlying normal giving the requested mean and deviation
+        sigma = math.sqrt(math.log(1 + (stddev / mean) ** 2))
+        return rng.lognormvariate(math.log(mean) - sigma ** 2 / 2, sigma)
+    raise ValueError(f"Unknown FAKE_LLM_LATENCY_DISTRIBUTION '{FAKE_LLM_LATENCY_DISTRIBUTION}'")
+
+def _get_rng() -> random.Random:
+    """The process-wide random generator seeded with FAKE_LLM_SEED"""
+    global _rng
+    with _rng_lock:
+        if _rng is None:
+            _rng = random.Random(FAKE_LLM_SEED)
+        return _rng
+
+class FakeLLMBackend(LLMBackend):
+    """
+    Local stand-in for Gemini that needs no API key or network, for
+    load-testing the evaluation pipeline (database, parsing, serialization,
+    concurrency). Each request sleeps for a latency drawn from the configured
+    distribution, fails with LLMUnavailableError at FAKE_LLM_ERROR_RATE, and
+    otherwise returns a deterministic evaluation: the score comes from
+    FAKE_LLM_SCORE or a hash of the inputs, and skills are matched by
+    extracting the JD's skills. Responses are produced as JSON text and
+    validated with EvaluationResult like the model's.
+    """
+
+    name = "fake"
+
+    def __init__(self):
+        # Latency and error draws, shared by all instances like Gemini's quotas
+        self._rng = _get_rng()
+
+    def evaluation_cache_key(self, resume_json: Dict[str, Any], jd_text: str) -> str:
+        """Hash of the inputs the fake evaluation depends on"""
+        digest = hashlib.sha256(f"fake\0{_fixed_score}\0{FAKE_LLM_FEEDBACK_WORDS}\0".encode('utf-8'))
+        digest.update(json.dumps({
+            "raw_text": resume_json.get('markdown_text') or resume_json.get('raw_text') or '',
+            "skills": resume_json.get('skills') or [],
+            "jd_text": jd_text,
+        }, sort_keys=True).encode('utf-8'))
+        return digest.hexdigest()
+
+    def evaluate_resume_with_jd(self, resume_json: Dict[str, Any], jd_text: str) -> Dict[str, Any]:
+        """Evaluate a resume, blocking for the sampled latency"""
+        latency, fail = self._draw()
+        time.sleep(latency)
+        return self._respond(resume_json, jd_text, fail)
+
+    async def aevaluate_resume_with_jd(
+        self,
+        resume_json: Dict[str, Any],
+        jd_text: str,
+        jd_id: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """Evaluate a resume, awaiting the sampled latency"""
+        latency, fail = self._draw()
+        await asyncio.sleep(latency)
+        return self._respond(resume_json, jd_text, fail)
+
+    async def astream_evaluate_resume_with_jd(
+        self,
+        resume_json: Dict[str, Any],
+        jd_text: str,
+        jd_id: Optional[str] = None
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """Evaluate a resume, streaming the response text in FAKE_LLM_STREAM_CHUNKS chunks"""
+        latency, fail = self._draw()
+        chunks = max(FAKE_LLM_STREAM_CHUNKS, 1)
+        await asyncio.sleep(latency / 2)
+        if fail:
+            raise LLMUnavailableError("Fake LLM backend simulated a rate limit error", retry_after=1.0)
+        text = self._response_text(resume_json, jd_text)
+        for index in range(1, chunks + 1):
+            if index > 1:
+                await asyncio.sleep(latency / 2 / chunks)
+            partial = loads_partial_object(text[:len(text) * index // chunks])
+            if partial:
+                yield {"partial": partial}
+        yield {"result": self._validate(resume_json, text)}
+
+    def test_connection(self) -> bool:
+        return True
+
+    def _draw(self):
+        """Sample (latency in seconds, whether the request fails)"""
+        with _rng_lock:
+            latency = _sample_latency(self._rng)
+            fail = self._rng.random() < FAKE_LLM_ERROR_RATE
+        return latency, fail
+
+    def _respond(self, resume_json: Dict[str, Any], jd_text: str, fail: bool) -> Dict[str, Any]:
+        """Build and validate the evaluation, or raise the sampled error"""
+        if fail:
+            raise LLMUnavailableError("Fake LLM backend simulated a rate limit error", retry_after=1.0)
+        return self._validate(resume_json, self._response_text(resume_json, jd_text))
+
+    def _response_text(self, resume_json: Dict[str, Any], jd_text: str) -> str:
+        """The JSON text the fake model answers with"""
+        seed = int(self.evaluation_cache_key(resume_json, jd_text)[:8], 16)
+        score = _fixed_score if _fixed_score is not None else float(seed % 101)
+        resume_skills = set(resume_json.get('skills') or [])
+        jd_skills = extract_skills(jd_text)
+        words = [_FEEDBACK_WORDS[index % len(_FEEDBACK_WORDS)] for index in range(FAKE_LLM_FEEDBACK_WORDS)]
+        return json.dumps({
+            "score": score,
+            "verdict": verdict_for_score(score),
+            "category_breakdown": {
+                "technical_skills": score,
+                "experience": float((seed >> 8) % 101),
+                "education": float((seed >> 16) % 101),
+                "communication": float((seed >> 24) % 101),
+            },
+            "matched_skills": [skill for skill in jd_skills if skill in resume_skills],
+            "missing_skills": [skill for skill in jd_skills if skill not in resume_skills],
+            "pros": ["Relevant experience"],
+            "cons": ["Some requirements not covered"],
+            "feedback": ' '.join(words).capitalize() + '.',
+        })
+
+    def _validate(self, resume_json: Dict[str, Any], response_text: str) -> Dict[str, Any]:
+        """Validate the response text like a model response"""
+        evaluation = EvaluationResult.model_validate_json(response_text).model_dump()
+        logger.info(f"Fake evaluation for candidate: {resume_json.get('candidate_name', 'Unknown')}")
+        return evaluation
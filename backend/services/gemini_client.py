@@ -1,26 +1,218 @@
 import os
+import re
 import json
+import time
+import random
+import asyncio
+import hashlib
 import logging
-from typing import Dict, Any, Optional
+import threading
+from typing import List, Dict, Any, Optional, AsyncIterator
+from contextlib import AsyncExitStack
+import httpx
 from google import genai
+from google.genai import errors as genai_errors
+from google.genai import types as genai_types
 from dotenv import load_dotenv
+from cachetools import TTLCache
+from pydantic import ValidationError
+from tenacity import AsyncRetrying, Retrying, retry_if_exception, stop_after_attempt, stop_any, wait_random_exponential
+from utils.rate_limiter import TokenBucket, AdaptiveConcurrencyLimiter
+from utils.json_repair import loads_partial_object, loads_truncated_json, strip_code_fence
+from utils.prompt_compactor import compact_resume, count_tokens
+from schemas.evaluation import EvaluationResult, PackedEvaluationResult
+from services.llm_backend import LLMBackend, LLMUnavailableError
 
 # Load environment variables
 load_dotenv()
 
 logger = logging.getLogger(__name__)
 
-class GeminiClient:
+# Gemini model used for evaluations
+GEMINI_MODEL = os.getenv("GEMINI_MODEL", "gemini-2.5-flash")
+# Version of the evaluation prompt; bump it whenever _create_evaluation_prompt
+# changes so cached evaluations made with the old prompt are not reused
+PROMPT_VERSION = "4"
+
+# Maximum number of Gemini requests in flight at once across the whole process;
+# the actual limit is lowered automatically while Gemini is throttling us
+GEMINI_MAX_CONCURRENCY = int(os.getenv("GEMINI_MAX_CONCURRENCY", "32"))
+# Client-side request and token quotas per minute (0 disables the limit)
+GEMINI_RPM = int(os.getenv("GEMINI_RPM", "1000"))
+GEMINI_TPM = int(os.getenv("GEMINI_TPM", "1000000"))
+# Output tokens assumed per request until the response reports actual usage
+GEMINI_EXPECTED_OUTPUT_TOKENS = int(os.getenv("GEMINI_EXPECTED_OUTPUT_TOKENS", "1024"))
+# Attempts per request for rate limit (429), server (5xx) and network errors
+GEMINI_MAX_RETRIES = int(os.getenv("GEMINI_MAX_RETRIES", "5"))
+# Exponential backoff between attempts, in seconds, when Gemini gives no retry hint;
+# a retry hint longer than the max delay is not waited for and is passed on to the caller
+GEMINI_RETRY_BASE_DELAY = float(os.getenv("GEMINI_RETRY_BASE_DELAY", "1.0"))
+GEMINI_RETRY_MAX_DELAY = float(os.getenv("GEMINI_RETRY_MAX_DELAY", "60.0"))
+
+# Cache the JD part of evaluation prompts with Gemini context caching, so batch
+# evaluations against one JD do not resend (and re-bill) it for every candidate
+GEMINI_CONTEXT_CACHE_ENABLED = os.getenv("GEMINI_CONTEXT_CACHE_ENABLED", "true").lower() == "true"
+# Lifetime of a cached JD prefix in seconds
+GEMINI_CONTEXT_CACHE_TTL = int(os.getenv("GEMINI_CONTEXT_CACHE_TTL", "3600"))
+# JD prefixes estimated below this many tokens are sent inline instead
+# (Gemini rejects cached content smaller than the model's minimum)
+GEMINI_CONTEXT_CACHE_MIN_TOKENS = int(os.getenv("GEMINI_CONTEXT_CACHE_MIN_TOKENS", "1024"))
+# JDs whose cached prefix is tracked per process; beyond this the least recently
+# used is forgotten (its cached content then just expires on Gemini's side)
+GEMINI_CONTEXT_CACHE_SIZE = int(os.getenv("GEMINI_CONTEXT_CACHE_SIZE", "256"))
+
+# Maximum candidates scored in one packed Gemini request by batch evaluations
+# (1 evaluates every resume with its own request)
+GEMINI_PACK_SIZE = int(os.getenv("GEMINI_PACK_SIZE", "5"))
+# Estimated tokens of candidate prompts plus expected output allowed per packed request
+GEMINI_PACK_TOKEN_BUDGET = int(os.getenv("GEMINI_PACK_TOKEN_BUDGET", "16000"))
+
+# Approximate tokens of resume content sent per candidate
+GEMINI_RESUME_TOKEN_BUDGET = int(os.getenv("GEMINI_RESUME_TOKEN_BUDGET", "1000"))
+
+# HTTP status codes worth retrying
+_RETRYABLE_STATUS_CODES = {429, 500, 502, 503, 504}
+
+# One SDK client per API key, shared so its HTTP connection pools are reused
+_genai_clients: Dict[str, genai.Client] = {}
+_genai_clients_lock = threading.Lock()
+
+# Process-wide limits shared by all async requests
+_request_bucket = TokenBucket(GEMINI_RPM)
+_token_bucket = TokenBucket(GEMINI_TPM)
+_concurrency_limiter = AdaptiveConcurrencyLimiter(GEMINI_MAX_CONCURRENCY)
+
+# Cached JD prefix per jd_id: {"lock", "entry"}, the lock serializing creation and
+# entry {"prefix_hash", "name", "expires_at"} (None before the first creation); name
+# is None when caching failed, so it is not retried until expiry. Slots expire with
+# their cached content, so JDs that are no longer evaluated do not accumulate.
+_jd_prefix_caches: TTLCache = TTLCache(maxsize=GEMINI_CONTEXT_CACHE_SIZE, ttl=GEMINI_CONTEXT_CACHE_TTL)
+# Cached content is recreated this many seconds before it expires
+_CONTEXT_CACHE_REFRESH_MARGIN = 60
+
+# Prompt headings of the resume sections from compact_resume
+_SECTION_TITLES = {
+    'experience': 'EXPERIENCE',
+    'skills': 'SKILLS',
+    'education': 'EDUCATION',
+    'other': 'OTHER RESUME CONTENT',
+}
+
+# Evaluation results by parse outcome: parsed (valid as returned), repaired
+# (valid after repairing the JSON or deriving the verdict) or failed; see get_parse_stats()
+_parse_stats: Dict[str, int] = {"parsed": 0, "repaired": 0, "failed": 0}
+
+class GeminiRateLimitError(LLMUnavailableError):
+    """Gemini kept throttling or failing after all retries"""
+
+def get_parse_stats() -> Dict[str, Any]:
+    """Counts of evaluation results by parse outcome since startup, with the failure rate"""
+    total = sum(_parse_stats.values())
+    return {
+        **_parse_stats,
+        "total": total,
+        "failure_rate": _parse_stats["failed"] / total if total else 0.0
+    }
+
+def _evaluation_config(response_schema, cached_content: Optional[str] = None) -> genai_types.GenerateContentConfig:
+    """Generation config requesting JSON that matches response_schema"""
+    return genai_types.GenerateContentConfig(
+        response_mime_type="application/json",
+        response_schema=response_schema,
+        cached_content=cached_content
+    )
+
+def _get_genai_client(api_key: str) -> genai.Client:
+    with _genai_clients_lock:
+        client = _genai_clients.get(api_key)
+        if client is None:
+            client = genai.Client(api_key=api_key)
+            _genai_clients[api_key] = client
+        return client
+
+def _is_throttle(error: BaseException) -> bool:
+    return isinstance(error, genai_errors.APIError) and error.code == 429
+
+def _is_retryable(error: BaseException) -> bool:
+    if isinstance(error, genai_errors.APIError):
+        return error.code in _RETRYABLE_STATUS_CODES
+    return isinstance(error, (httpx.TransportError, TimeoutError))
+
+def _retry_hint(error: BaseException) -> Optional[float]:
+    """Seconds to wait as requested by the server (Retry-After header or RetryInfo detail)"""
+    if not isinstance(error, genai_errors.APIError):
+        return None
+    headers = getattr(getattr(error, 'response', None), 'headers', None)
+    if headers is not None:
+        try:
+            return float(headers.get('retry-after'))
+        except (TypeError, ValueError):
+            pass
+    details = error.details.get('error', error.details) if isinstance(error.details, dict) else {}
+    for detail in details.get('details', []) if isinstance(details, dict) else []:
+        if isinstance(detail, dict) and 'retryDelay' in detail:
+            match = re.match(r'([\d.]+)s', str(detail['retryDelay']))
+            if match:
+                return float(match.group(1))
+    return None
+
+def _wait_before_retry(retry_state) -> float:
+    """Honor the server's retry hint, otherwise use jittered exponential backoff (both capped)"""
+    hint = _retry_hint(retry_state.outcome.exception())
+    if hint is not None:
+        return min(hint + random.uniform(0, GEMINI_RETRY_BASE_DELAY), GEMINI_RETRY_MAX_DELAY)
+    backoff = wait_random_exponential(multiplier=GEMINI_RETRY_BASE_DELAY, max=GEMINI_RETRY_MAX_DELAY)
+    return backoff(retry_state)
+
+def _hint_exceeds_max_delay(retry_state) -> bool:
+    """
+    Stop retrying when the server asks for a longer wait than
+    GEMINI_RETRY_MAX_DELAY: the request would be held for minutes, so the
+    error (and its hint, as retry_after) goes to the caller instead
+    """
+    hint = _retry_hint(retry_state.outcome.exception())
+    return hint is not None and hint > GEMINI_RETRY_MAX_DELAY
+
+def _log_retry(retry_state):
+    error = retry_state.outcome.exception()
+    logger.warning(
+        f"Gemini request failed ({error}), retrying in {retry_state.next_action.sleep:.1f}s "
+        f"(attempt {retry_state.attempt_number}/{GEMINI_MAX_RETRIES}, "
+        f"concurrency limit {_concurrency_limiter.current_limit})"
+    )
+
+def _retrying(retry_cls=AsyncRetrying, **kwargs):
+    """Retry policy shared by all Gemini calls; re-raises the last error when attempts run out"""
+    return retry_cls(
+        retry=retry_if_exception(_is_retryable),
+        wait=_wait_before_retry,
+        stop=stop_any(stop_after_attempt(max(GEMINI_MAX_RETRIES, 1)), _hint_exceeds_max_delay),
+        before_sleep=_log_retry,
+        reraise=True,
+        **kwargs
+    )
+
+def _raise_if_exhausted(error: Exception):
+    """Turn a retryable error that survived all retries into GeminiRateLimitError"""
+    if _is_retryable(error):
+        raise GeminiRateLimitError(
+            f"Gemini is unavailable or rate limited, try again later: {str(error)}",
+            retry_after=_retry_hint(error)
+        ) from error
+
+class GeminiClient(LLMBackend):
     """Google Gemini AI client for resume evaluation"""
     
+    name = "gemini"
+    
     def __init__(self):
         """Initialize the Gemini client"""
         self.api_key = os.getenv("GEMINI_API_KEY")
         if not self.api_key:
             raise ValueError("GEMINI_API_KEY environment variable is required")
         
-        # Initialize the Gemini client
-        self.client = genai.Client(api_key=self.api_key)
+        # Use the shared Gemini client
+        self.client = _get_genai_client(self.api_key)
     
     def evaluate_resume_with_jd(self, resume_json: Dict[str, Any], jd_text: str) -> Dict[str, Any]:
         """
@@ -37,11 +229,56 @@ class GeminiClient:
             # Prepare the evaluation prompt
             prompt = self._create_evaluation_prompt(resume_json, jd_text)
             
+            # Generate content using Gemini, retrying transient failures
+            for attempt in _retrying(Retrying):
+                with attempt:
+                    response = self.client.models.generate_content(
+                        model=GEMINI_MODEL,
+                        contents=prompt,
+                        config=_evaluation_config(EvaluationResult)
+                    )
+            
+            # Parse the response
+            evaluation_result = self._parse_evaluation_response(response)
+            
+            logger.info(f"Successfully evaluated resume for candidate: {resume_json.get('candidate_name', 'Unknown')}")
+            return evaluation_result
+            
+        except Exception as e:
+            logger.error(f"Error evaluating resume: {str(e)}")
+            _raise_if_exhausted(e)
+            raise Exception(f"Failed to evaluate resume: {str(e)}")
+    
+    async def aevaluate_resume_with_jd(
+        self,
+        resume_json: Dict[str, Any],
+        jd_text: str,
+        jd_id: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Evaluate a resume against a job description without blocking the event loop.
+        Uses the SDK's asyncio client; requests wait for the GEMINI_RPM/GEMINI_TPM
+        quotas and a free concurrency slot, and are retried on throttling and
+        transient errors (see _agenerate_content).
+        
+        When jd_id is given, the JD prefix of the prompt is stored once as
+        Gemini cached content and only the candidate part is sent per request.
+        
+        Args:
+            resume_json: Structured resume dictionary from MongoDB
+            jd_text: Job description text
+            jd_id: Job description ID the JD prefix is cached under
+            
+        Returns:
+            Dictionary containing evaluation results
+        """
+        try:
+            # Prepare the evaluation prompt
+            prefix = self._create_jd_prompt_prefix(jd_text)
+            candidate_prompt = self._create_candidate_prompt(resume_json, log_tokens=True)
+
             # Generate content using Gemini
-            response = self.client.models.generate_content(
-                model="gemini-2.5-flash",
-                contents=prompt
-            )
+            response = await self._agenerate_with_jd_prefix(jd_id, prefix, candidate_prompt, EvaluationResult)
             
             # Parse the response
             evaluation_result = self._parse_evaluation_response(response)
@@ -51,11 +288,382 @@ class GeminiClient:
             
         except Exception as e:
             logger.error(f"Error evaluating resume: {str(e)}")
+            _raise_if_exhausted(e)
             raise Exception(f"Failed to evaluate resume: {str(e)}")
     
+    async def astream_evaluate_resume_with_jd(
+        self,
+        resume_json: Dict[str, Any],
+        jd_text: str,
+        jd_id: Optional[str] = None
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Evaluate a resume like aevaluate_resume_with_jd, streaming Gemini's
+        output. After each chunk the JSON received so far is repaired and
+        yielded as {"partial": dict}; the validated evaluation is yielded last
+        as {"result": dict}. Only opening the stream is retried: once output
+        has been received, a failure ends the evaluation.
+        
+        Args:
+            resume_json: Structured resume dictionary from MongoDB
+            jd_text: Job description text
+            jd_id: Job description ID the JD prefix is cached under
+            
+        Yields:
+            Partial output, then the evaluation result
+        """
+        try:
+            prefix = self._create_jd_prompt_prefix(jd_text)
+            candidate_prompt = self._create_candidate_prompt(resume_json, log_tokens=True)
+            
+            text = ''
+            async for chunk in self._astream_with_jd_prefix(jd_id, prefix, candidate_prompt, EvaluationResult):
+                if not chunk.text:
+                    continue
+                text += chunk.text
+                partial = loads_partial_object(text)
+                if partial:
+                    yield {"partial": partial}
+            
+            evaluation_result = self._parse_evaluation_text(text)
+            logger.info(f"Successfully evaluated resume for candidate: {resume_json.get('candidate_name', 'Unknown')}")
+            yield {"result": evaluation_result}
+            
+        except Exception as e:
+            logger.error(f"Error evaluating resume: {str(e)}")
+            _raise_if_exhausted(e)
+            raise Exception(f"Failed to evaluate resume: {str(e)}")
+    
+    def plan_packs(self, resume_jsons: List[Dict[str, Any]]) -> List[List[int]]:
+        """
+        Split resumes into packs for aevaluate_resumes_with_jd, in order. A pack
+        holds at most GEMINI_PACK_SIZE candidates and at most
+        GEMINI_PACK_TOKEN_BUDGET estimated tokens of candidate prompts plus
+        expected output; a candidate bigger than the budget gets a pack alone.
+        
+        Args:
+            resume_jsons: Structured resume dictionaries
+            
+        Returns:
+            Lists of indexes into resume_jsons
+        """
+        packs: List[List[int]] = []
+        current: List[int] = []
+        current_tokens = 0
+        for index, resume_json in enumerate(resume_jsons):
+            tokens = count_tokens(self._create_candidate_prompt(resume_json)) + GEMINI_EXPECTED_OUTPUT_TOKENS
+            if current and (len(current) >= GEMINI_PACK_SIZE or current_tokens + tokens > GEMINI_PACK_TOKEN_BUDGET):
+                packs.append(current)
+                current, current_tokens = [], 0
+            current.append(index)
+            current_tokens += tokens
+        if current:
+            packs.append(current)
+        return packs
+    
+    async def aevaluate_resumes_with_jd(
+        self,
+        resume_jsons: List[Dict[str, Any]],
+        jd_text: str,
+        jd_id: Optional[str] = None
+    ) -> List[Any]:
+        """
+        Evaluate several resumes against one job description in a single
+        Gemini request (see plan_packs for choosing them). The instructions,
+        JD and output format are sent once for the whole pack and the model
+        returns a JSON array with one result per candidate.
+        
+        If the packed request fails, or its results do not map one to one
+        onto the candidates (see _parse_packed_response), every candidate is
+        evaluated again one by one with aevaluate_resume_with_jd; candidates
+        whose own result failed validation are evaluated again the same way.
+        
+        Args:
+            resume_jsons: Structured resume dictionaries from MongoDB
+            jd_text: Job description text
+            jd_id: Job description ID the JD prefix is cached under
+            
+        Returns:
+            One entry per resume, in order: the evaluation dictionary, or the
+            exception raised while evaluating it
+        """
+        if len(resume_jsons) == 1:
+            try:
+                return [await self.aevaluate_resume_with_jd(resume_jsons[0], jd_text, jd_id)]
+            except Exception as e:
+                return [e]
+        
+        results: List[Any] = [None] * len(resume_jsons)
+        try:
+            prefix = self._create_jd_prompt_prefix(jd_text, packed=True)
+            candidates_prompt = ''.join(
+                f"\nCANDIDATE {number}:{self._create_candidate_prompt(resume_json, log_tokens=True)}"
+                for number, resume_json in enumerate(resume_jsons, start=1)
+            )
+            response = await self._agenerate_with_jd_prefix(
+                f"{jd_id}:packed" if jd_id else None, prefix, candidates_prompt, list[PackedEvaluationResult],
+                expected_output_tokens=GEMINI_EXPECTED_OUTPUT_TOKENS * len(resume_jsons)
+            )
+            for number, evaluation in self._parse_packed_response(response, len(resume_jsons)).items():
+                results[number - 1] = evaluation
+        except Exception as e:
+            if _is_retryable(e):
+                # Retrying one by one would only add load while Gemini is throttling
+                error = GeminiRateLimitError(
+                    f"Gemini is unavailable or rate limited, try again later: {str(e)}",
+                    retry_after=_retry_hint(e)
+                )
+                return [error] * len(resume_jsons)
+            logger.warning(f"Packed evaluation of {len(resume_jsons)} resumes failed, evaluating them one by one: {e}")
+        
+        missing = [index for index, result in enumerate(results) if result is None]
+        if missing:
+            logger.info(f"Evaluating {len(missing)} of {len(resume_jsons)} packed resumes one by one")
+            fallback = await asyncio.gather(
+                *[self.aevaluate_resume_with_jd(resume_jsons[index], jd_text, jd_id) for index in missing],
+                return_exceptions=True
+            )
+            for index, result in zip(missing, fallback):
+                results[index] = result
+        return results
+    
+    async def _agenerate_with_jd_prefix(
+        self,
+        cache_id: Optional[str],
+        prefix: str,
+        suffix: str,
+        response_schema,
+        expected_output_tokens: int = GEMINI_EXPECTED_OUTPUT_TOKENS
+    ):
+        """
+        Send prefix + suffix to Gemini, with the prefix taken from cached
+        content stored under cache_id when possible
+        
+        Args:
+            cache_id: Key the cached prefix is stored under (None to send it inline)
+            prefix: JD prompt prefix
+            suffix: Candidate part of the prompt
+            response_schema: Schema the JSON response must follow
+            expected_output_tokens: Output tokens reserved from the TPM quota
+            
+        Returns:
+            Gemini API response
+        """
+        cached_prefix = await self._get_cached_jd_prefix(cache_id, prefix) if cache_id else None
+        if cached_prefix:
+            try:
+                return await self._agenerate_content(
+                    suffix, _evaluation_config(response_schema, cached_prefix), expected_output_tokens
+                )
+            except genai_errors.ClientError as e:
+                # The cached content expired or was deleted elsewhere
+                if e.code not in (400, 403, 404):
+                    raise
+                logger.warning(f"Cached prompt prefix for JD {cache_id} was rejected, sending it inline: {e}")
+                _jd_prefix_caches.pop(cache_id, None)
+        return await self._agenerate_content(prefix + suffix, _evaluation_config(response_schema), expected_output_tokens)
+    
+    async def _astream_with_jd_prefix(
+        self,
+        cache_id: Optional[str],
+        prefix: str,
+        suffix: str,
+        response_schema
+    ) -> AsyncIterator[Any]:
+        """
+        Streaming counterpart of _agenerate_with_jd_prefix: yields the response
+        chunks for prefix + suffix, with the prefix taken from cached content
+        when possible
+        """
+        cached_prefix = await self._get_cached_jd_prefix(cache_id, prefix) if cache_id else None
+        if cached_prefix:
+            received = False
+            try:
+                async for chunk in self._astream_content(suffix, _evaluation_config(response_schema, cached_prefix)):
+                    received = True
+                    yield chunk
+                return
+            except genai_errors.ClientError as e:
+                # The cached content expired or was deleted elsewhere
+                if received or e.code not in (400, 403, 404):
+                    raise
+                logger.warning(f"Cached prompt prefix for JD {cache_id} was rejected, sending it inline: {e}")
+                _jd_prefix_caches.pop(cache_id, None)
+        async for chunk in self._astream_content(prefix + suffix, _evaluation_config(response_schema)):
+            yield chunk
+    
+    async def _get_cached_jd_prefix(self, jd_id: str, prefix: str) -> Optional[str]:
+        """
+        Get the cached content name holding a JD prompt prefix, creating it on
+        first use. A changed JD (different prefix) replaces the cached content,
+        and content close to expiry is recreated. Concurrent callers for the
+        same JD share one creation.
+        
+        Args:
+            jd_id: Job description ID
+            prefix: JD prompt prefix from _create_jd_prompt_prefix
+            
+        Returns:
+            Cached content name, or None to send the prefix inline
+        """
+        if not GEMINI_CONTEXT_CACHE_ENABLED or len(prefix) // 4 < GEMINI_CONTEXT_CACHE_MIN_TOKENS:
+            return None
+        prefix_hash = hashlib.sha256(f"{GEMINI_MODEL}\0{prefix}".encode('utf-8')).hexdigest()
+        slot = _jd_prefix_caches.get(jd_id)
+        if slot is None:
+            slot = _jd_prefix_caches[jd_id] = {'lock': asyncio.Lock(), 'entry': None}
+        async with slot['lock']:
+            entry = slot['entry']
+            now = time.monotonic()
+            if entry and entry['prefix_hash'] == prefix_hash and entry['expires_at'] > now + _CONTEXT_CACHE_REFRESH_MARGIN:
+                return entry['name']
+            if entry and entry['name'] and entry['prefix_hash'] != prefix_hash:
+                # The JD changed; its old cached content is no longer used
+                try:
+                    await self.client.aio.caches.delete(name=entry['name'])
+                except Exception as e:
+                    logger.warning(f"Failed to delete cached prompt prefix {entry['name']}: {e}")
+            try:
+                cached = await self.client.aio.caches.create(
+                    model=GEMINI_MODEL,
+                    config=genai_types.CreateCachedContentConfig(
+                        contents=[prefix],
+                        ttl=f"{GEMINI_CONTEXT_CACHE_TTL}s",
+                        display_name=f"jd-{jd_id}"
+                    )
+                )
+                name = cached.name
+                logger.info(f"Cached prompt prefix for JD {jd_id} as {name}")
+            except Exception as e:
+                logger.warning(f"Could not cache prompt prefix for JD {jd_id}, sending it inline: {e}")
+                name = None
+            slot['entry'] = {
+                'prefix_hash': prefix_hash,
+                'name': name,
+                'expires_at': now + GEMINI_CONTEXT_CACHE_TTL
+            }
+            # Restart the slot's lifetime along with the new cached content
+            _jd_prefix_caches[jd_id] = slot
+            return name
+    
+    async def _agenerate_content(
+        self,
+        prompt: str,
+        config: Optional[genai_types.GenerateContentConfig] = None,
+        expected_output_tokens: int = GEMINI_EXPECTED_OUTPUT_TOKENS
+    ):
+        """
+        Send one prompt to Gemini under the process-wide limits.
+        
+        Each attempt takes one request from the RPM bucket and an estimate of
+        its tokens (prompt length / 4 plus expected_output_tokens) from
+        the TPM bucket; the estimate is corrected from the response's usage
+        metadata. 429s halve the concurrency limit and successes grow it back.
+        Retries use the server's retry hint when given, otherwise jittered
+        exponential backoff, and the slot is released while waiting.
+        
+        Args:
+            prompt: Prompt text
+            config: Generation config (response schema, cached content)
+            expected_output_tokens: Output tokens reserved from the TPM quota
+            
+        Returns:
+            Gemini API response
+        """
+        estimated_tokens = len(prompt) // 4 + expected_output_tokens
+        async for attempt in _retrying():
+            with attempt:
+                await _request_bucket.acquire(1)
+                await _token_bucket.acquire(estimated_tokens)
+                async with _concurrency_limiter.slot() as started_at:
+                    try:
+                        response = await self.client.aio.models.generate_content(
+                            model=GEMINI_MODEL,
+                            contents=prompt,
+                            config=config
+                        )
+                    except Exception as e:
+                        if _is_throttle(e):
+                            _concurrency_limiter.on_throttle(started_at)
+                        raise
+                await _concurrency_limiter.on_success()
+                usage = getattr(response, 'usage_metadata', None)
+                total_tokens = getattr(usage, 'total_token_count', None)
+                if total_tokens:
+                    _token_bucket.adjust(total_tokens - estimated_tokens)
+        return response
+    
+    async def _astream_content(
+        self,
+        prompt: str,
+        config: Optional[genai_types.GenerateContentConfig] = None,
+        expected_output_tokens: int = GEMINI_EXPECTED_OUTPUT_TOKENS
+    ) -> AsyncIterator[Any]:
+        """
+        Stream one prompt's response chunks under the same limits as
+        _agenerate_content. Opening the stream (up to its first chunk) is
+        retried; the concurrency slot is held until the stream ends.
+        
+        Args:
+            prompt: Prompt text
+            config: Generation config (response schema, cached content)
+            expected_output_tokens: Output tokens reserved from the TPM quota
+            
+        Yields:
+            Gemini API response chunks
+        """
+        estimated_tokens = len(prompt) // 4 + expected_output_tokens
+        async with AsyncExitStack() as slot:
+            async for attempt in _retrying():
+                with attempt:
+                    await _request_bucket.acquire(1)
+                    await _token_bucket.acquire(estimated_tokens)
+                    started_at = await slot.enter_async_context(_concurrency_limiter.slot())
+                    try:
+                        stream = await self.client.aio.models.generate_content_stream(
+                            model=GEMINI_MODEL,
+                            contents=prompt,
+                            config=config
+                        )
+                        chunk = await anext(stream, None)
+                    except Exception as e:
+                        if _is_throttle(e):
+                            _concurrency_limiter.on_throttle(started_at)
+                        # Free the slot while waiting to retry
+                        await slot.aclose()
+                        raise
+            await _concurrency_limiter.on_success()
+            
+            total_tokens = None
+            while chunk is not None:
+                usage = getattr(chunk, 'usage_metadata', None)
+                total_tokens = getattr(usage, 'total_token_count', None) or total_tokens
+                yield chunk
+                chunk = await anext(stream, None)
+            if total_tokens:
+                _token_bucket.adjust(total_tokens - estimated_tokens)
+    
+    def evaluation_cache_key(self, resume_json: Dict[str, Any], jd_text: str) -> str:
+        """
+        Content hash identifying an evaluation: the same key means the same
+        prompt (resume text and fields, jd_text), prompt version and model.
+        
+        Args:
+            resume_json: Structured resume dictionary from MongoDB
+            jd_text: Job description text
+            
+        Returns:
+            Hex SHA-256 digest
+        """
+        prompt = self._create_evaluation_prompt(resume_json, jd_text)
+        digest = hashlib.sha256(f"{PROMPT_VERSION}\0{GEMINI_MODEL}\0".encode('utf-8'))
+        digest.update(prompt.encode('utf-8'))
+        return digest.hexdigest()
+    
     def _create_evaluation_prompt(self, resume_json: Dict[str, Any], jd_text: str) -> str:
         """
-        Create a comprehensive evaluation prompt for Gemini
+        Create a comprehensive evaluation prompt for Gemini: the JD prefix
+        shared by every candidate followed by the candidate's details
         
         Args:
             resume_json: Resume data
@@ -64,48 +672,52 @@ class GeminiClient:
         Returns:
             Formatted prompt string
         """
-        # Extract key information from resume
-        candidate_name = resume_json.get('candidate_name', 'Unknown')
-        skills = resume_json.get('skills', [])
-        education = resume_json.get('education', [])
-        experience = resume_json.get('experience', [])
-        # Use markdown_text if available, else raw_text
-        resume_text = resume_json.get('markdown_text') or resume_json.get('raw_text', '')
-        
-        # Format education and experience for better context
-        education_text = self._format_education(education)
-        experience_text = self._format_experience(experience)
+        return self._create_jd_prompt_prefix(jd_text) + self._create_candidate_prompt(resume_json)
+    
+    def _create_jd_prompt_prefix(self, jd_text: str, packed: bool = False) -> str:
+        """
+        Create the part of the prompt that depends only on the job description:
+        instructions, the JD itself and the output format. It is identical for
+        every candidate evaluated against the JD, so it can be cached.
         
-        prompt = f"""
+        Args:
+            jd_text: Job description text
+            packed: Ask for a JSON array covering several numbered candidates
+            
+        Returns:
+            Prompt prefix string
+        """
+        if packed:
+            task = (
+                "Several candidates follow, each introduced by \"CANDIDATE <number>:\". Evaluate each "
+                "candidate independently against the job description above and return a JSON array "
+                "with one object per candidate, in the same order, each in the following format "
+                "(candidate_id is the candidate's number):"
+            )
+            candidate_id_line = '\n    "candidate_id": <number>,'
+        else:
+            task = (
+                "Evaluate the candidate whose information follows against the job description above "
+                "and provide a detailed assessment in the following JSON format:"
+            )
+            candidate_id_line = ''
+        return f"""
 You are an expert HR recruiter and resume evaluator. Your task is to evaluate a candidate's resume against a specific job description and provide a comprehensive assessment.
 
-CANDIDATE INFORMATION:
-Name: {candidate_name}
-Skills: {', '.join(skills) if skills else 'Not specified'}
-
-EDUCATION:
-{education_text}
-
-EXPERIENCE:
-{experience_text}
-
-RESUME RAW TEXT:
-{resume_text[:2000] if resume_text else 'No resume text available'}
-
 JOB DESCRIPTION:
 {jd_text}
 
 EVALUATION TASK:
-Please evaluate this candidate's resume against the job description and provide a detailed assessment in the following JSON format:
+{task}
 
-{{
+{{{candidate_id_line}
     "score": <0-100>,
     "verdict": "<Shortlist|Needs Review|Reject>",
     "category_breakdown": {{
-        "skills": <0-100>,
+        "technical_skills": <0-100>,
         "experience": <0-100>,
         "education": <0-100>,
-        "jd_alignment": <0-100>
+        "communication": <0-100>
     }},
     "matched_skills": ["skill1", "skill2", ...],
     "missing_skills": ["skill1", "skill2", ...],
@@ -120,7 +732,7 @@ EVALUATION CRITERIA:
   * "Shortlist" (80-100): Strong match, recommend for interview
   * "Needs Review" (50-79): Moderate match, consider with reservations
   * "Reject" (0-49): Poor match, not recommended
-- Category Breakdown: Individual scores for skills, experience, education, and JD alignment
+- Category Breakdown: Individual scores for technical skills, experience, education, and communication
 - Matched Skills: Skills from resume that align with job requirements
 - Missing Skills: Important skills from JD that are missing from resume
 - Pros: Strengths and positive aspects
@@ -129,7 +741,49 @@ EVALUATION CRITERIA:
 
 IMPORTANT: Return ONLY valid JSON. Do not include any additional text or explanations outside the JSON structure.
 """
-        return prompt
+    
+    def _create_candidate_prompt(self, resume_json: Dict[str, Any], log_tokens: bool = False) -> str:
+        """
+        Create the per-candidate part of the prompt. The resume text is
+        cleaned, each section is sent once (the resume's own section, or the
+        parsed entries when it has none) and sections are cut to fit
+        GEMINI_RESUME_TOKEN_BUDGET, prioritizing experience, then skills, then
+        education, then the rest (see utils.prompt_compactor).
+        
+        Args:
+            resume_json: Resume data
+            log_tokens: Log the resume's token count before and after compaction
+            
+        Returns:
+            Prompt suffix string
+        """
+        # Extract key information from resume
+        candidate_name = resume_json.get('candidate_name', 'Unknown')
+        skills = resume_json.get('skills', [])
+        education = resume_json.get('education', [])
+        experience = resume_json.get('experience', [])
+        # Use markdown_text if available, else raw_text
+        resume_text = resume_json.get('markdown_text') or resume_json.get('raw_text', '')
+        
+        sections, tokens_before, tokens_after = compact_resume(
+            resume_text or '',
+            {
+                'experience': self._format_experience(experience) if experience else None,
+                'skills': ', '.join(skills) if skills else None,
+                'education': self._format_education(education) if education else None,
+            },
+            GEMINI_RESUME_TOKEN_BUDGET
+        )
+        if log_tokens:
+            logger.info(f"Resume prompt for {candidate_name}: {tokens_before} tokens before compaction, {tokens_after} after")
+        
+        body = '\n\n'.join(f"{_SECTION_TITLES[name]}:\n{text}" for name, text in sections)
+        return f"""
+CANDIDATE INFORMATION:
+Name: {candidate_name}
+
+{body or 'No resume text available'}
+"""
     
     def _format_education(self, education: list) -> str:
         """Format education information for the prompt"""
@@ -176,7 +830,10 @@ IMPORTANT: Return ONLY valid JSON. Do not include any additional text or explana
     
     def _parse_evaluation_response(self, response) -> Dict[str, Any]:
         """
-        Parse the Gemini response and extract evaluation results
+        Parse the Gemini response and extract evaluation results.
+        The JSON is validated against EvaluationResult in a single pass; only
+        if that fails (e.g. the output was cut off at the token limit) is it
+        repaired and validated again, so a paid response is rarely discarded.
         
         Args:
             response: Gemini API response
@@ -184,68 +841,117 @@ IMPORTANT: Return ONLY valid JSON. Do not include any additional text or explana
         Returns:
             Parsed evaluation dictionary
         """
+        return self._parse_evaluation_text(response.text or '')
+    
+    def _parse_evaluation_text(self, text: str) -> Dict[str, Any]:
+        """
+        Validate (or repair and validate) the JSON text of one evaluation.
+        A result whose verdict had to be derived from its score counts as repaired.
+        """
+        repairs = []
         try:
-            # Extract text content from response
-            content = response.text
-            
-            # Try to extract JSON from the response
-            # Sometimes Gemini includes markdown formatting
-            if '```json' in content:
-                # Extract JSON from markdown code block
-                start = content.find('```json') + 7
-                end = content.find('```', start)
-                json_str = content[start:end].strip()
-            elif '```' in content:
-                # Extract JSON from code block
-                start = content.find('```') + 3
-                end = content.find('```', start)
-                json_str = content[start:end].strip()
-            else:
-                # Assume the entire response is JSON
-                json_str = content.strip()
-            
-            # Parse JSON
-            evaluation = json.loads(json_str)
-            
-            # Validate required fields
-            required_fields = [
-                'score', 'verdict', 'category_breakdown', 
-                'matched_skills', 'missing_skills', 'pros', 'cons', 'feedback'
-            ]
-            
-            for field in required_fields:
-                if field not in evaluation:
-                    raise ValueError(f"Missing required field: {field}")
-            
-            # Validate score range
-            if not (0 <= evaluation['score'] <= 100):
-                evaluation['score'] = max(0, min(100, evaluation['score']))
-            
-            # Validate verdict
-            valid_verdicts = ['Shortlist', 'Needs Review', 'Reject']
-            if evaluation['verdict'] not in valid_verdicts:
-                evaluation['verdict'] = 'Needs Review'
-            
-            # Validate category breakdown
-            # Map Gemini output to required schema fields
-            cb = evaluation['category_breakdown']
-            mapped_cb = {
-                'technical_skills': max(0, min(100, cb.get('skills', 0))),
-                'experience': max(0, min(100, cb.get('experience', 0))),
-                'education': max(0, min(100, cb.get('education', 0))),
-                'communication': max(0, min(100, cb.get('communication', 0)))
-            }
-            evaluation['category_breakdown'] = mapped_cb
+            evaluation = EvaluationResult.model_validate_json(text, context={"repairs": repairs})
+            self._count_parsed(repairs)
+            return evaluation.model_dump()
+        except ValidationError:
+            repairs.clear()
+        try:
+            data = loads_truncated_json(strip_code_fence(text))
+            if isinstance(data, dict):
+                # Feedback comes last, so truncation is most likely to lose it
+                data.setdefault('feedback', '')
+                # A missing verdict is derived from the score like an invalid one
+                data.setdefault('verdict', None)
+            evaluation = EvaluationResult.model_validate(data, context={"repairs": repairs})
+        except ValueError as e:
+            _parse_stats["failed"] += 1
+            logger.error(f"Failed to parse evaluation response: {e}")
+            logger.error(f"Raw response: {text}")
+            raise Exception(f"Failed to parse evaluation response: {str(e)}")
+        _parse_stats["repaired"] += 1
+        logger.warning("Evaluation response was malformed or truncated and has been repaired")
+        return evaluation.model_dump()
+    
+    def _count_parsed(self, repairs: List[str], repaired: bool = False):
+        """Count a valid result as parsed, or repaired if the JSON or any field was repaired"""
+        if repairs:
+            logger.warning(f"Evaluation response had invalid fields that were derived: {', '.join(repairs)}")
+        _parse_stats["repaired" if repaired or repairs else "parsed"] += 1
+    
+    def _parse_packed_response(self, response, count: int) -> Dict[int, Dict[str, Any]]:
+        """
+        Parse the JSON array returned for a packed evaluation. The results are
+        only trusted if there is exactly one entry per candidate: a repeated,
+        unknown or missing candidate_id means the model may have mixed
+        candidates up, so the whole pack is rejected. An entry that fails
+        validation but carries a usable candidate_id only loses its own result.
+        
+        Args:
+            response: Gemini API response
+            count: Number of candidates in the pack, numbered from 1
             
-            return evaluation
+        Returns:
+            Validated evaluation dictionaries by candidate number, None for
+            candidates whose entry failed validation
             
-        except json.JSONDecodeError as e:
-            logger.error(f"Failed to parse JSON response: {e}")
-            logger.error(f"Raw response: {response.text}")
-            raise Exception("Failed to parse evaluation response")
-        except Exception as e:
-            logger.error(f"Error parsing evaluation response: {e}")
-            raise Exception(f"Failed to parse evaluation response: {str(e)}")
+        Raises:
+            ValueError: If the response does not hold one entry per candidate
+        """
+        text = response.text or ''
+        repaired = False
+        try:
+            items = json.loads(text)
+        except json.JSONDecodeError:
+            try:
+                items = loads_truncated_json(strip_code_fence(text))
+                repaired = True
+            except ValueError:
+                items = None
+        if not isinstance(items, list):
+            _parse_stats["failed"] += 1
+            raise ValueError("Packed evaluation response is not a JSON array")
+        
+        results: Dict[int, Optional[Dict[str, Any]]] = {}
+        all_repairs = []
+        for item in items:
+            repairs = []
+            try:
+                evaluation = PackedEvaluationResult.model_validate(item, context={"repairs": repairs})
+                candidate_id = evaluation.candidate_id
+                result = evaluation.model_dump(exclude={'candidate_id'})
+            except ValidationError as e:
+                candidate_id = self._packed_candidate_id(item)
+                if candidate_id is None:
+                    _parse_stats["failed"] += 1
+                    raise ValueError(f"Invalid packed evaluation result without a candidate_id: {e}")
+                logger.warning(f"Invalid packed evaluation result for candidate {candidate_id}: {e}")
+                result = None
+            if candidate_id in results:
+                _parse_stats["failed"] += 1
+                raise ValueError(f"Packed evaluation repeats candidate_id {candidate_id}")
+            results[candidate_id] = result
+            all_repairs.append(repairs)
+        if set(results) != set(range(1, count + 1)):
+            _parse_stats["failed"] += 1
+            raise ValueError(
+                f"Packed evaluation has candidate_ids {sorted(results)}, expected 1 to {count}"
+            )
+        for result, repairs in zip(results.values(), all_repairs):
+            if result is None:
+                _parse_stats["failed"] += 1
+            else:
+                self._count_parsed(repairs, repaired)
+        return results
+    
+    def _packed_candidate_id(self, item: Any) -> Optional[int]:
+        """The candidate_id of a packed entry that failed validation, if it is a usable number"""
+        value = item.get('candidate_id') if isinstance(item, dict) else None
+        if isinstance(value, bool):
+            return None
+        try:
+            return int(value) if float(value) == int(value) else None
+        except (TypeError, ValueError, OverflowError):
+            return None
     
     def test_connection(self) -> bool:
         """
@@ -259,7 +965,7 @@ IMPORTANT: Return ONLY valid JSON. Do not include any additional text or explana
             test_prompt = "Hello, please respond with 'OK' if you can read this message."
             
             response = self.client.models.generate_content(
-                model="gemini-2.5-flash",
+                model=GEMINI_MODEL,
                 contents=test_prompt
             )
             
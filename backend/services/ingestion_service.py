@@ -0,0 +1,86 @@
+from typing import Optional
+from bson import ObjectId
+from models.ingestion_job import IngestionJobModel
+from schemas.ingestion_job import IngestionJobResponse
+
+class IngestionService:
+    def __init__(self):
+        self.model = IngestionJobModel()
+
+    def _convert_objectids_to_strings(self, data: dict) -> dict:
+        """Convert ObjectIds to strings in the data dictionary"""
+        converted = {}
+        for key, value in data.items():
+            if isinstance(value, ObjectId):
+                converted[key] = str(value)
+            elif isinstance(value, list):
+                converted[key] = [str(item) if isinstance(item, ObjectId) else item for item in value]
+            else:
+                converted[key] = value
+        return converted
+
+    def create_job(
+        self,
+        content_sha256: str,
+        jd_id: str,
+        filename: Optional[str],
+        candidate_name: Optional[str] = None,
+        email: Optional[str] = None
+    ) -> IngestionJobResponse:
+        """Queue a stored PDF for background ingestion"""
+        result = self.model.create({
+            "content_sha256": content_sha256,
+            "jd_id": ObjectId(jd_id),
+            "filename": filename,
+            "candidate_name": candidate_name,
+            "email": email
+        })
+        return IngestionJobResponse(**self._convert_objectids_to_strings(result))
+
+    def create_reprocess_job(self, parser_version: str, limit: int = 0) -> IngestionJobResponse:
+        """
+        Queue re-extraction of resumes parsed by another parser version. While
+        a reprocess job is queued or running, that job is returned instead of
+        queuing another one.
+        """
+        result = self.model.find_active("reprocess")
+        if result is None:
+            result = self.model.create({
+                "kind": "reprocess",
+                "parser_version": parser_version,
+                "limit": limit,
+                "counts": {"checked": 0, "reprocessed": 0, "missing_pdf": 0, "failed": 0},
+                "after_id": None
+            })
+        return IngestionJobResponse(**self._convert_objectids_to_strings(result))
+
+    def get_job(self, job_id: str) -> Optional[IngestionJobResponse]:
+        """Get an ingestion job by ID"""
+        try:
+            result = self.model.get_by_id(ObjectId(job_id))
+            if result:
+                return IngestionJobResponse(**self._convert_objectids_to_strings(result))
+            return None
+        except Exception:
+            return None
+
+    def claim_next_job(self, lease_seconds: float, max_attempts: int) -> Optional[dict]:
+        """Claim the oldest runnable job for this worker (raw document)"""
+        self.model.fail_exhausted(max_attempts)
+        return self.model.claim_next(lease_seconds, max_attempts)
+
+    def set_stage(self, job_id: ObjectId, stage: str, lease_seconds: float) -> bool:
+        """Record progress of a running job"""
+        return self.model.set_stage(job_id, stage, lease_seconds)
+
+    def record_progress(self, job_id: ObjectId, lease_seconds: float, **progress) -> bool:
+        """Save progress of a long-running job (e.g. counts) and renew its lease"""
+        return self.model.record_progress(job_id, progress, lease_seconds)
+
+    def complete_job(self, job_id: ObjectId, resume_id: Optional[str] = None) -> bool:
+        """Mark a job completed, with the resulting resume for ingest jobs"""
+        return self.model.finish(job_id, "completed", resume_id=ObjectId(resume_id) if resume_id else None)
+
+    def fail_job(self, job_id: ObjectId, error: str) -> bool:
+        """Mark a job failed"""
+        return self.model.finish(job_id, "failed", error=error)
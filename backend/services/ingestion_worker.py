@@ -0,0 +1,241 @@
+import os
+import asyncio
+import logging
+from typing import List, Optional
+from services.ingestion_service import IngestionService
+from services.resume_service import ResumeService
+from utils.parse_cache import parse_resume_cached
+from utils.pdf_parser import PARSER_VERSION
+from utils.pdf_pool import run_pdf_job, start_pdf_pool, shutdown_pdf_pool, PDF_PARSE_WORKERS, PDF_PARSE_TIMEOUT
+from utils.pdf_store import get_stored_pdf
+
+logger = logging.getLogger(__name__)
+
+# Run the ingestion worker inside the API process (disable to run it separately
+# with `python -m services.ingestion_worker`)
+INGESTION_WORKER_ENABLED = os.getenv("INGESTION_WORKER_ENABLED", "true").lower() == "true"
+# Number of jobs processed concurrently by one worker
+INGESTION_CONCURRENCY = int(os.getenv("INGESTION_CONCURRENCY", str(max(PDF_PARSE_WORKERS, 1))))
+# Seconds between checks for new jobs when idle (new jobs in this process wake it at once)
+INGESTION_POLL_INTERVAL = float(os.getenv("INGESTION_POLL_INTERVAL", "1.0"))
+# Times a job is picked up again after its worker died before it is failed
+INGESTION_MAX_ATTEMPTS = int(os.getenv("INGESTION_MAX_ATTEMPTS", "3"))
+# Number of outdated resumes re-extracted and written per bulk_write call
+REPROCESS_BATCH_SIZE = int(os.getenv("REPROCESS_BATCH_SIZE", "100"))
+
+# A job whose lease is not renewed in time is assumed abandoned and is retried
+_JOB_LEASE_SECONDS = PDF_PARSE_TIMEOUT + 60
+
+class IngestionWorker:
+    """
+    Processes queued ingestion jobs from the ingestion_jobs collection.
+    Jobs are claimed atomically with a lease, so several workers (or API
+    processes) can share the queue and jobs interrupted by a restart are
+    picked up again once their lease expires.
+    """
+
+    def __init__(self, concurrency: int = INGESTION_CONCURRENCY):
+        self.concurrency = max(concurrency, 1)
+        self._wakeup = asyncio.Event()
+        self._tasks: List[asyncio.Task] = []
+        self._ingestion_service: Optional[IngestionService] = None
+        self._resume_service: Optional[ResumeService] = None
+
+    def start(self):
+        """Start the worker loops on the running event loop"""
+        self._tasks = [asyncio.create_task(self._run()) for _ in range(self.concurrency)]
+        logger.info(f"Ingestion worker started with concurrency {self.concurrency}")
+
+    async def stop(self):
+        """Stop the worker loops; interrupted jobs are retried after their lease expires"""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    def notify(self):
+        """Wake idle loops because a job was just queued"""
+        self._wakeup.set()
+
+    async def _run(self):
+        while True:
+            try:
+                if self._ingestion_service is None:
+                    self._ingestion_service = await asyncio.to_thread(IngestionService)
+                    self._resume_service = await asyncio.to_thread(ResumeService)
+                job = await asyncio.to_thread(
+                    self._ingestion_service.claim_next_job, _JOB_LEASE_SECONDS, INGESTION_MAX_ATTEMPTS
+                )
+            except Exception as e:
+                logger.error(f"Failed to claim ingestion job: {e}")
+                job = None
+            if job is None:
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), INGESTION_POLL_INTERVAL)
+                except asyncio.TimeoutError:
+                    pass
+                self._wakeup.clear()
+                continue
+            await self._process(job)
+
+    async def _process(self, job: dict):
+        """
+        Run one ingest job through its stages: parsing, saving, done; reprocess
+        jobs are handed to _process_reprocess. Database calls are synchronous
+        pymongo, so they run in threads to keep the event loop (shared with the
+        API when the worker runs in-process) responsive.
+        """
+        if job.get('kind') == "reprocess":
+            await self._process_reprocess(job)
+            return
+        job_id = job['_id']
+        jd_id = str(job['jd_id'])
+        sha = job['content_sha256']
+        try:
+            await asyncio.to_thread(self._ingestion_service.set_stage, job_id, "parsing", _JOB_LEASE_SECONDS)
+            existing = await asyncio.to_thread(self._resume_service.reuse_existing_upload, sha, jd_id)
+            if existing:
+                await asyncio.to_thread(self._ingestion_service.complete_job, job_id, existing.id)
+                return
+
+            pdf_path = await asyncio.to_thread(get_stored_pdf, sha)
+            if pdf_path is None:
+                await asyncio.to_thread(self._ingestion_service.fail_job, job_id, "Stored PDF is missing")
+                return
+            parsed = await run_pdf_job(parse_resume_cached, pdf_path, sha)
+            if not parsed['valid']:
+                await asyncio.to_thread(self._ingestion_service.fail_job, job_id, "Invalid PDF file")
+                return
+            if not parsed['text']:
+                await asyncio.to_thread(self._ingestion_service.fail_job, job_id, "Could not extract text from PDF")
+                return
+
+            await asyncio.to_thread(self._ingestion_service.set_stage, job_id, "saving", _JOB_LEASE_SECONDS)
+            resume_data = await asyncio.to_thread(
+                self._resume_service.build_resume_from_pdf,
+                parsed, jd_id, job.get('filename'), job.get('candidate_name'), job.get('email'), sha
+            )
+            resume = await asyncio.to_thread(self._resume_service.create_resume, resume_data)
+            await asyncio.to_thread(self._ingestion_service.complete_job, job_id, resume.id)
+        except asyncio.CancelledError:
+            raise
+        except asyncio.TimeoutError:
+            await asyncio.to_thread(self._ingestion_service.fail_job, job_id, "Timed out while parsing PDF")
+        except Exception as e:
+            logger.error(f"Ingestion job {job_id} failed: {e}")
+            try:
+                await asyncio.to_thread(self._ingestion_service.fail_job, job_id, f"Failed to process resume: {str(e)}")
+            except Exception as update_error:
+                logger.error(f"Failed to record failure of ingestion job {job_id}: {update_error}")
+
+    async def _process_reprocess(self, job: dict):
+        """
+        Re-extract resumes whose parser_version is older than this process's
+        parser, from their stored PDFs. Outdated resumes are processed in pages
+        of REPROCESS_BATCH_SIZE: each page is parsed in parallel in the PDF
+        worker pool and written back with one bulk_write, then the counts and
+        the last resume ID are saved on the job, so a job picked up again after
+        a restart continues where it stopped. Resumes whose PDF was never
+        stored are counted as missing_pdf.
+        """
+        job_id = job['_id']
+        limit = job.get('limit') or 0
+        counts = dict(job.get('counts') or {"checked": 0, "reprocessed": 0, "missing_pdf": 0, "failed": 0})
+        after_id = job.get('after_id')
+        semaphore = asyncio.Semaphore(max(PDF_PARSE_WORKERS, 1))
+
+        async def reparse(resume: dict) -> tuple:
+            sha = resume['content_sha256']
+            pdf_path = await asyncio.to_thread(get_stored_pdf, sha)
+            if pdf_path is None:
+                return resume['_id'], None, "missing_pdf"
+            async with semaphore:
+                try:
+                    parsed = await run_pdf_job(parse_resume_cached, pdf_path, sha)
+                except Exception:
+                    return resume['_id'], None, "failed"
+            if not parsed['valid'] or not parsed['text']:
+                return resume['_id'], None, "failed"
+            return resume['_id'], parsed, None
+
+        async def renew_lease():
+            # A page can take longer than the lease when PDFs are slow
+            while True:
+                await asyncio.sleep(_JOB_LEASE_SECONDS / 3)
+                await asyncio.to_thread(self._ingestion_service.record_progress, job_id, _JOB_LEASE_SECONDS)
+
+        heartbeat = asyncio.create_task(renew_lease())
+        try:
+            await asyncio.to_thread(self._ingestion_service.set_stage, job_id, "reprocessing", _JOB_LEASE_SECONDS)
+            while not limit or counts["checked"] < limit:
+                page_size = REPROCESS_BATCH_SIZE if not limit else min(REPROCESS_BATCH_SIZE, limit - counts["checked"])
+                outdated = await asyncio.to_thread(
+                    self._resume_service.get_outdated_resumes, PARSER_VERSION, after_id, page_size
+                )
+                if not outdated:
+                    break
+                after_id = outdated[-1]['_id']
+                counts["checked"] += len(outdated)
+
+                reparsed = []
+                for resume_id, parsed, problem in await asyncio.gather(*[reparse(resume) for resume in outdated]):
+                    if problem:
+                        counts[problem] += 1
+                    else:
+                        reparsed.append((resume_id, parsed))
+                counts["reprocessed"] += await asyncio.to_thread(self._resume_service.apply_reparsed, reparsed)
+                await asyncio.to_thread(
+                    self._ingestion_service.record_progress, job_id, _JOB_LEASE_SECONDS,
+                    counts=counts, after_id=after_id, parser_version=PARSER_VERSION
+                )
+            await asyncio.to_thread(self._ingestion_service.complete_job, job_id)
+            logger.info(f"Reprocess job {job_id} finished: {counts}")
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"Reprocess job {job_id} failed: {e}")
+            try:
+                await asyncio.to_thread(self._ingestion_service.fail_job, job_id, f"Failed to reprocess resumes: {str(e)}")
+            except Exception as update_error:
+                logger.error(f"Failed to record failure of reprocess job {job_id}: {update_error}")
+        finally:
+            heartbeat.cancel()
+
+# Global worker instance
+_worker: Optional[IngestionWorker] = None
+
+def start_ingestion_worker():
+    """Start the in-process ingestion worker, unless disabled by INGESTION_WORKER_ENABLED"""
+    global _worker
+    if not INGESTION_WORKER_ENABLED:
+        logger.info("In-process ingestion worker disabled")
+        return
+    if _worker is None:
+        _worker = IngestionWorker()
+        _worker.start()
+
+async def stop_ingestion_worker():
+    """Stop the in-process ingestion worker"""
+    global _worker
+    if _worker is not None:
+        await _worker.stop()
+        _worker = None
+
+def notify_ingestion_worker():
+    """Tell the in-process worker a job was queued (separate workers poll instead)"""
+    if _worker is not None:
+        _worker.notify()
+
+async def _run_standalone():
+    await start_pdf_pool()
+    worker = IngestionWorker()
+    worker.start()
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await worker.stop()
+        shutdown_pdf_pool()
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(_run_standalone())
@@ -2,6 +2,7 @@ from typing import List, Optional, Dict, Any
 from bson import ObjectId
 from models.job_description import JobDescriptionModel
 from schemas.job_description import JobDescriptionCreate, JobDescriptionUpdate, JobDescriptionResponse
+from utils.skill_extractor import extract_skills
 
 class JobDescriptionService:
     def __init__(self):
@@ -22,6 +23,7 @@ class JobDescriptionService:
     def create_job_description(self, job_description: JobDescriptionCreate) -> JobDescriptionResponse:
         """Create a new job description"""
         job_description_data = job_description.dict()
+        job_description_data['skills'] = extract_skills(job_description_data['jd_text'])
         result = self.model.create(job_description_data)
         # Convert ObjectIds to strings
         result = self._convert_objectids_to_strings(result)
@@ -55,6 +57,8 @@ class JobDescriptionService:
         try:
             object_id = ObjectId(jd_id)
             update_data = {k: v for k, v in job_description.dict().items() if v is not None}
+            if 'jd_text' in update_data:
+                update_data['skills'] = extract_skills(update_data['jd_text'])
             result = self.model.update(object_id, update_data)
             if result:
                 # Convert ObjectIds to strings
@@ -0,0 +1,128 @@
+import os
+import asyncio
+from abc import ABC, abstractmethod
+from typing import List, Dict, Any, Optional, AsyncIterator
+
+# Model backend evaluations are made with: "gemini" (Google Gemini) or "fake"
+# (local, no network; see services/fake_llm_backend.py)
+LLM_BACKEND = os.getenv("LLM_BACKEND", "gemini").lower()
+
+class LLMUnavailableError(Exception):
+    """The model backend kept throttling or failing; the request may succeed later"""
+
+    def __init__(self, message: str, retry_after: Optional[float] = None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+class LLMBackend(ABC):
+    """
+    Model that EvaluationService evaluates resumes with. Results are
+    dictionaries with the fields of schemas.evaluation.EvaluationResult.
+    """
+
+    # Name reported by the connection test
+    name = "llm"
+
+    @abstractmethod
+    def evaluation_cache_key(self, resume_json: Dict[str, Any], jd_text: str) -> str:
+        """
+        Content hash identifying an evaluation: the same key means this backend
+        would be asked exactly the same question
+
+        Args:
+            resume_json: Structured resume dictionary from MongoDB
+            jd_text: Job description text
+
+        Returns:
+            Hex digest
+        """
+
+    @abstractmethod
+    def evaluate_resume_with_jd(self, resume_json: Dict[str, Any], jd_text: str) -> Dict[str, Any]:
+        """Evaluate a resume against a job description, blocking until done"""
+
+    @abstractmethod
+    async def aevaluate_resume_with_jd(
+        self,
+        resume_json: Dict[str, Any],
+        jd_text: str,
+        jd_id: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Evaluate a resume against a job description without blocking the event loop
+
+        Args:
+            resume_json: Structured resume dictionary from MongoDB
+            jd_text: Job description text
+            jd_id: Job description ID, for backends that cache per JD
+
+        Returns:
+            Dictionary containing evaluation results
+
+        Raises:
+            LLMUnavailableError: If the backend is throttling or unavailable
+        """
+
+    async def astream_evaluate_resume_with_jd(
+        self,
+        resume_json: Dict[str, Any],
+        jd_text: str,
+        jd_id: Optional[str] = None
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Evaluate a resume, yielding the output as it is generated: any number of
+        {"partial": dict} items with the fields received so far (the last field
+        may be incomplete), then one {"result": dict} with the validated
+        evaluation. By default the evaluation is made with
+        aevaluate_resume_with_jd and yielded as the result alone.
+
+        Raises:
+            LLMUnavailableError: If the backend is throttling or unavailable
+        """
+        yield {"result": await self.aevaluate_resume_with_jd(resume_json, jd_text, jd_id)}
+
+    def plan_packs(self, resume_jsons: List[Dict[str, Any]]) -> List[List[int]]:
+        """
+        Split resumes into the groups aevaluate_resumes_with_jd is called with,
+        as lists of indexes into resume_jsons. By default every resume is
+        evaluated on its own.
+        """
+        return [[index] for index in range(len(resume_jsons))]
+
+    async def aevaluate_resumes_with_jd(
+        self,
+        resume_jsons: List[Dict[str, Any]],
+        jd_text: str,
+        jd_id: Optional[str] = None
+    ) -> List[Any]:
+        """
+        Evaluate a pack of resumes against one job description. By default
+        each resume is evaluated concurrently with aevaluate_resume_with_jd.
+
+        Returns:
+            One entry per resume, in order: the evaluation dictionary, or the
+            exception raised while evaluating it
+        """
+        return await asyncio.gather(
+            *[self.aevaluate_resume_with_jd(resume_json, jd_text, jd_id) for resume_json in resume_jsons],
+            return_exceptions=True
+        )
+
+    @abstractmethod
+    def test_connection(self) -> bool:
+        """Whether the backend can be reached"""
+
+def get_llm_backend() -> LLMBackend:
+    """
+    Create the backend selected by LLM_BACKEND
+
+    Raises:
+        ValueError: If LLM_BACKEND is unknown, or the backend is not configured
+    """
+    if LLM_BACKEND == "gemini":
+        from services.gemini_client import GeminiClient
+        return GeminiClient()
+    if LLM_BACKEND == "fake":
+        from services.fake_llm_backend import FakeLLMBackend
+        return FakeLLMBackend()
+    raise ValueError(f"Unknown LLM_BACKEND '{LLM_BACKEND}' (expected 'gemini' or 'fake')")
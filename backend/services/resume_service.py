@@ -1,8 +1,22 @@
 from typing import List, Optional, Dict, Any
 from bson import ObjectId
+from pymongo.errors import BulkWriteError, DuplicateKeyError
 from models.resume import ResumeModel
 from schemas.resume import ResumeCreate, ResumeUpdate, ResumeResponse, ResumeUploadRequest
 from services.evaluation_service import EvaluationService
+import os
+import re
+import time
+
+def sanitize_filename(filename: str, fallback: str) -> str:
+    # Remove path separators and non-printable characters
+    filename = os.path.basename(filename)
+    filename = re.sub(r'[^\w\-. ]', '', filename)
+    # Limit length
+    max_length = 100
+    if len(filename) > max_length or not filename:
+        filename = fallback
+    return filename
 
 class ResumeService:
     def __init__(self):
@@ -23,11 +37,140 @@ class ResumeService:
     def create_resume(self, resume: ResumeCreate) -> ResumeResponse:
         """Create a new resume"""
         resume_data = resume.dict()
-        result = self.model.create(resume_data)
+        try:
+            result = self.model.create(resume_data)
+        except DuplicateKeyError:
+            # Same PDF was stored concurrently; attach to the existing resume instead
+            if not resume_data.get('content_sha256'):
+                raise
+            result = self._merge_into_existing(resume_data)
         # Convert ObjectIds to strings
         result = self._convert_objectids_to_strings(result)
         return ResumeResponse(**result)
     
+    def create_resumes(self, resumes: List[ResumeCreate]) -> List[ResumeResponse]:
+        """
+        Create several resumes with a single database round-trip.
+        Resumes whose PDF already exists are associated with the existing document.
+        """
+        resumes_data = [resume.dict() for resume in resumes]
+        try:
+            results = self.model.create_many(resumes_data)
+        except BulkWriteError as e:
+            write_errors = {error['index']: error for error in e.details.get('writeErrors', [])}
+            if any(error.get('code') != 11000 for error in write_errors.values()):
+                raise
+            results = [
+                self._merge_into_existing(resume_data) if index in write_errors else resume_data
+                for index, resume_data in enumerate(resumes_data)
+            ]
+        return [ResumeResponse(**self._convert_objectids_to_strings(result)) for result in results]
+    
+    def _merge_into_existing(self, resume_data: dict) -> dict:
+        """Associate the JDs of a duplicate upload with the stored resume for the same PDF"""
+        existing = self.model.get_by_content_hash(resume_data['content_sha256'])
+        for jd_id in resume_data.get('jd_ids', []):
+            self.model.add_jd_association(existing['_id'], jd_id)
+        return self.model.get_by_id(existing['_id'])
+    
+    def reuse_existing_upload(self, content_sha256: str, jd_id: str) -> Optional[ResumeResponse]:
+        """
+        If a resume with this PDF hash already exists, associate it with jd_id
+        and return it, so the upload does not need to be parsed again.
+        """
+        existing = self.model.get_by_content_hash(content_sha256)
+        if not existing:
+            return None
+        self.model.add_jd_association(existing['_id'], ObjectId(jd_id))
+        result = self.model.get_by_id(existing['_id'])
+        return ResumeResponse(**self._convert_objectids_to_strings(result))
+    
+    def reuse_existing_uploads(self, content_hashes: List[str], jd_id: str) -> Dict[str, ResumeResponse]:
+        """
+        Bulk variant of reuse_existing_upload.
+        Returns a mapping of PDF hash to the existing (now associated) resume.
+        """
+        existing = self.model.get_by_content_hashes(content_hashes)
+        if not existing:
+            return {}
+        jd_object_id = ObjectId(jd_id)
+        self.model.add_jd_association_many([resume['_id'] for resume in existing], jd_object_id)
+        reused = {}
+        for resume in existing:
+            jd_ids = resume.setdefault('jd_ids', [])
+            if jd_object_id not in jd_ids:
+                jd_ids.append(jd_object_id)
+            reused[resume['content_sha256']] = ResumeResponse(**self._convert_objectids_to_strings(resume))
+        return reused
+    
+    def build_resume_from_pdf(
+        self,
+        parsed: dict,
+        jd_id: str,
+        filename: Optional[str],
+        candidate_name: Optional[str] = None,
+        email: Optional[str] = None,
+        content_sha256: Optional[str] = None
+    ) -> ResumeCreate:
+        """
+        Build a ResumeCreate from the output of PDFTextExtractor.parse_resume.
+        Provided candidate_name/email take precedence over extracted values.
+        """
+        # Use provided values or extracted values
+        final_name = candidate_name or parsed['candidate_name'] or "Unknown Candidate"
+        final_email = email or parsed['email'] or parsed['email_from_link'] or "unknown@example.com"
+        
+        # Determine filename
+        fallback_name = f"{final_name.replace(' ', '_')}_{int(time.time())}.pdf"
+        safe_filename = sanitize_filename(filename, fallback_name) if filename else fallback_name
+        
+        return ResumeCreate(
+            candidate_name=final_name,
+            email=final_email,
+            skills=parsed.get('skills', []),
+            education=parsed['education'],
+            experience=parsed['experience'],
+            raw_text=parsed['text'],
+            markdown_text=parsed['markdown'],
+            jd_ids=[ObjectId(jd_id)],
+            filename=safe_filename,
+            links=parsed['links'],
+            content_sha256=content_sha256,
+            text_truncated=parsed.get('truncated', False),
+            parser_version=parsed.get('parser_version')
+        )
+    
+    def get_outdated_resumes(self, parser_version: str, after_id: Optional[ObjectId] = None, limit: int = 100) -> List[dict]:
+        """Get (_id, content_sha256) of resumes extracted by another parser version"""
+        return self.model.get_outdated(parser_version, after_id, limit)
+    
+    def apply_reparsed(self, reparsed: List[tuple]) -> int:
+        """
+        Overwrite the extracted fields of resumes with fresh parse results.
+        Candidate name and email are kept, since they may have been provided
+        at upload time or edited since.
+        
+        Args:
+            reparsed: List of (resume_id, parsed) tuples, parsed being the
+                output of PDFTextExtractor.parse_resume
+                
+        Returns:
+            Number of updated resumes
+        """
+        updates = []
+        for resume_id, parsed in reparsed:
+            updates.append((resume_id, {
+                'skills': parsed['skills'],
+                'education': parsed['education'],
+                'experience': parsed['experience'],
+                'raw_text': parsed['text'],
+                'markdown_text': parsed['markdown'],
+                'links': parsed['links'],
+                'text_truncated': parsed.get('truncated', False),
+                'parser_version': parsed['parser_version']
+            }))
+        return self.model.update_many_by_id(updates)
+    
     def get_resume(self, resume_id: str) -> Optional[ResumeResponse]:
         """Get a resume by ID"""
         try:
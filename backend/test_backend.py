@@ -81,6 +81,293 @@ def test_schemas():
         print(f"✗ Schema validation error: {e}")
         return False
 
+def test_pdf_ingestion():
+    """Test single-pass PDF ingestion on a generated PDF"""
+    try:
+        import fitz
+        import tempfile
+        from utils.pdf_parser import PDFTextExtractor
+        
+        # Build a small two-page resume with a GitHub link
+        doc = fitz.open()
+        for _ in range(2):
+            page = doc.new_page()
+            page.insert_text((72, 72), "John Doe\njohn.doe@example.com\nEducation\nBachelor of Science, State University 2020")
+            page.insert_link({'kind': fitz.LINK_URI, 'from': fitz.Rect(72, 60, 200, 80), 'uri': 'https://github.com/johndoe'})
+        with tempfile.NamedTemporaryFile(suffix='.pdf', delete=False) as temp_file:
+            temp_file_path = temp_file.name
+        doc.save(temp_file_path)
+        doc.close()
+        
+        try:
+            parsed = PDFTextExtractor.ingest_pdf(temp_file_path)
+        finally:
+            os.unlink(temp_file_path)
+        
+        assert parsed['valid'], "PDF should be valid"
+        assert parsed['page_count'] == 2, "Expected 2 pages"
+        assert "John Doe" in parsed['text'], "Text should contain candidate name"
+        assert parsed['markdown'], "Markdown should not be empty"
+        assert [link['type'] for link in parsed['links']] == ['github', 'github'], "Expected GitHub links"
+        print("✓ Single-pass PDF ingestion passed")
+        
+        return True
+        
+    except Exception as e:
+        print(f"✗ PDF ingestion error: {e}")
+        return False
+
+def test_section_segmenter():
+    """Test resume section segmentation and experience extraction"""
+    try:
+        from utils.resume_sections import segment_sections
+        from utils.pdf_parser import PDFTextExtractor
+        
+        text = (
+            "John Doe\njohn.doe@example.com\n"
+            "Experience\nSoftware Engineer at Tech Corp, Jan 2020 - Present\n- Built APIs with FastAPI\n"
+            "Education\nBachelor of Science, State University 2019\n"
+            "Skills\nPython, MongoDB\n"
+        )
+        sections = segment_sections(text)
+        assert set(sections) == {'contact', 'experience', 'education', 'skills'}, f"Unexpected sections: {sections}"
+        
+        experience = PDFTextExtractor.extract_experience(text, sections)
+        assert len(experience) == 1, "Expected one experience entry"
+        assert experience[0]['title'] == "Software Engineer" and experience[0]['company'] == "Tech Corp"
+        assert experience[0]['end_date'] == "Present"
+        print("✓ Section segmentation passed")
+        
+        return True
+        
+    except Exception as e:
+        print(f"✗ Section segmentation error: {e}")
+        return False
+
+def test_skill_extractor():
+    """Test dictionary-based skill extraction"""
+    try:
+        from utils.skill_extractor import extract_skills
+        
+        skills = extract_skills("Built REST APIs in Python with FastAPI; JavaScript, C++ and Golang. Spring 2020 intern.")
+        assert skills == ['REST APIs', 'Python', 'FastAPI', 'JavaScript', 'C++', 'Go'], f"Unexpected skills: {skills}"
+        assert 'Java' not in skills, "Java must not match inside JavaScript"
+        print("✓ Skill extraction passed")
+        
+        return True
+        
+    except Exception as e:
+        print(f"✗ Skill extraction error: {e}")
+        return False
+
+def test_cascade_triage():
+    """Test that a cascade run never replaces an AI evaluation with a provisional one"""
+    try:
+        from datetime import datetime, timedelta
+        from services.evaluation_service import EvaluationService
+        
+        # Only pure helpers are used, so no database connection is needed
+        service = EvaluationService.__new__(EvaluationService)
+        stale_ai = {'cache_key': 'old-prompt', 'evaluated_at': datetime.utcnow() - timedelta(days=30), 'provisional': False}
+        fresh_ai = {'cache_key': 'key', 'evaluated_at': datetime.utcnow(), 'provisional': False}
+        provisional = {'cache_key': 'prescreen:key', 'evaluated_at': datetime.utcnow(), 'provisional': True}
+        
+        assert service._triage(stale_ai, 'key', False, screened_out=True) == "stale", "Stale AI evaluation must be kept"
+        assert service._triage(stale_ai, 'key', True, screened_out=True) == "stale", "force_refresh must not downgrade either"
+        assert service._triage(stale_ai, 'key', False, screened_out=False) == "evaluate"
+        assert service._triage(fresh_ai, 'key', False, screened_out=True) == "cached"
+        assert service._triage(provisional, 'key', False, screened_out=True) == "provisional"
+        assert service._triage(None, 'key', False, screened_out=True) == "provisional"
+        assert service._triage(provisional, 'key', False, screened_out=False) == "evaluate"
+        print("✓ Cascade triage passed")
+        
+        return True
+        
+    except Exception as e:
+        print(f"✗ Cascade triage error: {e}")
+        return False
+
+def test_rate_limiting():
+    """Test the token bucket, the AIMD concurrency limit and the cap on server retry hints"""
+    try:
+        import asyncio
+        import time
+        from types import SimpleNamespace
+        from google.genai import errors as genai_errors
+        from utils.rate_limiter import TokenBucket, AdaptiveConcurrencyLimiter
+        from services import gemini_client
+        
+        async def drain_bucket():
+            # 100 tokens per second with room for one: the second acquire waits about 10ms
+            bucket = TokenBucket(6000, capacity=1)
+            started = time.monotonic()
+            await bucket.acquire()
+            await bucket.acquire()
+            return time.monotonic() - started
+        assert asyncio.run(drain_bucket()) >= 0.005, "Second acquire must wait for a refill"
+        
+        limiter = AdaptiveConcurrencyLimiter(4)
+        started_at = time.monotonic()
+        limiter.on_throttle(started_at)
+        assert limiter.current_limit == 2, "A throttle must halve the limit"
+        limiter.on_throttle(started_at - 1)
+        assert limiter.current_limit == 2, "Requests started before the decrease must not halve it again"
+        asyncio.run(limiter.on_success())
+        assert limiter.limit == 2.5, "A success must raise the limit by 1/limit"
+        
+        def throttled(delay):
+            error = genai_errors.ClientError(429, {"error": {"code": 429, "status": "RESOURCE_EXHAUSTED", "details": [
+                {"@type": "type.googleapis.com/google.rpc.RetryInfo", "retryDelay": delay}
+            ]}})
+            return SimpleNamespace(outcome=SimpleNamespace(exception=lambda: error), attempt_number=1)
+        short, long = throttled("1.5s"), throttled(f"{gemini_client.GEMINI_RETRY_MAX_DELAY * 2:g}s")
+        assert gemini_client._retry_hint(short.outcome.exception()) == 1.5
+        assert 1.5 <= gemini_client._wait_before_retry(short) <= gemini_client.GEMINI_RETRY_MAX_DELAY
+        assert not gemini_client._hint_exceeds_max_delay(short)
+        assert gemini_client._hint_exceeds_max_delay(long), "A hint above GEMINI_RETRY_MAX_DELAY must stop retrying"
+        print("✓ Rate limiting passed")
+        
+        return True
+        
+    except Exception as e:
+        print(f"✗ Rate limiting error: {e}")
+        return False
+
+def test_verdict_bands():
+    """Test that an invalid verdict is derived from the score band"""
+    try:
+        import json
+        from schemas.evaluation import EvaluationResult, verdict_for_score
+        
+        assert [verdict_for_score(score) for score in (100, 80, 79.9, 50, 49.9, 0)] == [
+            'Shortlist', 'Shortlist', 'Needs Review', 'Needs Review', 'Reject', 'Reject'
+        ]
+        result = {
+            "score": 83, "verdict": "Strong Match",
+            "category_breakdown": {"technical_skills": 90, "experience": 80, "education": 70, "communication": 75},
+            "feedback": "Solid backend experience"
+        }
+        repairs = []
+        evaluation = EvaluationResult.model_validate_json(json.dumps(result), context={"repairs": repairs})
+        assert evaluation.verdict == 'Shortlist' and repairs == ['verdict'], f"Unexpected verdict: {evaluation.verdict}"
+        repairs = []
+        evaluation = EvaluationResult.model_validate_json(json.dumps({**result, "score": 101, "verdict": "Reject"}), context={"repairs": repairs})
+        assert evaluation.score == 100 and evaluation.verdict == 'Reject' and repairs == [], "A valid verdict must be kept"
+        print("✓ Verdict bands passed")
+        
+        return True
+        
+    except Exception as e:
+        print(f"✗ Verdict bands error: {e}")
+        return False
+
+def test_truncated_json_repair():
+    """Test that an evaluation cut off at the output token limit is repaired"""
+    try:
+        from utils.json_repair import loads_truncated_json
+        from services.gemini_client import GeminiClient, get_parse_stats
+        
+        assert loads_truncated_json('{"a": [1, 2, {"b": "unterminat') == {"a": [1, 2, {"b": "unterminat"}]}
+        assert loads_truncated_json('{"a": 1, "b": tr') == {"a": 1}, "An incomplete member must be dropped"
+        
+        # Only the parser is used, so no API key is needed
+        client = GeminiClient.__new__(GeminiClient)
+        repaired_before = get_parse_stats()["repaired"]
+        evaluation = client._parse_evaluation_text(
+            '```json\n{"score": 62, "verdict": "Needs Review", "category_breakdown": {"technical_skills": 70, '
+            '"experience": 60, "education": 55, "communication": 60}, "matched_skills": ["Python", "Fast'
+        )
+        assert evaluation["score"] == 62 and evaluation["matched_skills"] == ["Python", "Fast"]
+        assert evaluation["feedback"] == "", "Missing feedback must default to empty"
+        assert get_parse_stats()["repaired"] == repaired_before + 1, "Repair must be counted"
+        print("✓ Truncated JSON repair passed")
+        
+        return True
+        
+    except Exception as e:
+        print(f"✗ Truncated JSON repair error: {e}")
+        return False
+
+def test_cascade_prescreen():
+    """Test the cascade relevance cutoff and the provisional scores below it"""
+    try:
+        import numpy as np
+        from types import SimpleNamespace
+        from bson import ObjectId
+        from services.evaluation_service import EvaluationService
+        
+        # Only pure helpers are used, so no database connection is needed
+        service = EvaluationService.__new__(EvaluationService)
+        jd = SimpleNamespace(id=str(ObjectId()), jd_text="Backend engineer: Python, FastAPI and MongoDB APIs", skills=['Python', 'FastAPI', 'MongoDB'])
+        resumes = [
+            {'_id': ObjectId(), 'raw_text': "Python backend engineer building FastAPI services on MongoDB", 'skills': ['Python', 'FastAPI', 'MongoDB']},
+            {'_id': ObjectId(), 'raw_text': "Python developer writing Django apps", 'skills': ['Python']},
+            {'_id': ObjectId(), 'raw_text': "Graphic designer working in Photoshop", 'skills': ['Photoshop']},
+            {'_id': ObjectId(), 'raw_text': "Sales manager for enterprise accounts", 'skills': []},
+        ]
+        relevance = service._prescreen(resumes, jd)
+        assert relevance[0] > relevance[1] > relevance[2], f"Unexpected relevance order: {relevance}"
+        cutoff = float(np.percentile(relevance, 50))
+        screened_out = [index for index in range(len(resumes)) if relevance[index] < cutoff]
+        assert screened_out == [2, 3], f"Unexpected screened-out resumes: {screened_out}"
+        
+        evaluation = service._build_provisional_evaluation(resumes[2], jd, float(relevance[2]), cutoff, 50, len(resumes), 'key')
+        assert evaluation.provisional and evaluation.verdict == 'Reject' and evaluation.score < 50, "Provisional scores stay in the Reject band"
+        assert evaluation.cache_key == 'prescreen:key', "Provisional evaluations must never look fresh"
+        assert evaluation.matched_skills == [] and evaluation.missing_skills == jd.skills
+        print("✓ Cascade pre-screening passed")
+        
+        return True
+        
+    except Exception as e:
+        print(f"✗ Cascade pre-screening error: {e}")
+        return False
+
+def test_single_flight():
+    """Test that concurrent evaluations of one pair share a single model call"""
+    try:
+        import asyncio
+        from services import evaluation_service
+        from services.evaluation_service import EvaluationService
+        
+        calls = []
+        
+        async def evaluate(resume_id, jd_id, force_refresh):
+            calls.append((resume_id, jd_id))
+            await asyncio.sleep(0.01)
+            if resume_id == 'bad':
+                raise RuntimeError("model unavailable")
+            return f"evaluation of {resume_id}"
+        
+        # The uncoalesced evaluation is replaced, so no database or model is needed
+        service = EvaluationService.__new__(EvaluationService)
+        service._evaluate_resume_with_ai = evaluate
+        
+        async def run():
+            results = await asyncio.gather(
+                service.evaluate_resume_with_ai('r1', 'jd'),
+                service.evaluate_resume_with_ai('r1', 'jd', force_refresh=True),
+                service.evaluate_resume_with_ai('r2', 'jd'),
+            )
+            failures = await asyncio.gather(
+                service.evaluate_resume_with_ai('bad', 'jd'),
+                service.evaluate_resume_with_ai('bad', 'jd'),
+                return_exceptions=True
+            )
+            return results, failures
+        results, failures = asyncio.run(run())
+        assert results == ["evaluation of r1", "evaluation of r1", "evaluation of r2"], f"Unexpected results: {results}"
+        assert all(isinstance(failure, RuntimeError) for failure in failures), "Every caller must get the error"
+        assert calls == [('r1', 'jd'), ('r2', 'jd'), ('bad', 'jd')], f"Unexpected model calls: {calls}"
+        assert not evaluation_service._inflight_evaluations, "Finished evaluations must be forgotten"
+        print("✓ Single-flight coalescing passed")
+        
+        return True
+        
+    except Exception as e:
+        print(f"✗ Single-flight coalescing error: {e}")
+        return False
+
 def main():
     """Run all tests"""
     print("Testing Resume Evaluator Backend...")
@@ -94,13 +381,58 @@ def main():
     print("\n2. Testing schemas...")
     schemas_ok = test_schemas()
     
+    # Test PDF ingestion
+    print("\n3. Testing PDF ingestion...")
+    pdf_ok = test_pdf_ingestion()
+    
+    # Test section segmentation
+    print("\n4. Testing section segmentation...")
+    sections_ok = test_section_segmenter()
+    
+    # Test skill extraction
+    print("\n5. Testing skill extraction...")
+    skills_ok = test_skill_extractor()
+    
+    # Test cascade triage
+    print("\n6. Testing cascade triage...")
+    triage_ok = test_cascade_triage()
+    
+    # Test rate limiting
+    print("\n7. Testing rate limiting...")
+    limiter_ok = test_rate_limiting()
+    
+    # Test verdict bands
+    print("\n8. Testing verdict bands...")
+    verdict_ok = test_verdict_bands()
+    
+    # Test truncated JSON repair
+    print("\n9. Testing truncated JSON repair...")
+    json_repair_ok = test_truncated_json_repair()
+    
+    # Test cascade pre-screening
+    print("\n10. Testing cascade pre-screening...")
+    prescreen_ok = test_cascade_prescreen()
+    
+    # Test single-flight coalescing
+    print("\n11. Testing single-flight coalescing...")
+    single_flight_ok = test_single_flight()
+    
     # Summary
     print("\n" + "=" * 40)
     print("TEST SUMMARY:")
     print(f"Imports: {'✓ PASS' if imports_ok else '✗ FAIL'}")
     print(f"Schemas: {'✓ PASS' if schemas_ok else '✗ FAIL'}")
+    print(f"PDF ingestion: {'✓ PASS' if pdf_ok else '✗ FAIL'}")
+    print(f"Sections: {'✓ PASS' if sections_ok else '✗ FAIL'}")
+    print(f"Skills: {'✓ PASS' if skills_ok else '✗ FAIL'}")
+    print(f"Cascade triage: {'✓ PASS' if triage_ok else '✗ FAIL'}")
+    print(f"Rate limiting: {'✓ PASS' if limiter_ok else '✗ FAIL'}")
+    print(f"Verdict bands: {'✓ PASS' if verdict_ok else '✗ FAIL'}")
+    print(f"JSON repair: {'✓ PASS' if json_repair_ok else '✗ FAIL'}")
+    print(f"Cascade pre-screening: {'✓ PASS' if prescreen_ok else '✗ FAIL'}")
+    print(f"Single-flight: {'✓ PASS' if single_flight_ok else '✗ FAIL'}")
     
-    if imports_ok and schemas_ok:
+    if imports_ok and schemas_ok and pdf_ok and sections_ok and skills_ok and triage_ok and limiter_ok and verdict_ok and json_repair_ok and prescreen_ok and single_flight_ok:
         print("\n🎉 All tests passed! Backend is ready to use.")
         print("\nTo start the server, run:")
         print("  source venv/bin/activate")
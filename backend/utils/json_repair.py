@@ -0,0 +1,92 @@
+import json
+from typing import Any, Dict, List, Optional, Tuple
+
+_CLOSERS = {'{': '}', '[': ']'}
+
+def strip_code_fence(text: str) -> str:
+    """Remove a markdown code fence (```json ... ```) around JSON, if present"""
+    text = text.strip()
+    if text.startswith('```'):
+        text = text.split('\n', 1)[1] if '\n' in text else ''
+        if text.rstrip().endswith('```'):
+            text = text.rstrip()[:-3]
+    return text.strip()
+
+def loads_truncated_json(text: str) -> Any:
+    """
+    Parse JSON that may have been cut off part-way, e.g. when the model hit its
+    output token limit. An unterminated string is closed and open objects and
+    arrays are closed; if that is not enough, the document is cut back to the
+    last complete member or element and closed there.
+
+    Args:
+        text: JSON text, possibly truncated
+
+    Returns:
+        Parsed value
+
+    Raises:
+        ValueError: If no prefix of the text can be repaired into valid JSON
+    """
+    text = text.strip()
+    stack: List[str] = []
+    # Positions where the text can be cut, with the containers open there
+    cut_points: List[Tuple[int, Tuple[str, ...]]] = []
+    in_string = False
+    escape = False
+    for index, char in enumerate(text):
+        if in_string:
+            if escape:
+                escape = False
+            elif char == '\\':
+                escape = True
+            elif char == '"':
+                in_string = False
+        elif char == '"':
+            in_string = True
+        elif char in _CLOSERS:
+            stack.append(char)
+            cut_points.append((index + 1, tuple(stack)))
+        elif char in '}]':
+            if stack:
+                stack.pop()
+        elif char == ',':
+            cut_points.append((index, tuple(stack)))
+
+    candidates = []
+    tail = text
+    if in_string:
+        if escape:
+            tail = tail[:-1]
+        tail += '"'
+    candidates.append(tail + ''.join(_CLOSERS[opener] for opener in reversed(stack)))
+    for position, open_stack in reversed(cut_points):
+        candidates.append(text[:position] + ''.join(_CLOSERS[opener] for opener in reversed(open_stack)))
+
+    for candidate in candidates:
+        try:
+            return json.loads(candidate)
+        except json.JSONDecodeError:
+            continue
+    raise ValueError("Could not repair truncated JSON")
+
+def loads_partial_object(text: str) -> Optional[Dict[str, Any]]:
+    """
+    Parse the beginning of a JSON object that is still being received, e.g.
+    from a streamed response. Members cut off part-way are completed as far as
+    possible (see loads_truncated_json).
+
+    Args:
+        text: JSON text received so far, possibly in a markdown code fence
+
+    Returns:
+        The object parsed so far, or None if there is nothing usable yet
+    """
+    text = strip_code_fence(text)
+    if not text.startswith('{'):
+        return None
+    try:
+        data = loads_truncated_json(text)
+    except ValueError:
+        return None
+    return data if isinstance(data, dict) else None
@@ -0,0 +1,98 @@
+import os
+import json
+import zlib
+import logging
+import tempfile
+from typing import Optional
+from utils.pdf_parser import PDFTextExtractor, PDFSource, PARSER_VERSION, PDF_MARKDOWN_ENGINE, PDF_MAX_PAGES, PDF_MAX_CHARS
+from utils.pdf_store import store_pdf
+
+logger = logging.getLogger(__name__)
+
+# Directory of cached parse_resume outputs (zlib-compressed JSON)
+PARSE_CACHE_DIR = os.getenv(
+    "PARSE_CACHE_DIR",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "storage", "parse_cache")
+)
+PARSE_CACHE_ENABLED = os.getenv("PARSE_CACHE_ENABLED", "true").lower() == "true"
+
+# Settings that change the output for the same PDF are part of the cache key
+_CACHE_TAG = f"v{PARSER_VERSION}-{PDF_MARKDOWN_ENGINE}-p{PDF_MAX_PAGES}-c{PDF_MAX_CHARS}"
+
+def _cache_path(content_sha256: str) -> str:
+    return os.path.join(PARSE_CACHE_DIR, content_sha256[:2], f"{content_sha256}.{_CACHE_TAG}.json.z")
+
+def load_cached_parse(content_sha256: str) -> Optional[dict]:
+    """
+    Load the cached parse_resume output for a PDF.
+
+    Args:
+        content_sha256: SHA-256 hash of the PDF bytes
+
+    Returns:
+        The parsed dictionary, or None if it is not cached for the current parser version
+    """
+    if not PARSE_CACHE_ENABLED:
+        return None
+    try:
+        with open(_cache_path(content_sha256), 'rb') as f:
+            return json.loads(zlib.decompress(f.read()))
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError, zlib.error) as e:
+        logger.warning(f"Ignoring unreadable parse cache entry for {content_sha256}: {e}")
+        return None
+
+def save_cached_parse(content_sha256: str, parsed: dict):
+    """
+    Cache a parse_resume output, replacing entries from older parser versions
+    or settings for the same PDF.
+
+    Args:
+        content_sha256: SHA-256 hash of the PDF bytes
+        parsed: Output of PDFTextExtractor.parse_resume
+    """
+    if not PARSE_CACHE_ENABLED:
+        return
+    path = _cache_path(content_sha256)
+    directory = os.path.dirname(path)
+    try:
+        os.makedirs(directory, exist_ok=True)
+        payload = zlib.compress(json.dumps(parsed, separators=(',', ':')).encode('utf-8'), 6)
+        fd, temp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        with os.fdopen(fd, 'wb') as f:
+            f.write(payload)
+        os.replace(temp_path, path)
+        for name in os.listdir(directory):
+            if name.startswith(f"{content_sha256}.") and name.endswith(".json.z") and name != os.path.basename(path):
+                os.unlink(os.path.join(directory, name))
+    except OSError as e:
+        logger.warning(f"Failed to cache parse output for {content_sha256}: {e}")
+
+def parse_resume_cached(source: PDFSource, content_sha256: str) -> dict:
+    """
+    PDF worker job: return the cached parse of a PDF, or parse it, keep the
+    original PDF in the PDF store and cache the result.
+
+    Args:
+        source: Path to the PDF file, or the PDF bytes
+        content_sha256: SHA-256 hash of the PDF bytes
+
+    Returns:
+        Output of PDFTextExtractor.parse_resume
+    """
+    cached = load_cached_parse(content_sha256)
+    if cached is not None:
+        return cached
+
+    parsed = PDFTextExtractor.parse_resume(source)
+    if not parsed['valid']:
+        return parsed
+    try:
+        store_pdf(content_sha256, source)
+    except OSError as e:
+        logger.warning(f"Failed to store PDF {content_sha256}: {e}")
+    # A time-budget cut depends on machine load, so such a parse is not reusable
+    if parsed['text'] and parsed.get('truncation_reason') != 'time':
+        save_cached_parse(content_sha256, parsed)
+    return parsed
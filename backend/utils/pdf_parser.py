@@ -1,65 +1,249 @@
 import fitz  # PyMuPDF
-from pdfminer.high_level import extract_text as pdfminer_extract_text
+from pdfminer.high_level import extract_text as pdfminer_extract_text, extract_pages as pdfminer_extract_pages
 from pdfminer.pdfparser import PDFParser
 from pdfminer.pdfdocument import PDFDocument
 from pdfminer.pdfpage import PDFPage
 from pdfminer.pdfinterp import PDFResourceManager, PDFPageInterpreter
-from pdfminer.layout import LAParams
+from pdfminer.layout import LAParams, LTTextContainer
 from pdfminer.converter import TextConverter
-from io import StringIO
+from io import StringIO, BytesIO
+from markitdown import MarkItDown, StreamInfo
 import logging
-from typing import Optional, Tuple
+import os
+import threading
+import time
+from collections import Counter
+from typing import Dict, List, Optional, Tuple, Union
 import re
+from utils.resume_sections import segment_sections, section_text, parse_experience
+from utils.skill_extractor import extract_skills
 
 logger = logging.getLogger(__name__)
 
+# A PDF can be handed to the extractor as a file path or as its raw bytes
+PDFSource = Union[str, bytes]
+
+# Version of the extraction logic, an integer kept as a string; bump it by one whenever
+# parse_resume output changes so cached parses are ignored and older stored resumes
+# are picked up for reprocessing
+PARSER_VERSION = "1"
+
+# Markdown engine: "markitdown" (pdfminer.six via MarkItDown, a second full decode)
+# or "native" (rendered from the PyMuPDF text blocks already extracted)
+PDF_MARKDOWN_ENGINE = os.getenv("PDF_MARKDOWN_ENGINE", "markitdown").lower()
+
+# Extraction budgets per document: pages read, characters kept and seconds spent
+# (0 disables a limit). Reading stops early once any of them is exhausted.
+PDF_MAX_PAGES = int(os.getenv("PDF_MAX_PAGES", "50"))
+PDF_MAX_CHARS = int(os.getenv("PDF_MAX_CHARS", "200000"))
+PDF_TIME_BUDGET = float(os.getenv("PDF_TIME_BUDGET", "20"))
+
+# Field extraction patterns, compiled once per process
+_EMAIL_PATTERN = re.compile(r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b')
+_EDUCATION_WORD_PATTERN = re.compile(r'(?i)education')
+_DEGREE_PATTERN = re.compile(r'(Bachelor|Master|B\.?Sc|M\.?Sc|Ph\.?D|B\.?Tech|M\.?Tech|MBA|B\.A\.|M\.A\.|High School|Secondary|Diploma|Associate)', re.I)
+_YEAR_PATTERN = re.compile(r'(19|20)\d{2}')
+_GPA_PATTERN = re.compile(r'GPA[:\s]*([0-9]\.?[0-9]*)', re.I)
+_INSTITUTION_WORDS = ('university', 'college', 'school', 'institute')
+
+# Characters that start a bulleted line in typical resumes
+_BULLET_PATTERN = re.compile(r'^\s*[•●▪■◦‣∙·○►▸\-–—*]\s+')
+# Span flag set by PyMuPDF for bold fonts
+_BOLD_FLAG = 16
+
+def _open_pdf(source: PDFSource) -> fitz.Document:
+    """Open a PDF with PyMuPDF from a file path or an in-memory buffer"""
+    if isinstance(source, (bytes, bytearray)):
+        return fitz.open(stream=source, filetype="pdf")
+    return fitz.open(source)
+
+def _as_file(source: PDFSource):
+    """Return something pdfminer can read: the path itself or a BytesIO over the buffer"""
+    if isinstance(source, (bytes, bytearray)):
+        return BytesIO(source)
+    return source
+
+# Process-wide MarkItDown instance; building one loads its converter registry
+# and the Magika ONNX model, so it is created once and reused by every upload.
+# MarkItDown keeps no per-conversion state, so sharing it across threads is safe.
+_markdown_converter: Optional[MarkItDown] = None
+_markdown_converter_lock = threading.Lock()
+
+def get_markdown_converter() -> MarkItDown:
+    """Get the shared MarkItDown converter, creating it on first use"""
+    global _markdown_converter
+    if _markdown_converter is None:
+        with _markdown_converter_lock:
+            if _markdown_converter is None:
+                _markdown_converter = MarkItDown(enable_plugins=False)
+    return _markdown_converter
+
+class _ExtractionBudget:
+    """Tracks the page, character and time budgets while a PDF is read page by page"""
+    
+    def __init__(self, max_pages: int = None, max_chars: int = None, time_budget: float = None):
+        self.max_pages = PDF_MAX_PAGES if max_pages is None else max_pages
+        self.max_chars = PDF_MAX_CHARS if max_chars is None else max_chars
+        time_budget = PDF_TIME_BUDGET if time_budget is None else time_budget
+        self.deadline = time.monotonic() + time_budget if time_budget > 0 else None
+        self.pages = 0
+        self.chars = 0
+        self.reason = None
+    
+    def time_left(self) -> Optional[float]:
+        """Seconds left before the deadline, or None if there is no time limit"""
+        if self.deadline is None:
+            return None
+        return max(0.0, self.deadline - time.monotonic())
+    
+    def exhausted(self) -> bool:
+        """Check, before reading the next page, whether any budget has run out"""
+        if self.reason is None:
+            if self.max_pages and self.pages >= self.max_pages:
+                self.reason = 'pages'
+            elif self.max_chars and self.chars >= self.max_chars:
+                self.reason = 'chars'
+            elif self.deadline is not None and time.monotonic() >= self.deadline:
+                self.reason = 'time'
+        return self.reason is not None
+    
+    def take(self, page_text: str) -> str:
+        """Account for one page of text, clipping it to the remaining character budget"""
+        self.pages += 1
+        if self.max_chars:
+            remaining = self.max_chars - self.chars
+            if len(page_text) > remaining:
+                page_text = page_text[:remaining]
+                self.reason = 'chars'
+        self.chars += len(page_text)
+        return page_text
+
+def _render_markdown_from_page_dicts(page_dicts: List[dict]) -> str:
+    """
+    Render markdown from PyMuPDF page.get_text("dict") output.
+    The most common font size is taken as body text; larger lines become
+    headings, short bold lines become sub-headings and bullet glyphs become
+    list items.
+    """
+    size_counts = Counter()
+    for page_dict in page_dicts:
+        for block in page_dict.get('blocks', []):
+            for line in block.get('lines', []):
+                for span in line.get('spans', []):
+                    size_counts[round(span['size'], 1)] += len(span['text'].strip())
+    if not size_counts:
+        return ''
+    body_size = size_counts.most_common(1)[0][0]
+    
+    output = []
+    for page_dict in page_dicts:
+        for block in page_dict.get('blocks', []):
+            if block.get('type') != 0:
+                continue  # image block
+            block_lines = []
+            for line in block.get('lines', []):
+                spans = [span for span in line.get('spans', []) if span['text'].strip()]
+                text = ''.join(span['text'] for span in line.get('spans', [])).strip()
+                if not spans or not text:
+                    continue
+                size = max(span['size'] for span in spans)
+                bold = all(span['flags'] & _BOLD_FLAG for span in spans)
+                bullet = _BULLET_PATTERN.match(text)
+                if bullet:
+                    block_lines.append(f"- {text[bullet.end():]}")
+                elif size >= body_size * 1.15 and len(text) <= 80:
+                    level = '#' if size >= body_size * 1.6 else '##'
+                    block_lines.append(f"{level} {text}")
+                elif bold and len(text) <= 60 and not text.endswith('.'):
+                    block_lines.append(f"### {text}")
+                else:
+                    block_lines.append(text)
+            if block_lines:
+                output.append('\n'.join(block_lines))
+    return '\n\n'.join(output)
+
+def _build_warm_up_pdf() -> bytes:
+    """Build a tiny one-page PDF used to exercise the parsing stack"""
+    doc = fitz.open()
+    page = doc.new_page(width=300, height=200)
+    page.insert_text((20, 40), "Warm-up Candidate\nwarm.up@example.com\nEducation\nBachelor of Science, Example University 2020")
+    page.insert_link({'kind': fitz.LINK_URI, 'from': fitz.Rect(20, 30, 200, 45), 'uri': 'https://github.com/example'})
+    data = doc.tobytes()
+    doc.close()
+    return data
+
+def warm_up_pdf_parser():
+    """
+    Create the shared MarkItDown converter and skill extractor and run one full
+    parse of a tiny built-in PDF, so the first real upload in this process does
+    not pay for model loading, lazy imports or first-call initialisation.
+    """
+    PDFTextExtractor.parse_resume(_build_warm_up_pdf())
+    logger.info("PDF parser warmed up")
+
 class PDFTextExtractor:
     """Utility class for parsing PDF files and extracting text content"""
     
     @staticmethod
-    def extract_text_with_pymupdf(pdf_path: str) -> Optional[str]:
+    def extract_text_with_pymupdf(pdf_path: PDFSource, budget: Optional[_ExtractionBudget] = None) -> Optional[str]:
         """
         Extract text from PDF using PyMuPDF (fitz)
-        Also returns links if needed
+        Pages are loaded one at a time and reading stops once the budget
+        (a fresh default budget if omitted) is exhausted.
         """
         try:
-            doc = fitz.open(pdf_path)
-            text = ""
-            for page_num in range(len(doc)):
-                page = doc.load_page(page_num)
-                text += page.get_text()
+            budget = budget or _ExtractionBudget()
+            doc = _open_pdf(pdf_path)
+            text_parts = []
+            for page in doc:
+                if budget.exhausted():
+                    break
+                text_parts.append(budget.take(page.get_text()))
             doc.close()
-            return text.strip()
+            return ''.join(text_parts).strip()
         except Exception as e:
             logger.error(f"PyMuPDF extraction failed: {str(e)}")
             return None
     
     @staticmethod
-    def extract_text_with_pdfminer(pdf_path: str) -> Optional[str]:
+    def extract_text_with_pdfminer(pdf_path: PDFSource, budget: Optional[_ExtractionBudget] = None) -> Optional[str]:
         """
         Extract text from PDF using pdfminer.six
         
         Args:
-            pdf_path: Path to the PDF file
+            pdf_path: Path to the PDF file, or the PDF bytes
+            budget: Optional extraction budget; pages are then laid out one at a
+                time and reading stops as soon as the budget is exhausted
             
         Returns:
             Extracted text or None if failed
         """
         try:
-            text = pdfminer_extract_text(pdf_path)
-            return text.strip()
+            if budget is None:
+                text = pdfminer_extract_text(_as_file(pdf_path))
+                return text.strip()
+            
+            text_parts = []
+            for page_layout in pdfminer_extract_pages(_as_file(pdf_path)):
+                if budget.exhausted():
+                    break
+                page_text = ''.join(
+                    element.get_text() for element in page_layout if isinstance(element, LTTextContainer)
+                )
+                text_parts.append(budget.take(page_text))
+            return ''.join(text_parts).strip()
             
         except Exception as e:
             logger.error(f"pdfminer extraction failed: {str(e)}")
             return None
     
     @staticmethod
-    def extract_text(pdf_path: str) -> Optional[str]:
+    def extract_text(pdf_path: PDFSource) -> Optional[str]:
         """
         Extract text from PDF using multiple methods with fallback
         
         Args:
-            pdf_path: Path to the PDF file
+            pdf_path: Path to the PDF file, or the PDF bytes
             
         Returns:
             Extracted text or None if all methods fail
@@ -76,31 +260,34 @@ class PDFTextExtractor:
         if text and text.strip():
             return text
         
-        logger.error(f"Failed to extract text from PDF: {pdf_path}")
+        logger.error(f"Failed to extract text from PDF: {pdf_path if isinstance(pdf_path, str) else '<in-memory>'}")
         return None
     
     @staticmethod
-    def extract_basic_info(text: str) -> Tuple[Optional[str], Optional[str]]:
+    def extract_basic_info(text: str, sections: Optional[Dict[str, Tuple[int, int]]] = None) -> Tuple[Optional[str], Optional[str]]:
         """
         Extract basic candidate information from resume text
         
         Args:
             text: Extracted text from PDF
+            sections: Section spans from segment_sections (computed if omitted)
             
         Returns:
             Tuple of (candidate_name, email) or (None, None) if not found
         """
         if not text:
             return None, None
+        if sections is None:
+            sections = segment_sections(text)
         
-        # Email extraction
-        email_pattern = r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b'
-        email_match = re.search(email_pattern, text)
+        # Email extraction: the contact block first, then the rest of the document
+        contact = section_text(text, sections, 'contact') or ''
+        email_match = _EMAIL_PATTERN.search(contact) or _EMAIL_PATTERN.search(text)
         email = email_match.group() if email_match else None
         
         # Name extraction (basic approach - can be enhanced)
         # Look for common name patterns at the beginning of the document
-        lines = text.split('\n')
+        lines = (contact or text).split('\n', 10)
         candidate_name = None
         
         for line in lines[:10]:  # Check first 10 lines
@@ -117,24 +304,27 @@ class PDFTextExtractor:
         return candidate_name, email
     
     @staticmethod
-    def validate_pdf_file(file_path: str) -> bool:
+    def validate_pdf_file(file_path: PDFSource) -> bool:
         """
         Validate if the file is a valid PDF
         
         Args:
-            file_path: Path to the file
+            file_path: Path to the file, or the file bytes
             
         Returns:
             True if valid PDF, False otherwise
         """
         try:
             # Try to open with PyMuPDF
-            doc = fitz.open(file_path)
+            doc = _open_pdf(file_path)
             doc.close()
             return True
         except Exception:
             try:
                 # Try with pdfminer
+                if isinstance(file_path, (bytes, bytearray)):
+                    PDFDocument(PDFParser(BytesIO(file_path)))
+                    return True
                 with open(file_path, 'rb') as file:
                     parser = PDFParser(file)
                     doc = PDFDocument(parser)
@@ -143,58 +333,269 @@ class PDFTextExtractor:
                 return False 
 
     @staticmethod
-    def extract_links(pdf_path: str) -> list:
+    def _classify_link(uri: str) -> dict:
+        """Classify a hyperlink URI into a {type, url} dict"""
+        if uri.startswith('mailto:'):
+            return {'type': 'email', 'url': uri}
+        elif 'linkedin.com' in uri:
+            return {'type': 'linkedin', 'url': uri}
+        elif 'github.com' in uri:
+            return {'type': 'github', 'url': uri}
+        return {'type': 'other', 'url': uri}
+
+    @staticmethod
+    def render_markdown(source: PDFSource) -> str:
+        """
+        Render a PDF to markdown from PyMuPDF text blocks (the "native" engine)
+        
+        Args:
+            source: Path to the PDF file, or the PDF bytes
+            
+        Returns:
+            Markdown text with headings and bullets detected from font data
+        """
+        doc = _open_pdf(source)
+        try:
+            return _render_markdown_from_page_dicts([page.get_text("dict") for page in doc])
+        finally:
+            doc.close()
+
+    @staticmethod
+    def ingest_pdf(
+        source: PDFSource,
+        markdown_converter=None,
+        markdown_engine: Optional[str] = None,
+        max_pages: Optional[int] = None,
+        max_chars: Optional[int] = None,
+        time_budget: Optional[float] = None
+    ) -> dict:
+        """
+        Parse a PDF in a single pass over one PyMuPDF document.
+        Validation, plain text, links and page stats all come from the same
+        open document. With the "markitdown" engine markdown is produced once
+        and, because MarkItDown's PDF converter is pdfminer.six, doubles as the
+        text fallback when PyMuPDF finds no text layer. The "native" engine
+        renders markdown from the same PyMuPDF text page instead.
+        
+        Pages are read lazily, one at a time, until the page, character or time
+        budget runs out; the result then reports truncated=True and the reason.
+        
+        Args:
+            source: Path to the PDF file, or the PDF bytes (parsed without touching disk)
+            markdown_converter: Optional MarkItDown instance (defaults to the shared converter)
+            markdown_engine: "markitdown" or "native" (defaults to PDF_MARKDOWN_ENGINE)
+            max_pages: Maximum pages to read (defaults to PDF_MAX_PAGES)
+            max_chars: Maximum characters of text to keep (defaults to PDF_MAX_CHARS)
+            time_budget: Maximum seconds to spend reading (defaults to PDF_TIME_BUDGET)
+            
+        Returns:
+            Dictionary with keys: valid, text, markdown, links, page_count,
+            pages_read, pages, truncated, truncation_reason
+        """
+        budget = _ExtractionBudget(max_pages, max_chars, time_budget)
+        result = {
+            'valid': False,
+            'text': None,
+            'markdown': None,
+            'links': [],
+            'page_count': 0,
+            'pages_read': 0,
+            'pages': [],
+            'truncated': False,
+            'truncation_reason': None,
+        }
+        
+        def finish() -> dict:
+            result['pages_read'] = budget.pages
+            result['truncated'] = budget.reason is not None
+            result['truncation_reason'] = budget.reason
+            if result['truncated']:
+                logger.warning(
+                    f"PDF extraction truncated by {budget.reason} budget after "
+                    f"{budget.pages}/{result['page_count'] or '?'} pages, {budget.chars} chars"
+                )
+            return result
+        
+        try:
+            doc = _open_pdf(source)
+        except Exception as e:
+            logger.warning(f"PyMuPDF could not open PDF, falling back to pdfminer: {e}")
+            result['valid'] = PDFTextExtractor.validate_pdf_file(source)
+            if result['valid']:
+                result['text'] = PDFTextExtractor.extract_text_with_pdfminer(source, budget) or None
+                result['markdown'] = result['text']
+            return finish()
+        
+        native_markdown = (markdown_engine or PDF_MARKDOWN_ENGINE) == 'native'
+        page_dicts = []
+        markdown_source = source
+        try:
+            result['valid'] = doc.is_pdf
+            result['page_count'] = doc.page_count
+            text_parts = []
+            for page in doc:
+                if budget.exhausted():
+                    break
+                # One text page serves both plain text and the native markdown blocks
+                textpage = page.get_textpage()
+                page_text = budget.take(page.get_text(textpage=textpage))
+                if native_markdown:
+                    page_dicts.append(page.get_text("dict", textpage=textpage))
+                page_links = [
+                    PDFTextExtractor._classify_link(link['uri'])
+                    for link in page.get_links() if link.get('uri')
+                ]
+                text_parts.append(page_text)
+                result['links'].extend(page_links)
+                result['pages'].append({
+                    'number': page.number + 1,
+                    'chars': len(page_text),
+                    'links': len(page_links),
+                    'images': len(page.get_images()),
+                })
+            text = ''.join(text_parts).strip()
+            result['text'] = text or None
+            
+            # Keep MarkItDown within the page budget by handing it only the pages read
+            if not native_markdown and result['valid'] and budget.pages < doc.page_count:
+                doc.select(list(range(budget.pages)))
+                markdown_source = doc.tobytes() if budget.pages else None
+        except Exception as e:
+            logger.error(f"PyMuPDF extraction failed: {str(e)}")
+        finally:
+            doc.close()
+        
+        if not result['valid']:
+            return finish()
+        
+        if native_markdown:
+            result['markdown'] = _render_markdown_from_page_dicts(page_dicts)[:budget.max_chars or None] or None
+            if not result['text'] and budget.reason is None:
+                fallback_budget = _ExtractionBudget(max_pages, max_chars, budget.time_left())
+                result['text'] = PDFTextExtractor.extract_text_with_pdfminer(source, fallback_budget) or None
+                result['markdown'] = result['markdown'] or result['text']
+                budget.reason = fallback_budget.reason
+            return finish()
+        
+        if budget.reason == 'time' or markdown_source is None:
+            # No time left for a second decode; plain text stands in for markdown
+            result['markdown'] = result['text']
+            return finish()
+        
+        try:
+            if markdown_converter is None:
+                markdown_converter = get_markdown_converter()
+            if isinstance(markdown_source, (bytes, bytearray)):
+                converted = markdown_converter.convert_stream(
+                    BytesIO(markdown_source), stream_info=StreamInfo(mimetype='application/pdf', extension='.pdf')
+                )
+            else:
+                converted = markdown_converter.convert(markdown_source)
+            result['markdown'] = converted.text_content[:budget.max_chars or None]
+        except Exception as e:
+            logger.error(f"Markdown conversion failed: {e}")
+        
+        if not result['text'] and result['markdown'] and result['markdown'].strip():
+            result['text'] = result['markdown'].strip()
+        
+        return finish()
+
+    @staticmethod
+    def parse_resume(source: PDFSource) -> dict:
+        """
+        Run the full CPU-bound resume extraction for one PDF.
+        Intended to be executed in a PDF worker process (see utils.pdf_pool),
+        so everything returned is plain, picklable data.
+        
+        Args:
+            source: Path to the PDF file, or the PDF bytes
+            
+        Returns:
+            The ingest_pdf dictionary plus parser_version, sections, candidate_name,
+            email, email_from_link, education, experience and skills; email links
+            have their 'mailto:' prefix stripped
+        """
+        parsed = PDFTextExtractor.ingest_pdf(source)
+        parsed.update({
+            'parser_version': PARSER_VERSION, 'sections': {},
+            'candidate_name': None, 'email': None, 'email_from_link': None,
+            'education': [], 'experience': [], 'skills': []
+        })
+        if not parsed['valid'] or not parsed['text']:
+            return parsed
+        
+        # Segment once; every field extractor works on the resulting spans
+        raw_text = parsed['text']
+        sections = segment_sections(raw_text)
+        parsed['sections'] = sections
+        parsed['candidate_name'], parsed['email'] = PDFTextExtractor.extract_basic_info(raw_text, sections)
+        parsed['education'] = PDFTextExtractor.extract_education(raw_text, sections)
+        parsed['experience'] = PDFTextExtractor.extract_experience(raw_text, sections)
+        parsed['skills'] = extract_skills(raw_text)
+        
+        # Post-process links: strip 'mailto:' and remember the first email address
+        processed_links = []
+        for link in parsed['links']:
+            if link['type'] == 'email' and link['url'].startswith('mailto:'):
+                email_addr = link['url'][7:]
+                processed_links.append({'type': 'email', 'url': email_addr})
+                if parsed['email_from_link'] is None:
+                    parsed['email_from_link'] = email_addr
+            else:
+                processed_links.append(link)
+        parsed['links'] = processed_links
+        return parsed
+
+    @staticmethod
+    def extract_links(pdf_path: PDFSource) -> list:
         """
         Extract hyperlinks (mailto, LinkedIn, GitHub, etc) from PDF using PyMuPDF
         Returns a list of dicts: {type, url}
         """
         links = []
         try:
-            doc = fitz.open(pdf_path)
+            doc = _open_pdf(pdf_path)
             for page_num in range(len(doc)):
                 page = doc.load_page(page_num)
                 for link in page.get_links():
                     uri = link.get('uri', '')
                     if uri:
-                        if uri.startswith('mailto:'):
-                            links.append({'type': 'email', 'url': uri})
-                        elif 'linkedin.com' in uri:
-                            links.append({'type': 'linkedin', 'url': uri})
-                        elif 'github.com' in uri:
-                            links.append({'type': 'github', 'url': uri})
-                        else:
-                            links.append({'type': 'other', 'url': uri})
+                        links.append(PDFTextExtractor._classify_link(uri))
             doc.close()
         except Exception as e:
             logger.error(f"Failed to extract links: {e}")
         return links
 
     @staticmethod
-    def extract_education(text: str) -> list:
+    def extract_education(text: str, sections: Optional[Dict[str, Tuple[int, int]]] = None) -> list:
         """
         Extract multiple education entries from resume text.
         Returns a list of dicts: {degree, institution, year, gpa}
-        Always includes 'degree' (default 'Unknown') for Pydantic validation.
+        Always includes 'degree' and 'institution' (default 'Unknown') for Pydantic validation.
         """
         education_entries = []
-        # Look for 'Education' section
-        edu_section = re.split(r'(?i)education', text)
-        if len(edu_section) < 2:
+        if not text:
             return education_entries
-        after_edu = edu_section[1]
+        if sections is None:
+            sections = segment_sections(text)
+        # Look for 'Education' section; without a heading line, fall back to
+        # everything after the first mention of 'education'
+        after_edu = section_text(text, sections, 'education')
+        if after_edu is None:
+            edu_match = _EDUCATION_WORD_PATTERN.search(text)
+            if not edu_match:
+                return education_entries
+            after_edu = text[edu_match.end():]
         # Split into lines and look for degree/institution/year patterns
         lines = after_edu.split('\n')
-        degree_pattern = re.compile(r'(Bachelor|Master|B\.?Sc|M\.?Sc|Ph\.?D|B\.?Tech|M\.?Tech|MBA|B\.A\.|M\.A\.|High School|Secondary|Diploma|Associate)', re.I)
-        year_pattern = re.compile(r'(19|20)\d{2}')
-        gpa_pattern = re.compile(r'GPA[:\s]*([0-9]\.?[0-9]*)', re.I)
         current = {'degree': 'Unknown'}
         for line in lines:
             line = line.strip()
             if not line:
                 continue
-            degree_match = degree_pattern.search(line)
-            year_match = year_pattern.search(line)
-            gpa_match = gpa_pattern.search(line)
+            degree_match = _DEGREE_PATTERN.search(line)
+            year_match = _YEAR_PATTERN.search(line)
+            gpa_match = _GPA_PATTERN.search(line)
             if degree_match:
                 if current and any(v for k, v in current.items() if k != 'degree'):
                     education_entries.append(current)
@@ -203,7 +604,7 @@ class PDFTextExtractor:
                 rest = line[degree_match.end():].strip(' ,:-')
                 if rest:
                     current['institution'] = rest
-            elif 'university' in line.lower() or 'college' in line.lower() or 'school' in line.lower() or 'institute' in line.lower():
+            elif any(word in line.lower() for word in _INSTITUTION_WORDS):
                 current['institution'] = line
             if year_match:
                 current['year'] = str(year_match.group())
@@ -214,8 +615,25 @@ class PDFTextExtractor:
                     pass
         if current and any(v for k, v in current.items() if k != 'degree'):
             education_entries.append(current)
-        # Ensure all entries have 'degree'
+        # Ensure all entries have 'degree' and 'institution'
         for entry in education_entries:
             if 'degree' not in entry or not entry['degree']:
                 entry['degree'] = 'Unknown'
-        return education_entries 
\ No newline at end of file
+            if not entry.get('institution'):
+                entry['institution'] = 'Unknown'
+        return education_entries
+
+    @staticmethod
+    def extract_experience(text: str, sections: Optional[Dict[str, Tuple[int, int]]] = None) -> list:
+        """
+        Extract work experience entries from the Experience section.
+        Returns a list of dicts: {title, company, start_date, end_date, description}
+        """
+        if not text:
+            return []
+        if sections is None:
+            sections = segment_sections(text)
+        experience_section = section_text(text, sections, 'experience')
+        if experience_section is None:
+            return []
+        return parse_experience(experience_section)
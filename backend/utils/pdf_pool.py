@@ -0,0 +1,161 @@
+import os
+import asyncio
+import logging
+import time
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Optional
+from utils.pdf_parser import warm_up_pdf_parser
+
+logger = logging.getLogger(__name__)
+
+# Number of PDF worker processes; 0 runs parsing in the default thread pool instead
+PDF_PARSE_WORKERS = int(os.getenv("PDF_PARSE_WORKERS", str(os.cpu_count() or 2)))
+# Maximum number of seconds a single PDF job may take before the request gives up
+PDF_PARSE_TIMEOUT = float(os.getenv("PDF_PARSE_TIMEOUT", "60"))
+
+# Global executor instance
+_executor: Optional[ProcessPoolExecutor] = None
+# Jobs submitted to the pool at once (one per worker) and the event loop the
+# semaphore belongs to; jobs beyond that wait here, outside their timeout
+_slots: Optional[asyncio.Semaphore] = None
+_slots_loop: Optional[asyncio.AbstractEventLoop] = None
+# Warm-up of a replacement pool, kept referenced until it finishes
+_warm_up_task: Optional[asyncio.Task] = None
+
+def _init_worker():
+    """
+    Load and warm the parsing stack once per worker process so the first job
+    does not pay for loading PyMuPDF, pdfminer and the MarkItDown converter.
+    """
+    warm_up_pdf_parser()
+
+def _warm_up_worker() -> int:
+    """No-op job used to force every worker process to start"""
+    time.sleep(0.05)
+    return os.getpid()
+
+def get_pdf_executor() -> Optional[ProcessPoolExecutor]:
+    """
+    Get the process pool used for PDF parsing.
+    Returns None when PDF_PARSE_WORKERS is 0.
+    """
+    global _executor
+    if _executor is None and PDF_PARSE_WORKERS > 0:
+        # Workers are started by a clean server process instead of forking the
+        # threaded API process
+        method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+        _executor = ProcessPoolExecutor(
+            max_workers=PDF_PARSE_WORKERS,
+            initializer=_init_worker,
+            mp_context=multiprocessing.get_context(method)
+        )
+    return _executor
+
+def _get_slots() -> asyncio.Semaphore:
+    """The semaphore limiting jobs in the pool, for the running event loop"""
+    global _slots, _slots_loop
+    loop = asyncio.get_running_loop()
+    if _slots is None or _slots_loop is not loop:
+        _slots = asyncio.Semaphore(PDF_PARSE_WORKERS)
+        _slots_loop = loop
+    return _slots
+
+async def _warm_up_pool(executor: ProcessPoolExecutor) -> int:
+    """Start every worker of a pool; return the number of distinct workers"""
+    loop = asyncio.get_running_loop()
+    pids = await asyncio.gather(*[
+        loop.run_in_executor(executor, _warm_up_worker) for _ in range(PDF_PARSE_WORKERS)
+    ])
+    return len(set(pids))
+
+def _retire_pool(executor: ProcessPoolExecutor):
+    """
+    Replace a pool with a stuck job: its processes are terminated (a running
+    job cannot be cancelled otherwise) and a new pool is started and warmed
+    in the background
+    """
+    global _executor, _warm_up_task
+    if executor is not _executor:
+        return
+    _executor = None
+    for process in list((executor._processes or {}).values()):
+        process.terminate()
+    # Jobs still queued there fail with BrokenProcessPool and are retried by run_pdf_job
+    executor.shutdown(wait=False, cancel_futures=False)
+    replacement = get_pdf_executor()
+    _warm_up_task = asyncio.get_running_loop().create_task(_warm_up_replacement(replacement))
+
+async def _warm_up_replacement(executor: ProcessPoolExecutor):
+    try:
+        workers = await _warm_up_pool(executor)
+        logger.info(f"Replacement PDF process pool ready with {workers} workers")
+    except BrokenProcessPool:
+        # Retired in turn before it finished starting
+        pass
+
+async def start_pdf_pool():
+    """
+    Create the PDF process pool and start all of its workers up front,
+    so no upload waits for a process to fork and import the parsers.
+    """
+    executor = get_pdf_executor()
+    if executor is None:
+        logger.info("PDF process pool disabled; parsing runs in the thread pool")
+        await asyncio.to_thread(warm_up_pdf_parser)
+        return
+    workers = await _warm_up_pool(executor)
+    logger.info(f"PDF process pool ready with {workers} workers")
+
+def shutdown_pdf_pool():
+    """Shut down the PDF process pool"""
+    global _executor, _warm_up_task
+    if _warm_up_task is not None:
+        _warm_up_task.cancel()
+        _warm_up_task = None
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
+
+async def run_pdf_job(func: Callable, *args, timeout: Optional[float] = None) -> Any:
+    """
+    Run a CPU-bound PDF function in the worker pool and await its result.
+    At most PDF_PARSE_WORKERS jobs are in the pool at once, so the timeout
+    only counts the job's own run time, not time queued behind other jobs.
+    A job that times out takes its pool down with it (see _retire_pool);
+    jobs of other requests killed with that pool, or lost to a crashed
+    worker, are run again once in the replacement pool.
+
+    Args:
+        func: Picklable, module-level function (e.g. PDFTextExtractor.parse_resume)
+        *args: Picklable arguments for func
+        timeout: Seconds the job may run before giving up (defaults to PDF_PARSE_TIMEOUT)
+
+    Returns:
+        The function's return value
+
+    Raises:
+        asyncio.TimeoutError: If the job did not finish in time
+    """
+    timeout = timeout or PDF_PARSE_TIMEOUT
+    loop = asyncio.get_running_loop()
+    if PDF_PARSE_WORKERS <= 0:
+        return await asyncio.wait_for(loop.run_in_executor(None, func, *args), timeout)
+
+    for attempt in range(2):
+        async with _get_slots():
+            executor = get_pdf_executor()
+            try:
+                return await asyncio.wait_for(loop.run_in_executor(executor, func, *args), timeout)
+            except asyncio.TimeoutError:
+                logger.error(f"PDF job {getattr(func, '__qualname__', func)} timed out after {timeout}s")
+                _retire_pool(executor)
+                raise
+            except BrokenProcessPool:
+                # Killed along with a pool retired for another request's stuck job,
+                # or a worker died (the pool is then unusable and is replaced)
+                _retire_pool(executor)
+                if attempt:
+                    raise
+                logger.warning(f"PDF job {getattr(func, '__qualname__', func)} was interrupted by a pool restart, retrying")
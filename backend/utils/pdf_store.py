@@ -0,0 +1,61 @@
+import os
+import shutil
+import logging
+import tempfile
+from typing import Optional
+from utils.pdf_parser import PDFSource
+
+logger = logging.getLogger(__name__)
+
+# Directory where original PDFs are kept, addressed by their SHA-256 hash, so
+# resumes can be re-extracted after parser upgrades without a re-upload
+PDF_STORE_DIR = os.getenv(
+    "PDF_STORE_DIR",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "storage", "pdfs")
+)
+
+def stored_pdf_path(content_sha256: str) -> str:
+    """Path of the stored PDF for a content hash (whether or not it exists)"""
+    return os.path.join(PDF_STORE_DIR, content_sha256[:2], f"{content_sha256}.pdf")
+
+def get_stored_pdf(content_sha256: str) -> Optional[str]:
+    """
+    Get the path of a stored PDF.
+
+    Returns:
+        The file path, or None if the PDF was never stored
+    """
+    path = stored_pdf_path(content_sha256)
+    return path if os.path.exists(path) else None
+
+def store_pdf(content_sha256: str, source: PDFSource) -> str:
+    """
+    Store a PDF under its content hash. Existing files are left untouched,
+    and the file is written atomically so readers never see a partial PDF.
+
+    Args:
+        content_sha256: SHA-256 hash of the PDF bytes
+        source: Path to the PDF file, or the PDF bytes
+
+    Returns:
+        Path of the stored PDF
+    """
+    path = stored_pdf_path(content_sha256)
+    if os.path.exists(path):
+        return path
+    directory = os.path.dirname(path)
+    os.makedirs(directory, exist_ok=True)
+    fd, temp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            if isinstance(source, (bytes, bytearray)):
+                f.write(source)
+            else:
+                with open(source, 'rb') as src:
+                    shutil.copyfileobj(src, f)
+        os.replace(temp_path, path)
+    except Exception:
+        if os.path.exists(temp_path):
+            os.unlink(temp_path)
+        raise
+    return path
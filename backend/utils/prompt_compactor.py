@@ -0,0 +1,160 @@
+import re
+from typing import Dict, List, Optional, Tuple
+from utils.resume_sections import SECTION_PATTERN, segment_sections
+
+# Approximate tokenization: one token per punctuation mark and per 4 characters
+# of each word, which tracks Gemini's tokenizer closely enough for budgeting
+# without a count_tokens round trip per prompt
+_TOKEN_PATTERN = re.compile(r"\w+|[^\w\s]")
+
+# Lines that carry no information for an evaluation
+_BOILERPLATE_LINE = re.compile(
+    r'^(?:'
+    r'page \d+(?: of \d+)?|\d+ ?/ ?\d+|\d+|'
+    r'(?:curriculum vitae|resume|résumé|cv)|'
+    r'references?(?: are)? available(?: up)?on request\.?|'
+    r'[-_=*·•.]{3,}'
+    r')$',
+    re.IGNORECASE
+)
+# Lines holding only contact details (the candidate's name is sent separately)
+_CONTACT_LINE = re.compile(
+    r'^(?:(?:e-?mail|phone|mobile|tel|linkedin|github|address)\s*:?\s*)?'
+    r'(?:[\w.+-]+@[\w-]+\.[\w.-]+|\+?[\d\s().-]{7,}|(?:https?://)?(?:www\.)?[\w-]+\.[\w./-]+)'
+    r'(?:\s*[|,·•]\s*(?:[\w.+-]+@[\w-]+\.[\w.-]+|\+?[\d\s().-]{7,}|(?:https?://)?(?:www\.)?[\w-]+\.[\w./-]+))*$',
+    re.IGNORECASE
+)
+# Markdown syntax produced by the PDF to markdown conversion
+_MARKDOWN_IMAGE = re.compile(r'!\[[^\]]*\]\([^)]*\)')
+_MARKDOWN_EMPHASIS = re.compile(r'\*\*|__|`')
+_MARKDOWN_HEADING = re.compile(r'^#{1,6}\s+')
+_HTML_COMMENT = re.compile(r'<!--.*?-->', re.DOTALL)
+_SPACES = re.compile(r'[ \t ]+')
+
+# Sections in the order they get the token budget; the rest of the resume
+# (summary, projects, certifications, ...) comes last
+PROMPT_SECTION_PRIORITY = ('experience', 'skills', 'education')
+# Share of the budget each section is guaranteed before the unused budget is
+# handed out in priority order, so a long experience section cannot crowd out
+# skills and education entirely
+_SECTION_SHARES = {'experience': 0.5, 'skills': 0.2, 'education': 0.15, 'other': 0.15}
+
+def count_tokens(text: str) -> int:
+    """Approximate number of model tokens in text"""
+    return sum((len(piece) + 3) // 4 for piece in _TOKEN_PATTERN.findall(text))
+
+def clean_resume_text(text: str) -> str:
+    """
+    Strip markdown artifacts, boilerplate and contact-only lines, collapse
+    whitespace and drop repeated lines (page headers and footers)
+
+    Args:
+        text: Resume raw or markdown text
+
+    Returns:
+        Cleaned text, one non-empty line per line
+    """
+    text = _HTML_COMMENT.sub('', text)
+    text = _MARKDOWN_IMAGE.sub('', text)
+    text = _MARKDOWN_EMPHASIS.sub('', text)
+    lines = []
+    seen = set()
+    for line in text.splitlines():
+        line = _MARKDOWN_HEADING.sub('', _SPACES.sub(' ', line).strip())
+        if not line or _BOILERPLATE_LINE.match(line) or _CONTACT_LINE.match(line):
+            continue
+        key = line.lower()
+        # Short lines such as dates or "Python" may legitimately repeat
+        if len(line) > 20:
+            if key in seen:
+                continue
+            seen.add(key)
+        lines.append(line)
+    return '\n'.join(lines)
+
+def truncate_to_tokens(text: str, max_tokens: int) -> str:
+    """Cut text to at most max_tokens (approximately), at a line boundary where possible"""
+    if max_tokens <= 0:
+        return ''
+    kept = []
+    used = 0
+    for line in text.split('\n'):
+        tokens = count_tokens(line)
+        if used + tokens > max_tokens:
+            if not kept:
+                # A single overlong line: keep its beginning
+                kept.append(line[:max_tokens * 4].rstrip())
+            break
+        kept.append(line)
+        used += tokens
+    return '\n'.join(kept)
+
+def compact_resume(
+    raw_text: str,
+    structured: Dict[str, Optional[str]],
+    max_tokens: int
+) -> Tuple[List[Tuple[str, str]], int, int]:
+    """
+    Build the resume part of an evaluation prompt within a token budget.
+
+    Each of experience, skills and education is taken once: from the resume's
+    own section when one is found, otherwise from the structured fallback
+    (parsed entries or extracted skills). Everything outside those sections
+    forms the rest. Each section first gets up to its guaranteed share of the
+    budget; what the shorter sections leave unused goes to the others in the
+    order of PROMPT_SECTION_PRIORITY followed by the rest. Sections longer than
+    their allowance are cut at a line boundary.
+
+    Args:
+        raw_text: Resume raw or markdown text
+        structured: Fallback text per section name (None when unavailable)
+        max_tokens: Token budget for the returned sections
+
+    Returns:
+        (sections, tokens_before, tokens_after): non-empty (name, text) pairs
+        in priority order, the tokens of the uncompacted raw text plus
+        structured fields, and the tokens of the returned sections
+    """
+    tokens_before = count_tokens(raw_text) + sum(count_tokens(value) for value in structured.values() if value)
+
+    text = clean_resume_text(raw_text)
+    spans = segment_sections(text)
+    contents = {}
+    for name in PROMPT_SECTION_PRIORITY:
+        span = spans.get(name)
+        section = text[span[0]:span[1]].strip() if span else ''
+        contents[name] = section or (structured.get(name) or '').strip()
+    # The rest of the text in its original order, without the sections taken above
+    taken = sorted(spans[name] for name in PROMPT_SECTION_PRIORITY if name in spans)
+    rest, position = [], 0
+    for start, end in taken:
+        rest.append(text[position:start])
+        position = end
+    rest.append(text[position:])
+    # Headings of the removed sections remain at the end of each piece; drop them
+    contents['other'] = '\n'.join(
+        line for line in '\n'.join(rest).split('\n')
+        if line.strip() and not _is_heading_of(line, spans)
+    )
+
+    order = PROMPT_SECTION_PRIORITY + ('other',)
+    sizes = {name: count_tokens(contents[name]) for name in order}
+    allowances = {name: min(sizes[name], int(max_tokens * _SECTION_SHARES[name])) for name in order}
+    remaining = max_tokens - sum(allowances.values())
+    for name in order:
+        extra = min(sizes[name] - allowances[name], remaining)
+        allowances[name] += extra
+        remaining -= extra
+
+    sections = []
+    for name in order:
+        section = truncate_to_tokens(contents[name], allowances[name]) if contents[name] else ''
+        if section:
+            sections.append((name, section))
+    tokens_after = sum(count_tokens(section) for _, section in sections)
+    return sections, tokens_before, tokens_after
+
+def _is_heading_of(line: str, spans: Dict[str, Tuple[int, int]]) -> bool:
+    """Whether line is the heading of one of the prioritized sections"""
+    match = SECTION_PATTERN.fullmatch(line)
+    return bool(match and match.lastgroup in PROMPT_SECTION_PRIORITY and match.lastgroup in spans)
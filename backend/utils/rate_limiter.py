@@ -0,0 +1,104 @@
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Optional
+
+class TokenBucket:
+    """
+    Async token bucket refilled continuously at a per-minute rate.
+    Callers wait (in arrival order) until enough tokens are available.
+    A rate of 0 disables the bucket.
+    """
+
+    def __init__(self, rate_per_minute: float, capacity: Optional[float] = None):
+        """
+        Args:
+            rate_per_minute: Tokens added per minute (e.g. requests or LLM tokens)
+            capacity: Maximum burst size (defaults to one minute's worth)
+        """
+        self.rate = rate_per_minute / 60.0
+        self.capacity = capacity or rate_per_minute
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock: Optional[asyncio.Lock] = None
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    async def acquire(self, amount: float = 1.0):
+        """Wait until amount tokens are available and take them"""
+        if self.rate <= 0:
+            return
+        # A request larger than the bucket could never run; let it drain the bucket instead
+        amount = min(amount, self.capacity)
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        async with self._lock:
+            while True:
+                self._refill()
+                if self._tokens >= amount:
+                    self._tokens -= amount
+                    return
+                await asyncio.sleep((amount - self._tokens) / self.rate)
+
+    def adjust(self, delta: float):
+        """
+        Correct an earlier estimate once the real cost is known: a positive
+        delta takes more tokens (the bucket may go into debt), a negative one
+        gives tokens back.
+        """
+        if self.rate <= 0:
+            return
+        self._refill()
+        self._tokens = min(self.capacity, self._tokens - delta)
+
+class AdaptiveConcurrencyLimiter:
+    """
+    Concurrency limit that adapts with AIMD: each success raises the limit by
+    1/limit (about +1 per round of requests) up to max_limit, and each throttling
+    response halves it down to min_limit. Throttles from requests started
+    before the last decrease are ignored, so one burst only halves it once.
+    """
+
+    def __init__(self, max_limit: int, min_limit: int = 1):
+        self.max_limit = max(max_limit, 1)
+        self.min_limit = max(min(min_limit, self.max_limit), 1)
+        self.limit = float(self.max_limit)
+        self.in_flight = 0
+        self._decreased_at = 0.0
+        self._condition: Optional[asyncio.Condition] = None
+
+    @property
+    def current_limit(self) -> int:
+        return int(self.limit)
+
+    @asynccontextmanager
+    async def slot(self) -> AsyncIterator[float]:
+        """Hold one slot for a request; yields the time the request started"""
+        if self._condition is None:
+            self._condition = asyncio.Condition()
+        async with self._condition:
+            await self._condition.wait_for(lambda: self.in_flight < self.current_limit)
+            self.in_flight += 1
+        try:
+            yield time.monotonic()
+        finally:
+            async with self._condition:
+                self.in_flight -= 1
+                self._condition.notify_all()
+
+    async def on_success(self):
+        """Additive increase; wakes waiters if it opened a slot"""
+        self.limit = min(self.max_limit, self.limit + 1 / self.limit)
+        if self._condition is not None and self.in_flight < self.current_limit:
+            async with self._condition:
+                self._condition.notify_all()
+
+    def on_throttle(self, started_at: float):
+        """Multiplicative decrease"""
+        if started_at < self._decreased_at:
+            return
+        self.limit = max(self.min_limit, self.limit / 2)
+        self._decreased_at = time.monotonic()
@@ -0,0 +1,71 @@
+import re
+from collections import Counter
+from typing import List
+import numpy as np
+
+# Words kept by tokenize: letters and digits plus the + and # of C++ or C#
+_WORD_PATTERN = re.compile(r'[a-z0-9][a-z0-9+#]*')
+
+# Common English and job-posting words that carry no relevance signal
+_STOPWORDS = frozenset('''
+a about above after all also am an and any are as at be been being below between both but by can
+could did do does doing down during each few for from further had has have having he her here hers
+him his how i if in into is it its itself just me more most my no nor not now of off on once only or
+other our ours out over own same she should so some such than that the their theirs them then there
+these they this those through to too under until up very was we were what when where which while who
+whom why will with would you your yours
+ability able candidate candidates experience job looking must plus preferred required requirements
+responsibilities role strong team work working years
+'''.split())
+
+# BM25 parameters: term frequency saturation and document length normalization
+BM25_K1 = 1.5
+BM25_B = 0.75
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase words of text without stopwords"""
+    return [word for word in _WORD_PATTERN.findall(text.lower()) if word not in _STOPWORDS]
+
+def bm25_scores(query: str, documents: List[str], k1: float = BM25_K1, b: float = BM25_B) -> np.ndarray:
+    """
+    Score documents against a query with Okapi BM25. Document frequencies and
+    the average length come from the documents themselves, so scores rank
+    documents within one pool (e.g. all resumes for a JD) and are not
+    comparable across pools.
+
+    Only the query's distinct terms are counted, so the term matrix is
+    documents x query terms and scoring a few hundred resumes takes
+    milliseconds.
+
+    Args:
+        query: Query text (the job description)
+        documents: Document texts (resume texts)
+        k1: Term frequency saturation
+        b: Document length normalization
+
+    Returns:
+        Array of one non-negative score per document
+    """
+    terms = list(dict.fromkeys(tokenize(query)))
+    if not documents:
+        return np.zeros(0)
+    if not terms:
+        return np.zeros(len(documents))
+    columns = {term: index for index, term in enumerate(terms)}
+
+    frequencies = np.zeros((len(documents), len(terms)), dtype=np.float64)
+    lengths = np.zeros(len(documents), dtype=np.float64)
+    for row, document in enumerate(documents):
+        tokens = tokenize(document)
+        lengths[row] = len(tokens)
+        for term, count in Counter(tokens).items():
+            column = columns.get(term)
+            if column is not None:
+                frequencies[row, column] = count
+
+    document_frequency = np.count_nonzero(frequencies, axis=0)
+    idf = np.log1p((len(documents) - document_frequency + 0.5) / (document_frequency + 0.5))
+    average_length = lengths.mean() or 1.0
+    normalization = k1 * (1 - b + b * lengths / average_length)
+    weights = frequencies * (k1 + 1) / (frequencies + normalization[:, None])
+    return weights @ idf
@@ -0,0 +1,129 @@
+import re
+from typing import Dict, List, Optional, Tuple
+
+# Section headings recognised in resumes. Each alternative must match a whole
+# line (optionally followed by a colon), so body text mentioning "education"
+# or "skills" is never mistaken for a heading.
+_SECTION_HEADINGS = {
+    'education': r'education(?:al background)?|academic (?:background|qualifications)|academics|qualifications',
+    'experience': r'(?:work |professional |relevant |employment )?experience|employment(?: history)?|work history|career history',
+    'skills': r'(?:technical |core |key )?skills(?: (?:&|and) (?:tools|technologies))?|technologies|tech stack|competencies',
+    'projects': r'(?:personal |academic |selected |key )?projects',
+    # Known headings we do not extract from; they only end the previous section
+    'other': (
+        r'summary|professional summary|profile|objective|career objective|about me|'
+        r'certifications?|licenses?(?: (?:&|and) certifications)?|awards?|honou?rs(?: (?:&|and) awards)?|'
+        r'achievements|publications|interests|hobbies|languages|references|volunteer(?:ing| experience)?|activities'
+    ),
+}
+
+SECTION_PATTERN = re.compile(
+    r'^[ \t#*•\-]*(?:' +
+    '|'.join(f'(?P<{name}>{pattern})' for name, pattern in _SECTION_HEADINGS.items()) +
+    r')[ \t]*:?[ \t]*$',
+    re.IGNORECASE | re.MULTILINE
+)
+
+# Sections returned by segment_sections (contact is everything before the first heading)
+SECTION_NAMES = ('contact', 'education', 'experience', 'skills', 'projects')
+
+_MONTH = r'(?:jan|feb|mar|apr|may|jun|jul|aug|sep|sept|oct|nov|dec)[a-z]*\.?'
+_DATE = rf'(?:{_MONTH}\s*\d{{4}}|\d{{1,2}}/\d{{4}}|\d{{4}})'
+DATE_RANGE_PATTERN = re.compile(
+    rf'(?P<start>{_DATE})\s*(?:-|–|—|to)\s*(?P<end>{_DATE}|present|current|now|today)',
+    re.IGNORECASE
+)
+_BULLET_PATTERN = re.compile(r'^\s*[•●▪■◦‣∙·○►▸\-–—*]\s*')
+_TITLE_COMPANY_SEPARATOR = re.compile(r'\s+at\s+|\s*[|@]\s*|\s+[-–—]\s+|,\s*')
+
+def segment_sections(text: str) -> Dict[str, Tuple[int, int]]:
+    """
+    Split resume text into sections in a single pass over its heading lines.
+
+    Args:
+        text: Resume text
+
+    Returns:
+        Mapping of section name (see SECTION_NAMES) to (start, end) offsets
+        into text. The span starts after the heading line; only the first
+        occurrence of each section is kept and missing sections are omitted.
+    """
+    sections = {}
+    if not text:
+        return sections
+
+    current, start = 'contact', 0
+    for match in SECTION_PATTERN.finditer(text):
+        if current not in sections and current != 'other':
+            sections[current] = (start, match.start())
+        current, start = match.lastgroup, match.end()
+    if current not in sections and current != 'other':
+        sections[current] = (start, len(text))
+    return sections
+
+def section_text(text: str, sections: Dict[str, Tuple[int, int]], name: str) -> Optional[str]:
+    """Return the text of one section, or None if it was not found"""
+    span = sections.get(name)
+    if span is None:
+        return None
+    return text[span[0]:span[1]]
+
+def _split_title_company(header_lines: List[str]) -> Tuple[str, str]:
+    """Derive (title, company) from the header line(s) of an experience entry"""
+    header_lines = [line for line in header_lines if line]
+    if len(header_lines) >= 2:
+        return header_lines[0], header_lines[1]
+    if not header_lines:
+        return 'Unknown', 'Unknown'
+    parts = [part.strip() for part in _TITLE_COMPANY_SEPARATOR.split(header_lines[0], maxsplit=1)]
+    if len(parts) == 2 and parts[0] and parts[1]:
+        return parts[0], parts[1]
+    return header_lines[0], 'Unknown'
+
+def parse_experience(section: str) -> List[dict]:
+    """
+    Parse an experience section into entries.
+    Every line with a date range (e.g. "Jan 2020 - Present") starts an entry;
+    its title/company come from the rest of that line and/or the non-bullet
+    lines right above it, and the following lines form the description.
+
+    Returns:
+        List of dicts: {title, company, start_date, end_date, description}
+    """
+    entries = []
+    buffer = []
+    for raw_line in section.split('\n'):
+        line = raw_line.strip()
+        if not line:
+            continue
+        date_match = DATE_RANGE_PATTERN.search(line)
+        if not date_match:
+            buffer.append(line)
+            continue
+
+        # Non-bullet lines directly above the dates belong to this entry's header
+        header_lines = []
+        while buffer and len(header_lines) < 2 and not _BULLET_PATTERN.match(buffer[-1]):
+            header_lines.insert(0, buffer.pop())
+        if entries:
+            entries[-1]['description'] = _join_description(buffer)
+        buffer = []
+
+        remainder = (line[:date_match.start()] + ' ' + line[date_match.end():]).strip(' \t,|-–—()')
+        if remainder:
+            header_lines.append(remainder)
+        title, company = _split_title_company(header_lines[-2:])
+        entries.append({
+            'title': title,
+            'company': company,
+            'start_date': date_match.group('start'),
+            'end_date': date_match.group('end'),
+            'description': None,
+        })
+    if entries:
+        entries[-1]['description'] = _join_description(buffer)
+    return entries
+
+def _join_description(lines: List[str]) -> Optional[str]:
+    description = '\n'.join(_BULLET_PATTERN.sub('', line) for line in lines).strip()
+    return description or None
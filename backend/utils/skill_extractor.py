@@ -0,0 +1,156 @@
+import os
+import json
+import logging
+import threading
+from collections import deque
+from typing import Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# JSON file mapping canonical skill names to lists of aliases
+SKILLS_DICTIONARY_PATH = os.getenv(
+    "SKILLS_DICTIONARY_PATH",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "skills.json")
+)
+
+class SkillExtractor:
+    """
+    Finds known skills in free text with an Aho-Corasick automaton.
+    All aliases are compiled into one trie with failure links, so a text is
+    scanned in a single linear pass regardless of the dictionary size.
+    """
+
+    def __init__(self, dictionary: Dict[str, List[str]]):
+        """
+        Build the automaton.
+
+        Args:
+            dictionary: Mapping of canonical skill name to the aliases that
+                identify it in text. Only aliases are matched, so an ambiguous
+                name such as "Go" or "R" can be listed with safe aliases only.
+        """
+        # Node i is described by _goto[i] (char -> node), _fail[i] and _output[i],
+        # a list of (alias length, canonical name) for every alias ending there
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._output: List[List[Tuple[int, str]]] = [[]]
+
+        for skill, aliases in dictionary.items():
+            for alias in {' '.join(alias.lower().split()) for alias in aliases}:
+                if alias:
+                    self._add(alias, skill)
+        self._build_failure_links()
+        self.skill_count = len(dictionary)
+
+    def _add(self, alias: str, skill: str):
+        node = 0
+        for char in alias:
+            next_node = self._goto[node].get(char)
+            if next_node is None:
+                next_node = len(self._goto)
+                self._goto[node][char] = next_node
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append([])
+            node = next_node
+        self._output[node].append((len(alias), skill))
+
+    def _build_failure_links(self):
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for char, child in self._goto[node].items():
+                queue.append(child)
+                if node:
+                    fallback = self._fail[node]
+                    while fallback and char not in self._goto[fallback]:
+                        fallback = self._fail[fallback]
+                    self._fail[child] = self._goto[fallback].get(char, 0)
+                # Inherit matches that end at the failure state (shorter suffixes)
+                self._output[child] = self._output[child] + self._output[self._fail[child]]
+
+    def extract(self, text: str) -> List[str]:
+        """
+        Find all dictionary skills mentioned in text.
+        Matches are case-insensitive and must start and end on word boundaries,
+        so "java" is not found inside "javascript".
+
+        Args:
+            text: Text to scan (resume or job description)
+
+        Returns:
+            Canonical skill names in order of first appearance
+        """
+        if not text:
+            return []
+
+        # Collapse whitespace so multi-word aliases match across line breaks
+        text = ' '.join(text.lower().split())
+        goto, fail, output = self._goto, self._fail, self._output
+        found: Dict[str, None] = {}
+        node = 0
+        for end, char in enumerate(text):
+            while node and char not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(char, 0)
+            if not output[node]:
+                continue
+            if end + 1 < len(text) and _is_word_char(text[end + 1]):
+                continue
+            for length, skill in output[node]:
+                start = end - length + 1
+                if skill not in found and (start == 0 or not _is_word_char(text[start - 1])):
+                    found[skill] = None
+        return list(found)
+
+def _is_word_char(char: str) -> bool:
+    # '+' and '#' belong to names like C++ and C#, so they never end a word
+    return char.isalnum() or char in '+#'
+
+def load_skill_dictionary(path: Optional[str] = None) -> Dict[str, List[str]]:
+    """
+    Load a skill dictionary from a JSON file.
+
+    Args:
+        path: JSON file of {canonical name: [aliases]} (defaults to SKILLS_DICTIONARY_PATH)
+
+    Returns:
+        The dictionary, or an empty one if the file cannot be read
+    """
+    path = path or SKILLS_DICTIONARY_PATH
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            dictionary = json.load(f)
+    except (OSError, ValueError) as e:
+        logger.error(f"Could not load skill dictionary from {path}: {e}")
+        return {}
+    if not isinstance(dictionary, dict):
+        logger.error(f"Skill dictionary {path} must be a JSON object of name -> aliases")
+        return {}
+    return {str(skill): [str(alias) for alias in aliases or []] for skill, aliases in dictionary.items()}
+
+# Shared extractor, built on first use (once per process)
+_extractor: Optional[SkillExtractor] = None
+_extractor_lock = threading.Lock()
+
+def get_skill_extractor() -> SkillExtractor:
+    """Get the process-wide skill extractor, compiling the dictionary on first use"""
+    global _extractor
+    if _extractor is None:
+        with _extractor_lock:
+            if _extractor is None:
+                _extractor = SkillExtractor(load_skill_dictionary())
+                logger.info(f"Skill extractor ready with {_extractor.skill_count} skills")
+    return _extractor
+
+def extract_skills(text: str) -> List[str]:
+    """
+    Extract canonical skill names from text using the shared extractor.
+
+    Args:
+        text: Resume or job description text
+
+    Returns:
+        Skill names in order of first appearance
+    """
+    return get_skill_extractor().extract(text)